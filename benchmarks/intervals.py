@@ -0,0 +1,113 @@
+"""Benchmark the native `DelayInterval` against `portion` intervals.
+
+All the variants work on the same compiled constraints and clock values, so
+that only the cost of the intervals is measured (and not the compilation of
+the constraints, which is cached):
+
+- ``portion``: intersect one `portion` interval per atomic constraint;
+- ``native &``: the same, with `DelayInterval`;
+- ``delays``: :py:func:`pta.clock.delays`, which folds the bounds as numbers.
+
+Run with the package installed (e.g., ``pip install -e .``)::
+
+    $ python benchmarks/intervals.py
+"""
+
+import math
+import operator
+import random
+import timeit
+
+import portion as P
+
+import pta
+from pta.clock import Boolean, ClockValuation, DelayInterval, delays
+
+_LOWER = (operator.ge, operator.gt)
+_CLOSED = (operator.ge, operator.le)
+
+
+def portion_delays(values, compiled) -> P.Interval:
+    """Intersect the delays of each atomic constraint as `portion` intervals"""
+    ret = P.closedopen(0, P.inf)
+    for op, clock, rhs in compiled._singletons:
+        bound = rhs - values[clock]
+        if op in _LOWER:
+            iv = P.closedopen(bound, P.inf) if op in _CLOSED else P.open(bound, P.inf)
+        else:
+            iv = P.closed(0, bound) if op in _CLOSED else P.closedopen(0, bound)
+        ret = ret & iv
+    return ret
+
+
+def native_delays(values, compiled) -> DelayInterval:
+    """Intersect the delays of each atomic constraint as `DelayInterval`s"""
+    ret = DelayInterval()
+    for op, clock, rhs in compiled._singletons:
+        bound = rhs - values[clock]
+        if op in _LOWER:
+            iv = DelayInterval(bound, math.inf, op in _CLOSED, False)
+        else:
+            iv = DelayInterval(0.0, bound, True, op in _CLOSED)
+        ret = ret & iv
+    return ret
+
+
+def deep_conjunction(clocks, seed: int = 0):
+    """Conjunction of one random singleton constraint per clock
+
+    Compilation only keeps the tightest bound of each clock in each direction,
+    so the constraints are on distinct clocks to get as many atoms.
+    """
+    rng = random.Random(seed)
+    cc = Boolean(True)
+    for clock in clocks:
+        if rng.random() < 0.5:
+            cc = cc & (clock >= rng.randint(1, 5))
+        else:
+            cc = cc & (clock <= rng.randint(6, 20))
+    return cc
+
+
+def main(number: int = 2000):
+    print(
+        "{:>6} {:>6} {:>14} {:>14} {:>14}".format(
+            "depth", "atoms", "portion (us)", "native & (us)", "delays (us)"
+        )
+    )
+    for depth in (1, 4, 16, 64):
+        clocks = pta.new_clocks(["c{}".format(i) for i in range(depth)])
+        valuation = ClockValuation({c: 0.5 for c in clocks})
+        values = valuation._values
+        compiled = deep_conjunction(clocks).compile()
+        expected = delays(valuation, compiled)
+        assert native_delays(values, compiled).to_portion() == expected.to_portion()
+        assert portion_delays(values, compiled) == expected.to_portion()
+        times = [
+            1e6 * timeit.timeit(lambda: f(values, compiled), number=number) / number
+            for f in (portion_delays, native_delays)
+        ]
+        times.append(
+            1e6
+            * timeit.timeit(lambda: delays(valuation, compiled), number=number)
+            / number
+        )
+        print(
+            "{:>6} {:>6} {:>14.2f} {:>14.2f} {:>14.2f}".format(
+                depth, len(compiled._singletons), *times
+            )
+        )
+
+    a, b = P.closed(0, 5), P.open(1, P.inf)
+    c, d = DelayInterval(0, 5, True, True), DelayInterval(1, float("inf"), False, False)
+    t_portion = timeit.timeit(lambda: a & b, number=10 * number)
+    t_native = timeit.timeit(lambda: c & d, number=10 * number)
+    print(
+        "atomic intersection: portion {:.2f}us, native {:.2f}us ({:.1f}x)".format(
+            1e5 * t_portion / number, 1e5 * t_native / number, t_portion / t_native
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -35,13 +35,22 @@ SOFTWARE.
 import abc
 from functools import total_ordering
 from itertools import product
-from typing import FrozenSet, Hashable, Iterable
+from typing import Dict, FrozenSet, Hashable, Iterable, Tuple
 
 import attr
 
 Letter = Hashable
 
 
+def _check_index(alphabet: "Alphabet", index: int):
+    if not 0 <= index < len(alphabet):
+        raise IndexError(
+            "Letter index {} out of range for an alphabet of size {}".format(
+                index, len(alphabet)
+            )
+        )
+
+
 # NOTE: Defined Alphabet as an Abstract Class as opposed to a Union as it helps mypy
 # NOTE: Needed to make this an Iterable because set(Set[...]) is empty for some reason...
 class Alphabet(abc.ABC, Iterable):
@@ -57,6 +66,35 @@ class Alphabet(abc.ABC, Iterable):
     def __len__(self):
         raise NotImplementedError()
 
+    def index(self, letter: Letter) -> int:
+        """Get the position of a letter in the iteration order of the alphabet
+
+        Raises
+        ------
+        ValueError
+            If the letter is not in the alphabet.
+        """
+        for i, elem in enumerate(self):
+            if elem == letter:
+                return i
+        raise ValueError("{!r} is not in the alphabet".format(letter))
+
+    def letter(self, index: int) -> Letter:
+        """Get the letter at a position in the iteration order of the alphabet
+
+        This is the inverse of `index`.
+
+        Raises
+        ------
+        IndexError
+            If the index is not in ``range(len(self))``.
+        """
+        _check_index(self, index)
+        for i, elem in enumerate(self):
+            if i == index:
+                return elem
+        raise IndexError(index)
+
     def __lt__(left, right):
         """Partial order on subsets"""
         if isinstance(left, ProductAlphabet) and isinstance(right, ProductAlphabet):
@@ -81,9 +119,24 @@ class Alphabet(abc.ABC, Iterable):
 @attr.s(frozen=True, auto_attribs=True, eq=False, repr=False)
 @total_ordering
 class ExplicitAlphabet(Alphabet):
-    """An Alphabet defined by a finite set"""
+    """An Alphabet defined by a finite set
+
+    The letters are iterated (and indexed) in sorted order, or in the order of
+    their ``repr`` if they cannot be compared, so that the order does not
+    change across processes.
+    """
 
     _chars: FrozenSet[Letter] = attr.ib(converter=frozenset)
+    _order: Tuple[Letter, ...] = attr.ib(init=False)
+    _rank: Dict[Letter, int] = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        try:
+            order = tuple(sorted(self._chars))
+        except TypeError:
+            order = tuple(sorted(self._chars, key=repr))
+        object.__setattr__(self, "_order", order)
+        object.__setattr__(self, "_rank", {c: i for i, c in enumerate(order)})
 
     @property
     def chars(self) -> FrozenSet[Letter]:
@@ -98,7 +151,7 @@ class ExplicitAlphabet(Alphabet):
         return set(self) == set(other)
 
     def __iter__(self):
-        return iter(self.chars)
+        return iter(self._order)
 
     def __len__(self):
         return len(self.chars)
@@ -106,6 +159,16 @@ class ExplicitAlphabet(Alphabet):
     def __contains__(self, elem):
         return elem in self.chars
 
+    def index(self, letter: Letter) -> int:
+        try:
+            return self._rank[letter]
+        except KeyError:
+            raise ValueError("{!r} is not in the alphabet".format(letter)) from None
+
+    def letter(self, index: int) -> Letter:
+        _check_index(self, index)
+        return self._order[index]
+
     def __repr__(self):
         return repr(set(self.chars))
 
@@ -143,6 +206,18 @@ class ProductAlphabet(Alphabet):
     def __len__(self):
         return len(self.left) * len(self.right)
 
+    def index(self, letter: Letter) -> int:
+        if len(letter) != 2:
+            raise ValueError("{!r} is not in the alphabet".format(letter))
+        return self.left.index(letter[0]) * len(self.right) + self.right.index(
+            letter[1]
+        )
+
+    def letter(self, index: int) -> Letter:
+        _check_index(self, index)
+        i, j = divmod(index, len(self.right))
+        return (self.left.letter(i), self.right.letter(j))
+
 
 @attr.s(frozen=True, auto_attribs=True, eq=False, order=False, repr=False)
 @total_ordering
@@ -183,11 +258,31 @@ class ExponentialAlphabet(Alphabet):
         return "{}^{}".format(self.base, self.dim)
 
     def __len__(self):
-        return self.dim * len(self.base)
+        return len(self.base) ** self.dim
 
     def __iter__(self):
         return product(self.base, repeat=self.dim)
 
+    def index(self, letter: Letter) -> int:
+        """Get the position of a letter, ranked in mixed radix (first element first)"""
+        letter = tuple(letter)
+        if len(letter) != self.dim:
+            raise ValueError("{!r} is not in the alphabet".format(letter))
+        radix = len(self.base)
+        index = 0
+        for elem in letter:
+            index = index * radix + self.base.index(elem)
+        return index
+
+    def letter(self, index: int) -> Letter:
+        _check_index(self, index)
+        radix = len(self.base)
+        digits = []
+        for _ in range(self.dim):
+            index, digit = divmod(index, radix)
+            digits.append(self.base.letter(digit))
+        return tuple(reversed(digits))
+
 
 # TODO: Add support for Real valued Alphabet (delays and timed actions)
 
@@ -20,17 +20,34 @@ The `Clock` and `ClockConstraint` classes have syntactic sugar to easily write t
 Moreover, the `Clock` and `ClockConstraint` are *frozen*, which emulates immutable data.
 """
 
+import math
 import operator
 from abc import ABC, abstractmethod
 from enum import Enum, auto, unique
-from typing import Callable, Dict, Hashable, Iterable, Iterator, Mapping, Set, Tuple
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 import attr
 import attr.validators as VAL
+import numpy as np
 
 # NOTE:
-#   Currently using this library for intervals, but may use a custom Intervall
-#   class in the future.
+#   The delays are computed and returned as native `DelayInterval`s, which
+#   mirror the part of the `portion` interface used in the package. `portion`
+#   is only used to convert them (see `DelayInterval.to_portion`).
 import portion as P
 from portion import Interval
 
@@ -182,8 +199,23 @@ class ClockConstraint(ABC):
             "Can't get the interval for the abstract ClockConstraint class"
         )
 
+    def compile(self) -> "CompiledConstraint":
+        """Get the flat evaluator for this constraint.
+
+        The evaluator is built on first use and cached on the (immutable)
+        constraint, so repeated guard checks do not walk the constraint tree.
+
+        .. seealso::
+            :py:func:`~pta.clock.compile_constraint`
+        """
+        compiled = getattr(self, "_compiled", None)
+        if compiled is None:
+            compiled = compile_constraint(self)
+            object.__setattr__(self, "_compiled", compiled)
+        return compiled
+
     def __contains__(self, value: ClockValuation) -> bool:
-        return self.contains(value)
+        return self.compile()(value)
 
 
 @attr.s(frozen=True, auto_attribs=True, order=False)
@@ -244,15 +276,25 @@ class ComparisonOp(Enum):
 
     def to_op(self) -> Callable[[float, float], bool]:
         """Output the operator function that corresponds to the enum"""
-        if self == ComparisonOp.GE:
-            return operator.ge
-        if self == ComparisonOp.GT:
-            return operator.gt
-        if self == ComparisonOp.LE:
-            return operator.le
-        if self == ComparisonOp.LT:
-            return operator.lt
-        return operator.lt
+        return _OPERATORS[self]
+
+    @property
+    def is_lower(self) -> bool:
+        """``True`` if the operator bounds the LHS from below (``>=`` or ``>``)"""
+        return self in (ComparisonOp.GE, ComparisonOp.GT)
+
+    @property
+    def is_strict(self) -> bool:
+        """``True`` if the operator is a strict inequality (``>`` or ``<``)"""
+        return self in (ComparisonOp.GT, ComparisonOp.LT)
+
+
+_OPERATORS = {
+    ComparisonOp.GE: operator.ge,
+    ComparisonOp.GT: operator.gt,
+    ComparisonOp.LE: operator.le,
+    ComparisonOp.LT: operator.lt,
+}
 
 
 @attr.s(frozen=True, auto_attribs=True, order=False)
@@ -340,53 +382,601 @@ class DiagonalConstraint(ClockConstraint):
         return self.op.to_op()(self.lhs(value), self.rhs)
 
 
-def delays(values: ClockValuation, constraint: ClockConstraint) -> Interval:
+class Atom(NamedTuple):
+    """A single flattened comparison \\(c_1 - c_2 \\sim n\\)
+
+    For singleton constraints, ``clock2`` is ``None``. The clocks may either be
+    `Clock` objects or integer slots into a fixed clock ordering (see
+    :py:meth:`CompiledConstraint.bind`).
+    """
+
+    op: ComparisonOp
+    clock1: Hashable
+    clock2: Optional[Hashable]
+    rhs: int
+
+
+@attr.s(frozen=True, slots=True, repr=False)
+class CompiledConstraint:
+    """A flat evaluator for a conjunction of `Atom` comparisons
+
+    Instead of recursively walking ``And`` nodes and resolving the comparison
+    operator on every call, a `CompiledConstraint` holds a flat tuple of atoms
+    with pre-resolved operator functions. Singleton comparisons are checked
+    before diagonal ones, and the evaluation short-circuits on the first
+    violated atom.
+
+    Do not construct this directly, use :py:func:`compile_constraint` or
+    :py:meth:`ClockConstraint.compile`.
+    """
+
+    atoms: Tuple[Atom, ...] = attr.ib()
+    satisfiable: bool = attr.ib(default=True)
+
+    _singletons: Tuple[Tuple[Callable, Hashable, int], ...] = attr.ib(init=False)
+    _diagonals: Tuple[Tuple[Callable, Hashable, Hashable, int], ...] = attr.ib(
+        init=False
+    )
+
+    def __attrs_post_init__(self):
+        object.__setattr__(
+            self,
+            "_singletons",
+            tuple(
+                (atom.op.to_op(), atom.clock1, atom.rhs)
+                for atom in self.atoms
+                if atom.clock2 is None
+            ),
+        )
+        object.__setattr__(
+            self,
+            "_diagonals",
+            tuple(
+                (atom.op.to_op(), atom.clock1, atom.clock2, atom.rhs)
+                for atom in self.atoms
+                if atom.clock2 is not None
+            ),
+        )
+
+    @property
+    def clocks(self) -> Set[Hashable]:
+        """The set of clocks (or slots) referenced by the constraint"""
+        ret = {atom.clock1 for atom in self.atoms}
+        ret.update(atom.clock2 for atom in self.atoms if atom.clock2 is not None)
+        return ret
+
+    def __call__(self, values: Union[Mapping[Clock, float], Sequence[float]]) -> bool:
+        """Evaluate the constraint on the given values
+
+        ``values`` is a mapping from `Clock` to valuations, or, if the
+        constraint was bound to a clock ordering, any sequence (e.g., a tuple
+        or a NumPy array) indexed by the clock slots.
+        """
+        if not self.satisfiable:
+            return False
+        if isinstance(values, ClockValuation):
+            values = values._values
+        for op, clock, rhs in self._singletons:
+            if not op(values[clock], rhs):
+                return False
+        for op, clock1, clock2, rhs in self._diagonals:
+            if not op(values[clock1] - values[clock2], rhs):
+                return False
+        return True
+
+    def evaluate_batch(self, values: np.ndarray) -> np.ndarray:
+        """Evaluate a constraint bound to a clock ordering on a matrix of valuations
+
+        Parameters
+        ----------
+        values:
+            An ``(n, k)`` array where row ``i`` holds the ``i``-th valuation,
+            with columns in the clock ordering the constraint was bound to.
+
+        Returns
+        -------
+        :
+            A boolean array of shape ``(n,)``.
+        """
+        ret = np.full(values.shape[0], self.satisfiable, dtype=bool)
+        for op, clock, rhs in self._singletons:
+            if not ret.any():
+                return ret
+            ret &= op(values[:, clock], rhs)
+        for op, clock1, clock2, rhs in self._diagonals:
+            if not ret.any():
+                return ret
+            ret &= op(values[:, clock1] - values[:, clock2], rhs)
+        return ret
+
+    def delay_bounds(self, values: np.ndarray) -> "DelayBounds":
+        """Compute the allowed delays of a matrix of valuations
+
+        Like :py:meth:`evaluate_batch`, the constraint must be bound to the
+        clock ordering of the columns of ``values``.
+
+        .. seealso::
+            :py:func:`~pta.clock.delays_batch`
+        """
+        return _delay_bounds(self, values)
+
+    def bind(self, clocks: Sequence[Clock]) -> "CompiledConstraint":
+        """Resolve the clocks in the constraint to slots in the given ordering
+
+        Parameters
+        ----------
+        clocks:
+            A fixed ordering of the clocks. The returned evaluator expects
+            values as a sequence where ``values[i]`` is the value of
+            ``clocks[i]``.
+        """
+        slots = {clock: i for i, clock in enumerate(clocks)}
+        try:
+            atoms = tuple(
+                Atom(
+                    atom.op,
+                    slots[atom.clock1],
+                    None if atom.clock2 is None else slots[atom.clock2],
+                    atom.rhs,
+                )
+                for atom in self.atoms
+            )
+        except KeyError as e:
+            raise ValueError(
+                "Clock {} not in the given clock ordering".format(e.args[0])
+            )
+        return CompiledConstraint(atoms, self.satisfiable)
+
+    def to_constraint(self) -> ClockConstraint:
+        """Rebuild an equivalent `ClockConstraint` from the flattened atoms"""
+        if not self.satisfiable:
+            return Boolean(False)
+        ret: ClockConstraint = Boolean(True)
+        for atom in self.atoms:
+            lhs = atom.clock1 if atom.clock2 is None else atom.clock1 - atom.clock2
+            if atom.clock2 is None:
+                cc: ClockConstraint = SingletonConstraint(lhs, atom.rhs, atom.op)
+            else:
+                cc = DiagonalConstraint(lhs, atom.rhs, atom.op)
+            ret = ret & cc
+        return ret
+
+    def __repr__(self) -> str:
+        if not self.satisfiable:
+            return "CompiledConstraint(false)"
+        return "CompiledConstraint({})".format(list(self.atoms))
+
+
+def _tighter(a: Atom, b: Atom) -> bool:
+    """Check if atom ``a`` implies atom ``b`` (both bounding the same side of the same LHS)"""
+    if a.rhs == b.rhs:
+        return a.op.is_strict or not b.op.is_strict
+    if a.op.is_lower:
+        return a.rhs > b.rhs
+    return a.rhs < b.rhs
+
+
+def compile_constraint(constraint: Union[bool, ClockConstraint]) -> CompiledConstraint:
+    """Flatten a `ClockConstraint` tree into a `CompiledConstraint`
+
+    The nested ``And`` nodes are flattened into a list of atomic comparisons,
+    ``true`` sub-terms are dropped and any ``false`` sub-term makes the whole
+    constraint unsatisfiable. For each clock (or pair of clocks in diagonal
+    constraints), only the tightest lower bound and the tightest upper bound
+    are kept.
+
+    Parameters
+    ----------
+    constraint :
+        A clock constraint.
+
+    Returns
+    -------
+    :
+        The flat evaluator for the constraint.
+    """
+    if isinstance(constraint, bool):
+        constraint = Boolean(constraint)
+
+    # Keyed by (lhs, is_lower) so that only the tightest bound survives.
+    bounds: Dict[Tuple[Hashable, Optional[Hashable], bool], Atom] = dict()
+    stack: List[ClockConstraint] = [constraint]
+    while len(stack) > 0:
+        cc = stack.pop()
+        if isinstance(cc, Boolean):
+            if not cc.value:
+                return CompiledConstraint((), False)
+            continue
+        if isinstance(cc, And):
+            # Push in reverse so that the atoms are visited left to right.
+            stack.extend(reversed(cc.args))
+            continue
+        if isinstance(cc, SingletonConstraint):
+            atom = Atom(cc.op, cc.clock, None, cc.rhs)
+        elif isinstance(cc, DiagonalConstraint):
+            atom = Atom(cc.op, cc.lhs.clock1, cc.lhs.clock2, cc.rhs)
+        else:
+            raise TypeError("Unsupported ClockConstraint type: {}".format(type(cc)))
+        key = (atom.clock1, atom.clock2, atom.op.is_lower)
+        if key not in bounds or _tighter(atom, bounds[key]):
+            bounds[key] = atom
+    return CompiledConstraint(tuple(bounds.values()))
+
+
+@attr.s(auto_attribs=True, slots=True, repr=False)
+class ClockValuationBatch:
+    """A batch of clock valuations stored as a NumPy matrix
+
+    Each row of the matrix is a sample and each column corresponds to a `Clock`
+    in the fixed ordering given by `clocks`. All the operations act on every
+    row at once::
+
+        batch = ClockValuationBatch.zero_init((x, y), 1000)
+        batch = batch + np.random.rand(1000)
+        batch = batch.reset([x])
+        enabled = batch.satisfies((x <= 1) & (y > 0))  # boolean array
+
+    """
+
+    _clocks: Tuple[Clock, ...] = attr.ib(converter=tuple)
+    _values: np.ndarray = attr.ib(converter=lambda v: np.array(v, dtype=float))
+
+    @_values.validator
+    def _values_validator(self, _, value):
+        if not all([isinstance(c, Clock) for c in self._clocks]):
+            raise TypeError("Expected clocks to be Clocks...")
+        if value.ndim != 2 or value.shape[1] != len(self._clocks):
+            raise ValueError(
+                "Expected values of shape (n, {}), got {}".format(
+                    len(self._clocks), value.shape
+                )
+            )
+        if (value < 0).any():
+            raise ValueError("Clock values cannot be negative...")
+
+    @property
+    def clocks(self) -> Tuple[Clock, ...]:
+        """The ordering of the clocks (columns) in the batch"""
+        return self._clocks
+
+    @property
+    def values(self) -> np.ndarray:
+        """The ``(n, k)`` matrix of clock valuations"""
+        return self._values
+
+    def slot(self, clock: Clock) -> int:
+        """Get the column of the given clock"""
+        return self._clocks.index(clock)
+
+    def __len__(self) -> int:
+        return self._values.shape[0]
+
+    def __getitem__(self, i: int) -> ClockValuation:
+        return ClockValuation(dict(zip(self._clocks, self._values[i].tolist())))
+
+    def __repr__(self) -> str:
+        return "ClockValuationBatch(clocks={}, n={})".format(self._clocks, len(self))
+
+    @classmethod
+    def zero_init(cls, clocks: Iterable[Clock], n: int) -> "ClockValuationBatch":
+        """Zero initialize a batch of ``n`` valuations for the given clocks"""
+        clocks = tuple(clocks)
+        return cls(clocks, np.zeros((n, len(clocks))))
+
+    @classmethod
+    def from_valuations(
+        cls,
+        valuations: Sequence[Mapping[Clock, float]],
+        clocks: Optional[Sequence[Clock]] = None,
+    ) -> "ClockValuationBatch":
+        """Stack a sequence of `ClockValuation` into a batch
+
+        Parameters
+        ----------
+        valuations:
+            The valuations to stack. Each must contain all the clocks.
+        clocks:
+            The ordering of the clocks. Defaults to the iteration order of the
+            first valuation.
+        """
+        if clocks is None:
+            clocks = tuple(valuations[0].keys())
+        return cls(clocks, [[v[c] for c in clocks] for v in valuations])
+
+    def to_valuations(self) -> List[ClockValuation]:
+        """Convert the batch into a list of `ClockValuation`"""
+        return [
+            ClockValuation(dict(zip(self._clocks, row)))
+            for row in self._values.tolist()
+        ]
+
+    def __add__(self, other) -> "ClockValuationBatch":
+        """Delay all the valuations by a scalar or by a per-sample array of delays"""
+        if isinstance(other, (float, int, np.ndarray)):
+            delay = np.asarray(other, dtype=float)
+            if delay.ndim == 1:
+                delay = delay[:, np.newaxis]
+            return ClockValuationBatch(self._clocks, self._values + delay)
+        return NotImplemented
+
+    def reset(
+        self, clocks: Union[Iterable[Clock], np.ndarray]
+    ) -> "ClockValuationBatch":
+        """Set the given clocks to 0
+
+        Parameters
+        ----------
+        clocks:
+            Either an iterable of `Clock` that is reset in every sample, or a
+            boolean mask of shape ``(k,)`` (shared by all samples) or ``(n, k)``
+            (one row per sample).
+        """
+        if isinstance(clocks, np.ndarray) and clocks.dtype == bool:
+            mask = clocks
+        else:
+            mask = np.zeros(len(self._clocks), dtype=bool)
+            mask[[self.slot(c) for c in clocks]] = True
+        return ClockValuationBatch(self._clocks, np.where(mask, 0.0, self._values))
+
+    def satisfies(self, constraint: ClockConstraint) -> np.ndarray:
+        """Evaluate a guard or invariant on every valuation in the batch
+
+        Returns
+        -------
+        :
+            A boolean array of shape ``(n,)``.
+        """
+        if isinstance(constraint, bool):
+            constraint = Boolean(constraint)
+        return constraint.compile().bind(self._clocks).evaluate_batch(self._values)
+
+
+@attr.s(auto_attribs=True, frozen=True, slots=True, repr=False)
+class DelayInterval:
+    """An atomic interval of non-negative delays
+
+    This is a lightweight replacement for the `portion` intervals in the
+    simulation hot path. As the delays allowed by a conjunction of clock
+    constraints always form a single (possibly empty) interval, there is no
+    need to handle disjunctions of intervals.
+
+    The interface mirrors the subset of :py:class:`portion.Interval` used in the
+    package (``lower``, ``upper``, ``left``, ``right``, ``empty``, ``atomic``,
+    ``contains`` and ``&``). Use :py:meth:`to_portion` to get the equivalent
+    `portion` interval.
+    """
+
+    lower: float = 0.0
+    upper: float = math.inf
+    left_closed: bool = True
+    right_closed: bool = False
+
+    @property
+    def empty(self) -> bool:
+        """``True`` if no delay is in the interval"""
+        return self.lower > self.upper or (
+            self.lower == self.upper and not (self.left_closed and self.right_closed)
+        )
+
+    @property
+    def atomic(self) -> bool:
+        """Always ``True``, as the interval is never a disjunction"""
+        return True
+
+    @property
+    def left(self) -> P.Bound:
+        """The left bound type as a `portion` bound"""
+        return P.CLOSED if self.left_closed else P.OPEN
+
+    @property
+    def right(self) -> P.Bound:
+        """The right bound type as a `portion` bound"""
+        return P.CLOSED if self.right_closed else P.OPEN
+
+    def contains(self, x: float) -> bool:
+        """Check if the delay ``x`` is in the interval"""
+        if x < self.lower or (x == self.lower and not self.left_closed):
+            return False
+        if x > self.upper or (x == self.upper and not self.right_closed):
+            return False
+        return True
+
+    __contains__ = contains
+
+    def __and__(self, other: "DelayInterval") -> "DelayInterval":
+        if not isinstance(other, DelayInterval):
+            return NotImplemented
+        if self.lower > other.lower:
+            lower, left_closed = self.lower, self.left_closed
+        elif self.lower < other.lower:
+            lower, left_closed = other.lower, other.left_closed
+        else:
+            lower, left_closed = self.lower, self.left_closed and other.left_closed
+        if self.upper < other.upper:
+            upper, right_closed = self.upper, self.right_closed
+        elif self.upper > other.upper:
+            upper, right_closed = other.upper, other.right_closed
+        else:
+            upper, right_closed = self.upper, self.right_closed and other.right_closed
+        return DelayInterval(lower, upper, left_closed, right_closed)
+
+    def to_portion(self) -> Interval:
+        """Convert to the equivalent `portion` interval"""
+        if self.empty:
+            return P.empty()
+        upper = P.inf if self.upper == math.inf else self.upper
+        return P.closed(self.lower, upper).replace(left=self.left, right=self.right)
+
+    def __repr__(self) -> str:
+        if self.empty:
+            return "()"
+        return "{}{},{}{}".format(
+            "[" if self.left_closed else "(",
+            self.lower,
+            "+inf" if self.upper == math.inf else self.upper,
+            "]" if self.right_closed else ")",
+        )
+
+
+_EMPTY_DELAYS = DelayInterval(0.0, 0.0, False, False)
+
+
+def delays(
+    values: ClockValuation, constraint: Union[ClockConstraint, CompiledConstraint]
+) -> DelayInterval:
     """Compute the allowable delay with the given clock valuations and constraints
 
-    .. todo::
-        Write the LaTeX version of the function.
+    .. math::
+
+        \\texttt{delays}(v, cc) = \\{ d \\in \\mathbb{R}_{\\geq 0} : v + d \\models cc \\}
 
     Parameters
     ----------
     values :
         A mapping from `Clock` to the valuation of the clock.
     constraint :
-        A clock constrain.
+        A clock constrain (or its compiled form).
 
     Returns
     -------
     :
         An interval that represents the set of possible delays that satisfy the
-        given clock constraint.
+        given clock constraint. This used to be a :py:class:`portion.Interval`;
+        use :py:meth:`DelayInterval.to_portion` where one is still needed.
+
+    """
+    if isinstance(constraint, bool):
+        constraint = Boolean(constraint)
+    if isinstance(constraint, CompiledConstraint):
+        compiled = constraint
+    else:
+        compiled = constraint.compile()
+    if not compiled.satisfiable:
+        return _EMPTY_DELAYS
+    if isinstance(values, ClockValuation):
+        values = values._values
+
+    lower, upper = 0.0, math.inf
+    left_closed, right_closed = True, False
+    for op, clock, rhs in compiled._singletons:
+        bound = rhs - values[clock]
+        closed = op is operator.ge or op is operator.le
+        if op is operator.ge or op is operator.gt:
+            if bound > lower:
+                lower, left_closed = bound, closed
+            elif bound == lower:
+                left_closed = left_closed and closed
+        else:
+            if bound < upper:
+                upper, right_closed = bound, closed
+            elif bound == upper:
+                right_closed = right_closed and closed
+    for op, clock1, clock2, rhs in compiled._diagonals:
+        # Diagonal constraints are invariant under delays.
+        if not op(values[clock1] - values[clock2], rhs):
+            return _EMPTY_DELAYS
+    return DelayInterval(lower, upper, left_closed, right_closed)
+
+
+class DelayBounds(NamedTuple):
+    """Per-sample bounds on the delays allowed by a clock constraint
+
+    Sample ``i`` may be delayed by any ``d`` between ``lower[i]`` and
+    ``upper[i]``, where the ends are included if ``left_closed[i]`` (resp.
+    ``right_closed[i]``) is ``True``. Unbounded delays have ``upper[i] ==
+    inf`` with an open right end.
+    """
+
+    lower: np.ndarray
+    upper: np.ndarray
+    left_closed: np.ndarray
+    right_closed: np.ndarray
+
+    @property
+    def empty(self) -> np.ndarray:
+        """Boolean array marking the samples that cannot be delayed at all"""
+        return (self.lower > self.upper) | (
+            (self.lower == self.upper) & ~(self.left_closed & self.right_closed)
+        )
+
+
+def delays_batch(
+    batch: ClockValuationBatch, constraint: ClockConstraint
+) -> DelayBounds:
+    """Compute the allowable delays for every valuation in a batch
+
+    This is the batched counterpart of :py:func:`delays`, computed directly on
+    the bounds of the flattened constraint without building any intervals.
 
+    Parameters
+    ----------
+    batch :
+        A batch of clock valuations.
+    constraint :
+        A clock constraint (typically a location invariant).
+
+    Returns
+    -------
+    :
+        The bounds on the delays, such that delaying sample ``i`` by ``d``
+        keeps it in the constraint iff ``d`` is within the ``i``-th bounds.
     """
     if isinstance(constraint, bool):
         constraint = Boolean(constraint)
-    if isinstance(constraint, Boolean):
-        if constraint.value:
-            return P.closed(0, P.inf)
-        return P.empty()
-    if isinstance(constraint, SingletonConstraint):
-        v_c = values[constraint.clock]
-        n: int = constraint.rhs
-        if constraint.op == ComparisonOp.GE:
-            return P.closed(n - v_c, P.inf)
-        if constraint.op == ComparisonOp.GT:
-            return P.open(n - v_c, P.inf)
-        if constraint.op == ComparisonOp.LE:
-            return P.closed(0, n - v_c)
-        if constraint.op == ComparisonOp.LT:
-            return P.closedopen(0, n - v_c)
-    if isinstance(constraint, And):
-        return delays(values, constraint.args[0]) & delays(values, constraint.args[1])
-    if isinstance(constraint, DiagonalConstraint):
-        v_c1 = values[constraint.lhs.clock1]
-        v_c2 = values[constraint.lhs.clock2]
-        op_fn = constraint.op.to_op()
-        if op_fn(v_c1 - v_c2, n):
-            return P.closed(0, P.inf)
-        return P.empty()
-    raise TypeError("Unsupported ClockConstraint type: {}".format(type(constraint)))
-
-
-__all__ = ["delays", "ClockConstraint", "Clock", "ClockValuation", "Interval"]
+    return constraint.compile().bind(batch.clocks).delay_bounds(batch.values)
+
+
+def _delay_bounds(compiled: CompiledConstraint, values: np.ndarray) -> DelayBounds:
+    n = values.shape[0]
+
+    lower = np.zeros(n)
+    upper = np.full(n, np.inf)
+    left_closed = np.ones(n, dtype=bool)
+    right_closed = np.zeros(n, dtype=bool)
+    sat = np.full(n, compiled.satisfiable, dtype=bool)
+
+    for atom in compiled.atoms:
+        if atom.clock2 is not None:
+            # Diagonal constraints are invariant under delays.
+            sat &= atom.op.to_op()(
+                values[:, atom.clock1] - values[:, atom.clock2], atom.rhs
+            )
+            continue
+        bound = atom.rhs - values[:, atom.clock1]
+        closed = not atom.op.is_strict
+        if atom.op.is_lower:
+            left_closed = np.where(
+                bound > lower,
+                closed,
+                np.where(bound == lower, left_closed & closed, left_closed),
+            )
+            lower = np.maximum(lower, bound)
+        else:
+            right_closed = np.where(
+                bound < upper,
+                closed,
+                np.where(bound == upper, right_closed & closed, right_closed),
+            )
+            upper = np.minimum(upper, bound)
+
+    # Collapse the unsatisfiable samples to the empty interval (0, 0)
+    lower[~sat] = 0
+    upper[~sat] = 0
+    left_closed &= sat
+    right_closed &= sat
+    return DelayBounds(lower, upper, left_closed, right_closed)
+
+
+__all__ = [
+    "delays",
+    "delays_batch",
+    "compile_constraint",
+    "ClockConstraint",
+    "CompiledConstraint",
+    "DelayBounds",
+    "DelayInterval",
+    "Clock",
+    "ClockValuation",
+    "ClockValuationBatch",
+    "Interval",
+]
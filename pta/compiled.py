@@ -0,0 +1,527 @@
+"""Integer-indexed, table-based representation of a PTA
+
+A `PTA` is defined by arbitrary callables for its transitions and invariants,
+which the simulators end up calling several times per step. For PTAs with
+a finite set of reachable locations, `CompiledPTA` enumerates the locations
+once and materializes everything into flat tables:
+
+- locations, clocks and action labels are assigned integer ids;
+- the outgoing edges of each location are stored contiguously, in CSR form,
+  with the guard of each edge compiled into a `CompiledConstraint`;
+- the targets of each edge are stored contiguously, with their probabilities,
+  the target location ids and the reset clocks as a boolean mask.
+
+The `CompiledPTA` exposes the same interface as `PTA`, so it can be passed
+directly to the simulators in `pta.mdp`.
+"""
+
+import bisect
+import random
+from collections import deque
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Mapping, Tuple
+
+import attr
+import numpy as np
+
+from pta.clock import (
+    Clock,
+    ClockConstraint,
+    ClockValuation,
+    CompiledConstraint,
+    DelayBounds,
+    DelayInterval,
+    compile_constraint,
+    delays,
+)
+from pta.distributions import DiscreteDistribution
+from pta.index import GuardIndex
+from pta.pta import Target, Transition
+from pta.spaces import Space
+
+Action = Hashable
+Location = Hashable
+
+# Locations with at least this many outgoing edges use a `GuardIndex`
+INDEX_THRESHOLD = 16
+
+
+def clock_order(clocks: Iterable[Clock]) -> Tuple[Clock, ...]:
+    """A deterministic ordering of a set of clocks
+
+    The order does not depend on the iteration order of the set (which, for
+    strings, changes across processes), so the clock slots are stable.
+    """
+    return tuple(sorted(clocks, key=repr))
+
+
+@attr.s(frozen=True, repr=False)
+class BoundTable:
+    """Dense per-clock bounds of a sequence of compiled constraints
+
+    Row ``i`` holds the tightest lower and upper bound (and their strictness)
+    on each clock in the ``i``-th constraint, with ``-inf``/``inf`` for missing
+    bounds. This allows evaluating different constraints on different
+    valuations in one vectorized operation. Diagonal constraints cannot be
+    represented as per-clock bounds, so they are kept as bound
+    `CompiledConstraint` and evaluated separately.
+    """
+
+    constraints: Tuple[CompiledConstraint, ...] = attr.ib(converter=tuple)
+    n_clocks: int = attr.ib()
+
+    lower: np.ndarray = attr.ib(init=False)
+    lower_strict: np.ndarray = attr.ib(init=False)
+    upper: np.ndarray = attr.ib(init=False)
+    upper_strict: np.ndarray = attr.ib(init=False)
+    satisfiable: np.ndarray = attr.ib(init=False)
+    has_diagonal: np.ndarray = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        shape = (len(self.constraints), self.n_clocks)
+        lower, upper = np.full(shape, -np.inf), np.full(shape, np.inf)
+        lower_strict, upper_strict = np.zeros(shape, bool), np.zeros(shape, bool)
+        for i, cc in enumerate(self.constraints):
+            for atom in cc.atoms:
+                if atom.clock2 is not None:
+                    continue
+                # Compiled constraints hold at most one bound per clock and side
+                if atom.op.is_lower:
+                    lower[i, atom.clock1] = atom.rhs
+                    lower_strict[i, atom.clock1] = atom.op.is_strict
+                else:
+                    upper[i, atom.clock1] = atom.rhs
+                    upper_strict[i, atom.clock1] = atom.op.is_strict
+        object.__setattr__(self, "lower", lower)
+        object.__setattr__(self, "lower_strict", lower_strict)
+        object.__setattr__(self, "upper", upper)
+        object.__setattr__(self, "upper_strict", upper_strict)
+        object.__setattr__(
+            self,
+            "satisfiable",
+            np.array([cc.satisfiable for cc in self.constraints], dtype=bool),
+        )
+        object.__setattr__(
+            self,
+            "has_diagonal",
+            np.array(
+                [
+                    any(a.clock2 is not None for a in cc.atoms)
+                    for cc in self.constraints
+                ],
+                dtype=bool,
+            ),
+        )
+
+    def _diagonals(self, ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Evaluate the constraints with diagonals on their rows (others are ``True``)"""
+        ret = np.ones(len(ids), dtype=bool)
+        rows = np.flatnonzero(self.has_diagonal[ids])
+        for i in np.unique(ids[rows]):
+            sel = rows[ids[rows] == i]
+            ret[sel] = self.constraints[i].evaluate_batch(values[sel])
+        return ret
+
+    def satisfied(self, ids: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """Check if ``values[j]`` satisfies constraint ``ids[j]`` for every ``j``
+
+        Parameters
+        ----------
+        ids:
+            An ``(n,)`` array of constraint ids.
+        values:
+            An ``(n, k)`` matrix of clock valuations.
+        """
+        lower, upper = self.lower[ids], self.upper[ids]
+        ok = (values > lower) | ((values == lower) & ~self.lower_strict[ids])
+        ok &= (values < upper) | ((values == upper) & ~self.upper_strict[ids])
+        return ok.all(axis=1) & self.satisfiable[ids] & self._diagonals(ids, values)
+
+    def delays(self, ids: np.ndarray, values: np.ndarray) -> DelayBounds:
+        """Compute the delays after which ``values[j]`` satisfies constraint ``ids[j]``
+
+        .. seealso::
+            :py:func:`pta.clock.delays_batch`
+        """
+        lower_bound = self.lower[ids] - values
+        upper_bound = self.upper[ids] - values
+        lower = np.maximum(lower_bound.max(axis=1, initial=0.0), 0.0)
+        upper = upper_bound.min(axis=1, initial=np.inf)
+        # An end is open if any of the bounds attaining it is strict
+        left_closed = ~(
+            (lower_bound == lower[:, np.newaxis]) & self.lower_strict[ids]
+        ).any(axis=1)
+        right_closed = ~(
+            (upper_bound == upper[:, np.newaxis]) & self.upper_strict[ids]
+        ).any(axis=1) & np.isfinite(upper)
+
+        sat = self.satisfiable[ids] & self._diagonals(ids, values)
+        lower[~sat] = 0
+        upper[~sat] = 0
+        left_closed &= sat
+        right_closed &= sat
+        return DelayBounds(lower, upper, left_closed, right_closed)
+
+    def __len__(self) -> int:
+        return len(self.constraints)
+
+    def __repr__(self) -> str:
+        return "BoundTable(n={}, n_clocks={})".format(len(self), self.n_clocks)
+
+
+@attr.s(frozen=True, eq=False, repr=False)
+class CompiledPTA:
+    """A PTA materialized into integer-indexed tables
+
+    Do not construct this directly, instead use :py:meth:`PTA.compile` (or
+    :py:meth:`CompiledPTA.from_pta`).
+
+    The outgoing edges of the location with id ``l`` are the edge ids in
+    ``range(edge_ptr[l], edge_ptr[l + 1])``, and the targets of the edge ``e``
+    are the target ids in ``range(target_ptr[e], target_ptr[e + 1])``. The
+    action ids ``0, ..., n_controllable - 1`` are the (controllable) actions of
+    the PTA, sorted by their ``repr``, and any other label appearing on an edge
+    comes after them. ``edge_table[l, a]`` is the id of the edge labelled with
+    action ``a`` out of location ``l``, or ``-1`` if there is none.
+
+    The guards and invariants are also available as dense `BoundTable`, in
+    `guard_bounds` and `invariant_bounds`, for vectorized evaluation.
+    """
+
+    location_space: Space = attr.ib()
+    clock_order: Tuple[Clock, ...] = attr.ib(converter=tuple)
+    locations: Tuple[Location, ...] = attr.ib(converter=tuple)
+    action_labels: Tuple[Action, ...] = attr.ib(converter=tuple)
+    n_controllable: int = attr.ib()
+    initial: int = attr.ib()
+
+    edge_ptr: np.ndarray = attr.ib()
+    edge_action: np.ndarray = attr.ib()
+    edge_guard: Tuple[CompiledConstraint, ...] = attr.ib(converter=tuple)
+
+    target_ptr: np.ndarray = attr.ib()
+    target_location: np.ndarray = attr.ib()
+    target_prob: np.ndarray = attr.ib()
+    target_reset: np.ndarray = attr.ib()
+
+    invariant: Tuple[CompiledConstraint, ...] = attr.ib(converter=tuple)
+
+    _location_index: Dict[Location, int] = attr.ib(init=False)
+    _action_index: Dict[Action, int] = attr.ib(init=False)
+    _target_cdf: List[List[float]] = attr.ib(init=False)
+    _transition_maps: List[Mapping[Action, Transition]] = attr.ib(init=False)
+    _invariant_constraints: List[ClockConstraint] = attr.ib(init=False)
+
+    guard_bounds: BoundTable = attr.ib(init=False)
+    invariant_bounds: BoundTable = attr.ib(init=False)
+    edge_table: np.ndarray = attr.ib(init=False)
+    target_cdf: np.ndarray = attr.ib(init=False)
+    _guard_indices: Dict[int, GuardIndex] = attr.ib(init=False, factory=dict)
+
+    def __attrs_post_init__(self):
+        object.__setattr__(
+            self, "_location_index", {loc: i for i, loc in enumerate(self.locations)}
+        )
+        object.__setattr__(
+            self, "_action_index", {a: i for i, a in enumerate(self.action_labels)}
+        )
+        probs = self.target_prob.tolist()
+        ptr = self.target_ptr.tolist()
+        cdf = []
+        for e in range(self.n_edges):
+            cumulative = np.cumsum(probs[ptr[e] : ptr[e + 1]]).tolist()
+            if len(cumulative) == 0 or not cumulative[-1] > 0:
+                raise ValueError(
+                    "The targets of the edge {} have no probability".format(e)
+                )
+            cdf.append([c / cumulative[-1] for c in cumulative])
+        object.__setattr__(self, "_target_cdf", cdf)
+        # Offsetting the CDF of edge `e` by `e` makes it increasing over all
+        # targets, so targets of different edges can be sampled in one search.
+        object.__setattr__(
+            self,
+            "target_cdf",
+            np.array([e + c for e in range(self.n_edges) for c in cdf[e]], dtype=float),
+        )
+        object.__setattr__(
+            self,
+            "guard_bounds",
+            BoundTable(
+                [g.bind(self.clock_order) for g in self.edge_guard], self.n_clocks
+            ),
+        )
+        object.__setattr__(
+            self,
+            "invariant_bounds",
+            BoundTable(
+                [inv.bind(self.clock_order) for inv in self.invariant], self.n_clocks
+            ),
+        )
+        edge_table = np.full((self.n_locations, self.n_actions), -1, dtype=np.intp)
+        for loc_id in range(self.n_locations):
+            for e in self.edges(loc_id):
+                edge_table[loc_id, self.edge_action[e]] = e
+        object.__setattr__(self, "edge_table", edge_table)
+        object.__setattr__(self, "_transition_maps", [None] * self.n_locations)
+        object.__setattr__(
+            self,
+            "_invariant_constraints",
+            [inv.to_constraint() for inv in self.invariant],
+        )
+
+    @classmethod
+    def from_pta(cls, pta) -> "CompiledPTA":
+        """Enumerate the locations of a PTA and materialize its tables
+
+        If the location space of the PTA is iterable, all of its locations are
+        enumerated. In any case, every location reachable (in the discrete
+        graph of the PTA) from the initial location is included.
+
+        Parameters
+        ----------
+        pta: PTA
+            A PTA with finitely many (reachable) locations.
+        """
+        clocks = clock_order(pta.clocks)
+        actions: List[Action] = sorted(pta.actions, key=repr)
+        action_index = {a: i for i, a in enumerate(actions)}
+        n_controllable = len(actions)
+
+        locations: List[Location] = [pta.initial_location]
+        location_index = {pta.initial_location: 0}
+        if isinstance(pta.location_space, Iterable):
+            for loc in pta.location_space:
+                if loc not in location_index:
+                    location_index[loc] = len(locations)
+                    locations.append(loc)
+
+        edge_ptr = [0]
+        edge_action: List[int] = []
+        edge_guard: List[CompiledConstraint] = []
+        target_ptr = [0]
+        target_location: List[int] = []
+        target_prob: List[float] = []
+        target_reset: List[List[bool]] = []
+        invariant: List[CompiledConstraint] = []
+
+        queue = deque(range(len(locations)))
+        visited = set(queue)
+        # Locations are processed in id order, so the CSR tables line up.
+        while len(queue) > 0:
+            loc_id = queue.popleft()
+            loc = locations[loc_id]
+            invariant.append(compile_constraint(pta.invariants(loc)))
+            for label, (guard, dist) in pta.transitions(loc).items():
+                if label not in action_index:
+                    action_index[label] = len(actions)
+                    actions.append(label)
+                edge_action.append(action_index[label])
+                edge_guard.append(compile_constraint(guard))
+                # The alias table keeps the targets in the order they were
+                # given (`support` is a set), so the target ids are stable.
+                for reset, target in dist.alias_table.support:
+                    prob = dist((reset, target))
+                    if target not in location_index:
+                        location_index[target] = len(locations)
+                        locations.append(target)
+                    tgt_id = location_index[target]
+                    if tgt_id not in visited:
+                        visited.add(tgt_id)
+                        queue.append(tgt_id)
+                    target_location.append(tgt_id)
+                    target_prob.append(prob)
+                    target_reset.append([c in reset for c in clocks])
+                target_ptr.append(len(target_location))
+            edge_ptr.append(len(edge_action))
+
+        return cls(
+            location_space=pta.location_space,
+            clock_order=clocks,
+            locations=locations,
+            action_labels=actions,
+            n_controllable=n_controllable,
+            initial=0,
+            edge_ptr=np.array(edge_ptr, dtype=np.intp),
+            edge_action=np.array(edge_action, dtype=np.intp),
+            edge_guard=edge_guard,
+            target_ptr=np.array(target_ptr, dtype=np.intp),
+            target_location=np.array(target_location, dtype=np.intp),
+            target_prob=np.array(target_prob, dtype=float),
+            target_reset=np.array(target_reset, dtype=bool).reshape(
+                len(target_location), len(clocks)
+            ),
+            invariant=invariant,
+        )
+
+    @property
+    def n_locations(self) -> int:
+        return len(self.locations)
+
+    @property
+    def n_clocks(self) -> int:
+        return len(self.clock_order)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.edge_action)
+
+    @property
+    def n_actions(self) -> int:
+        return len(self.action_labels)
+
+    def max_constants(self) -> Dict[Clock, int]:
+        """Get the largest constant each clock is compared against
+
+        The constants of diagonal constraints count towards both clocks.
+        """
+        ret = {clock: 0 for clock in self.clock_order}
+        for cc in self.edge_guard + self.invariant:
+            for atom in cc.atoms:
+                ret[atom.clock1] = max(ret[atom.clock1], atom.rhs)
+                if atom.clock2 is not None:
+                    ret[atom.clock2] = max(ret[atom.clock2], atom.rhs)
+        return ret
+
+    def location_id(self, loc: Location) -> int:
+        """Get the integer id of a location"""
+        return self._location_index[loc]
+
+    def action_id(self, action: Action) -> int:
+        """Get the integer id of an action label"""
+        return self._action_index[action]
+
+    def edges(self, loc_id: int) -> range:
+        """Get the ids of the outgoing edges of a location"""
+        return range(self.edge_ptr[loc_id], self.edge_ptr[loc_id + 1])
+
+    def targets(self, edge_id: int) -> range:
+        """Get the ids of the targets of an edge"""
+        return range(self.target_ptr[edge_id], self.target_ptr[edge_id + 1])
+
+    def guard_index(self, loc_id: int) -> GuardIndex:
+        """Get the (lazily built) index over the guards of a location's edges"""
+        index = self._guard_indices.get(loc_id)
+        if index is None:
+            edges = self.edges(loc_id)
+            index = GuardIndex(
+                edges, [self.edge_guard[e] for e in edges], self.clock_order
+            )
+            self._guard_indices[loc_id] = index
+        return index
+
+    def enabled_edges(self, loc_id: int, values: Mapping[Clock, float]) -> List[int]:
+        """Get the ids of the outgoing edges of a location whose guards hold
+
+        For locations with many outgoing edges, this uses the location's
+        :py:meth:`guard_index` instead of checking every guard.
+        """
+        edges = self.edges(loc_id)
+        if len(edges) >= INDEX_THRESHOLD:
+            return self.guard_index(loc_id).enabled(values)
+        return [e for e in edges if self.edge_guard[e](values)]
+
+    def edges_enabled_within(
+        self, loc_id: int, values: Mapping[Clock, float], horizon: float
+    ) -> Dict[int, DelayInterval]:
+        """Get the ids of the edges that become enabled within ``horizon`` time units
+
+        .. seealso::
+            :py:meth:`pta.index.GuardIndex.enabled_within`
+        """
+        return self.guard_index(loc_id).enabled_within(values, horizon)
+
+    def sample_target(self, edge_id: int) -> int:
+        """Sample a target id of an edge according to its distribution"""
+        offset = bisect.bisect_right(self._target_cdf[edge_id], random.random())
+        return self.target_ptr[edge_id] + min(
+            offset, len(self._target_cdf[edge_id]) - 1
+        )
+
+    def sample_targets(
+        self, edge_ids: np.ndarray, rng: np.random.Generator
+    ) -> np.ndarray:
+        """Sample a target id for each edge id in an array"""
+        u = edge_ids + rng.random(len(edge_ids))
+        targets = np.searchsorted(self.target_cdf, u, side="right")
+        return np.minimum(targets, self.target_ptr[edge_ids + 1] - 1)
+
+    def reset_clocks(self, target_id: int) -> FrozenSet[Clock]:
+        """Get the set of clocks reset by a target"""
+        return frozenset(
+            c for c, r in zip(self.clock_order, self.target_reset[target_id]) if r
+        )
+
+    # The following mirror the interface of `PTA`, so that a `CompiledPTA`
+    # can be used in its place.
+
+    @property
+    def clocks(self) -> FrozenSet[Clock]:
+        """Get the set of clocks in the PTA"""
+        return frozenset(self.clock_order)
+
+    @property
+    def actions(self) -> FrozenSet[Action]:
+        """Get the set of (controllable) actions in the PTA"""
+        return frozenset(self.action_labels[: self.n_controllable])
+
+    @property
+    def initial_location(self) -> Location:
+        """Get the initial location of the PTA"""
+        return self.locations[self.initial]
+
+    def transitions(self, loc: Location) -> Mapping[Action, Transition]:
+        loc_id = self._location_index[loc]
+        ret = self._transition_maps[loc_id]
+        if ret is None:
+            ret = {
+                self.action_labels[self.edge_action[e]]: Transition(
+                    self.edge_guard[e].to_constraint(), self._target_dist(e)
+                )
+                for e in self.edges(loc_id)
+            }
+            self._transition_maps[loc_id] = ret
+        return ret
+
+    def invariants(self, loc: Location) -> ClockConstraint:
+        return self._invariant_constraints[self._location_index[loc]]
+
+    def enabled_actions(
+        self, loc: Location, values: ClockValuation
+    ) -> Mapping[Action, DiscreteDistribution[Target]]:
+        """Return the set of enabled edges available at a location with given clock valuation.
+
+        .. seealso::
+            :py:meth:`PTA.enabled_actions`
+        """
+        loc_id = self._location_index[loc]
+        transitions = self.transitions(loc)
+        ret = dict()
+        for e in self.enabled_edges(loc_id, values):
+            label = self.action_labels[self.edge_action[e]]
+            ret[label] = transitions[label].target_dist
+        return ret
+
+    def allowed_delays(self, loc: Location, values: ClockValuation) -> DelayInterval:
+        """Return the interval of delays that satisfy the invariant at the
+        given location and clock valuation.
+
+        .. seealso::
+            :py:meth:`PTA.allowed_delays`
+        """
+        return delays(values, self.invariants(loc))
+
+    def _target_dist(self, edge_id: int) -> DiscreteDistribution[Target]:
+        dist: Dict[Target, float] = dict()
+        for t in self.targets(edge_id):
+            target = Target(
+                self.reset_clocks(t), self.locations[self.target_location[t]]
+            )
+            dist[target] = dist.get(target, 0) + float(self.target_prob[t])
+        return DiscreteDistribution(dist)
+
+    def __repr__(self) -> str:
+        return "CompiledPTA(n_locations={}, n_clocks={}, n_edges={})".format(
+            self.n_locations, self.n_clocks, self.n_edges
+        )
+
+
+__all__ = ["BoundTable", "CompiledPTA", "clock_order"]
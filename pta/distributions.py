@@ -1,14 +1,117 @@
 """Collection of useful distributions"""
+
 import functools
 import random
-from typing import Generic, Hashable, Mapping, Sequence, Set, TypeVar
+from typing import (
+    Generic,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 import attr
+import numpy as np
 
-# TODO: Is it worth using numpy or torch distributions instead? No (I think)...
 T = TypeVar("T", bound=Hashable)
 
 
+def _random_uniforms(n: int) -> np.ndarray:
+    """Draw ``n`` uniform floats in [0, 1) at once from the `random` module
+
+    The floats are made from 64-bit words of a single call to
+    `random.getrandbits`, so no generator state is shared between threads or
+    distributions, and `random.seed` makes all the draws reproducible.
+    """
+    if n == 0:
+        return np.empty(0)
+    words = np.frombuffer(random.getrandbits(64 * n).to_bytes(8 * n, "little"), "<u8")
+    # Keep the 53 high bits, the precision of a double.
+    return (words >> np.uint64(11)) * (1.0 / (1 << 53))
+
+
+@attr.s(frozen=True, slots=True)
+class _AliasTable(Generic[T]):
+    """Walker's alias table for O(1) sampling from a discrete distribution [Vose1991]_
+
+    The table is stored both as Python lists (fast single draws) and NumPy
+    arrays (vectorized draws).
+    """
+
+    support: Tuple[T, ...] = attr.ib()
+    prob: List[float] = attr.ib()
+    alias: List[int] = attr.ib()
+
+    _support_array: np.ndarray = attr.ib(init=False)
+    _prob_array: np.ndarray = attr.ib(init=False)
+    _alias_array: np.ndarray = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        # Build an object array element-wise, as the support may contain tuples.
+        support_array = np.empty(len(self.support), dtype=object)
+        for i, x in enumerate(self.support):
+            support_array[i] = x
+        object.__setattr__(self, "_support_array", support_array)
+        object.__setattr__(self, "_prob_array", np.array(self.prob))
+        object.__setattr__(self, "_alias_array", np.array(self.alias, dtype=np.intp))
+
+    @classmethod
+    def build(cls, dist: Mapping[T, float]) -> "_AliasTable[T]":
+        """Build the alias table using Vose's algorithm"""
+        support = tuple(dist.keys())
+        n = len(support)
+        total = sum(dist.values())
+        scaled = [n * dist[x] / total for x in support]
+        prob = [1.0] * n
+        alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+        while len(small) > 0 and len(large) > 0:
+            lo, hi = small.pop(), large.pop()
+            prob[lo], alias[lo] = scaled[lo], hi
+            scaled[hi] = (scaled[hi] + scaled[lo]) - 1
+            if scaled[hi] < 1:
+                small.append(hi)
+            else:
+                large.append(hi)
+        # Whatever remains has probability 1 (up to floating point errors).
+        return cls(support, prob, alias)
+
+    def draw(self) -> T:
+        """Draw a single sample using the `random` module"""
+        i = int(random.random() * len(self.support))
+        if random.random() < self.prob[i]:
+            return self.support[i]
+        return self.support[self.alias[i]]
+
+    def draw_indices(
+        self, k: int, rng: Optional[np.random.Generator] = None
+    ) -> np.ndarray:
+        """Draw ``k`` indices into the support at once
+
+        Without ``rng``, the draws use the `random` module (see
+        `_random_uniforms`).
+        """
+        if rng is None:
+            u = _random_uniforms(2 * k)
+            idx = (u[:k] * len(self.support)).astype(np.intp)
+            coins = u[k:]
+        else:
+            idx = rng.integers(len(self.support), size=k)
+            coins = rng.random(k)
+        keep = coins < self._prob_array[idx]
+        return np.where(keep, idx, self._alias_array[idx])
+
+    def draw_many(self, k: int, rng: Optional[np.random.Generator] = None) -> List[T]:
+        """Draw ``k`` samples at once"""
+        return self._support_array[self.draw_indices(k, rng)].tolist()
+
+
 @attr.s(frozen=True, auto_attribs=True, hash=False)
 class DiscreteDistribution(Generic[T]):
     """A Discrete distribution over a finite, countable support
@@ -18,20 +121,48 @@ class DiscreteDistribution(Generic[T]):
         p = uniform(range(10))
         assert p(5) == 1/10
 
+    Sampling uses an alias table that is built on the first call to `sample`,
+    after which drawing a single value takes constant time irrespective of the
+    size of the support.
     """
 
     _dist: Mapping[T, float] = attr.ib()
+    _table: Optional[_AliasTable[T]] = attr.ib(
+        init=False, default=None, eq=False, repr=False
+    )
+
+    @_dist.validator
+    def _check_weights(self, attribute, value: Mapping[T, float]):
+        if not sum(value.values()) > 0:
+            raise ValueError(
+                "The weights of a distribution must sum to a positive value, "
+                "got {!r}".format(value)
+            )
 
-    def sample(self, *, k: int = 1) -> Sequence[T]:
+    @property
+    def alias_table(self) -> _AliasTable[T]:
+        if self._table is None:
+            object.__setattr__(self, "_table", _AliasTable.build(self._dist))
+        return self._table  # type: ignore
+
+    def sample(
+        self, *, k: int = 1, rng: Optional[np.random.Generator] = None
+    ) -> Sequence[T]:
         """Sample a value from the support
 
         Parameters
         ----------
         k : int
             Number of items to sample from the distribution.
+        rng : numpy.random.Generator, optional
+            Random number generator used when drawing more than one sample. By
+            default, the draws use the `random` module, so `random.seed` makes
+            all draws reproducible.
         """
-        support, distribution = zip(*self._dist.items())
-        return random.choices(support, distribution, k=k)
+        table = self.alias_table
+        if k == 1 and rng is None:
+            return [table.draw()]
+        return table.draw_many(k, rng)
 
     @property
     def support(self) -> Set[T]:
@@ -0,0 +1,187 @@
+"""Index over the guards of the outgoing edges of a location
+
+Checking which edges are enabled at a location requires evaluating the guard
+of every outgoing edge. For locations with many edges whose guards are
+(mostly) simple per-clock bounds, a `GuardIndex` files each edge under the
+clock its guard bounds most tightly, as an interval ``[lower, upper]`` on that
+clock. The intervals filed under a clock are sorted by their lower bound and
+covered by a segment tree of their upper bounds, so the intervals containing
+a given clock value can be found in ``O(log n + k)`` time, where ``k`` is the
+number of matches. Only those edges (and the few edges whose guards have no
+bounds at all) are then checked against their full guard.
+"""
+
+import bisect
+import math
+from typing import Dict, Hashable, List, Mapping, Tuple
+
+import attr
+
+from pta.clock import Clock, CompiledConstraint, DelayInterval, delays
+
+Edge = Hashable
+
+
+def _bounds(guard: CompiledConstraint, clock: Clock) -> Tuple[float, float]:
+    """Get the (non-strict) lower and upper bounds of a guard on a clock"""
+    lower, upper = -math.inf, math.inf
+    for atom in guard.atoms:
+        if atom.clock1 != clock or atom.clock2 is not None:
+            continue
+        if atom.op.is_lower:
+            lower = max(lower, atom.rhs)
+        else:
+            upper = min(upper, atom.rhs)
+    return lower, upper
+
+
+@attr.s(frozen=True, repr=False)
+class _IntervalTree:
+    """Static stabbing index over closed intervals sorted by their lower bound"""
+
+    lower: List[float] = attr.ib()
+    upper: List[float] = attr.ib()
+    items: List[int] = attr.ib()
+    # Implicit binary tree: node i covers its children 2i and 2i + 1, and the
+    # leaves start at `_size`. Each node stores the max upper bound below it.
+    _size: int = attr.ib(init=False)
+    _max_upper: List[float] = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        size = 1
+        while size < len(self.items):
+            size *= 2
+        max_upper = [-math.inf] * (2 * size)
+        max_upper[size : size + len(self.upper)] = self.upper
+        for i in range(size - 1, 0, -1):
+            max_upper[i] = max(max_upper[2 * i], max_upper[2 * i + 1])
+        object.__setattr__(self, "_size", size)
+        object.__setattr__(self, "_max_upper", max_upper)
+
+    @classmethod
+    def build(cls, intervals: List[Tuple[float, float, int]]) -> "_IntervalTree":
+        intervals = sorted(intervals)
+        return cls(
+            [lo for lo, _, _ in intervals],
+            [up for _, up, _ in intervals],
+            [i for _, _, i in intervals],
+        )
+
+    def stab(self, low: float, high: float, out: List[int]):
+        """Append the items of the intervals intersecting ``[low, high]`` to ``out``"""
+        # Only the prefix of intervals starting before `high` can intersect.
+        n = bisect.bisect_right(self.lower, high)
+        if n == 0:
+            return
+        stack = [(1, 0, self._size)]
+        while len(stack) > 0:
+            node, start, end = stack.pop()
+            if start >= n or self._max_upper[node] < low:
+                continue
+            if node >= self._size:
+                out.append(self.items[start])
+                continue
+            mid = (start + end) // 2
+            stack.append((2 * node + 1, mid, end))
+            stack.append((2 * node, start, mid))
+
+
+@attr.s(frozen=True, repr=False)
+class GuardIndex:
+    """Per-clock interval trees over a set of guards
+
+    Parameters
+    ----------
+    edges:
+        The edges (any hashable identifier) being indexed.
+    guards:
+        The compiled guard of each edge.
+    clocks:
+        The clocks in the PTA.
+    """
+
+    edges: Tuple[Edge, ...] = attr.ib(converter=tuple)
+    guards: Tuple[CompiledConstraint, ...] = attr.ib(converter=tuple)
+    clocks: Tuple[Clock, ...] = attr.ib(converter=tuple)
+
+    _trees: Dict[Clock, _IntervalTree] = attr.ib(init=False)
+    # Satisfiable guards that do not bound any clock
+    _unbounded: List[int] = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        if len(self.edges) != len(self.guards):
+            raise ValueError("Expected one guard per edge")
+        intervals: Dict[Clock, List[Tuple[float, float, int]]] = {
+            clock: [] for clock in self.clocks
+        }
+        unbounded = []
+        for i, guard in enumerate(self.guards):
+            if not guard.satisfiable:
+                # Unsatisfiable guards are never enabled, so they are left out.
+                continue
+            bounds = {clock: _bounds(guard, clock) for clock in self.clocks}
+            bounded = [c for c in self.clocks if bounds[c] != (-math.inf, math.inf)]
+            if len(bounded) == 0:
+                unbounded.append(i)
+                continue
+            # File the edge under the clock with the narrowest bounds, among
+            # those bounded on at least one side
+            key = min(bounded, key=lambda c: bounds[c][1] - bounds[c][0])
+            lower, upper = bounds[key]
+            intervals[key].append((lower, upper, i))
+        object.__setattr__(
+            self,
+            "_trees",
+            {
+                clock: _IntervalTree.build(ivs)
+                for clock, ivs in intervals.items()
+                if len(ivs) > 0
+            },
+        )
+        object.__setattr__(self, "_unbounded", unbounded)
+
+    def _candidates(self, values: Mapping[Clock, float], horizon: float) -> List[int]:
+        """Guards whose bounds on their key clock may hold within ``horizon``"""
+        ret = list(self._unbounded)
+        for clock, tree in self._trees.items():
+            v = values[clock]
+            tree.stab(v, v + horizon, ret)
+        ret.sort()
+        return ret
+
+    def enabled(self, values: Mapping[Clock, float]) -> List[Edge]:
+        """Get the edges whose guards hold for the given valuation
+
+        The edges are returned in the order they were indexed.
+        """
+        return [
+            self.edges[i] for i in self._candidates(values, 0) if self.guards[i](values)
+        ]
+
+    def enabled_within(
+        self, values: Mapping[Clock, float], horizon: float
+    ) -> Dict[Edge, DelayInterval]:
+        """Get the edges that become enabled within the next ``horizon`` time units
+
+        Returns
+        -------
+        :
+            A mapping from each such edge to the interval of delays in
+            ``[0, horizon]`` after which its guard holds.
+        """
+        window = DelayInterval(0.0, horizon, True, True)
+        ret = dict()
+        for i in self._candidates(values, horizon):
+            interval = delays(values, self.guards[i]) & window
+            if not interval.empty:
+                ret[self.edges[i]] = interval
+        return ret
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def __repr__(self) -> str:
+        return "GuardIndex(n_edges={}, clocks={})".format(len(self), self.clocks)
+
+
+__all__ = ["GuardIndex"]
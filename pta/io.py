@@ -0,0 +1,184 @@
+"""Compact on-disk format for PTAs with finitely many locations
+
+A `PTA` is defined by Python callables, so it cannot be stored as such.
+Instead, `save` writes the tables of its `CompiledPTA` into a single ``.npz``
+archive, and `load` reads them back in bulk into a `CompiledPTA`, without
+calling any user code. The archive holds:
+
+- ``meta``: the JSON-encoded labels of the locations, clocks and actions (as
+  UTF-8 bytes), which must be JSON values (tuples are restored from lists);
+- the edge and target tables of the `CompiledPTA` (see its documentation);
+- the guards and invariants as bound lists: the atoms of constraint ``i`` are
+  the rows ``guard_ptr[i]:guard_ptr[i + 1]`` of ``guard_atoms`` (and
+  similarly for ``invariant_ptr`` and ``invariant_atoms``), each row being
+  ``(op, clock1, clock2, rhs)`` with clock ids in the clock order and ``-1``
+  for the missing ``clock2``. Unsatisfiable constraints are flagged in
+  ``guard_false`` and ``invariant_false``.
+"""
+
+import json
+from typing import IO, Any, Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from pta.clock import Atom, Clock, ComparisonOp, CompiledConstraint
+from pta.compiled import CompiledPTA
+from pta.pta import PTA
+from pta.spaces import FiniteSpace
+
+#: The version of the format written by `save`
+VERSION = 1
+
+_OPS = list(ComparisonOp)
+_OP_CODES = {op: i for i, op in enumerate(_OPS)}
+
+File = Union[str, IO[bytes]]
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, tuple):
+        return [_to_json(v) for v in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    raise TypeError("Cannot save the label {!r}: not a JSON value".format(value))
+
+
+def _from_json(value: Any) -> Any:
+    if isinstance(value, list):
+        return tuple(_from_json(v) for v in value)
+    return value
+
+
+def _pack(
+    constraints: Sequence[CompiledConstraint], slots: dict
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Flatten constraints into (pointers, atom rows, unsatisfiable flags)"""
+    ptr = np.zeros(len(constraints) + 1, dtype=np.int64)
+    rows: List[Tuple[int, int, int, int]] = []
+    for i, cc in enumerate(constraints):
+        for atom in cc.atoms:
+            clock2 = -1 if atom.clock2 is None else slots[atom.clock2]
+            rows.append((_OP_CODES[atom.op], slots[atom.clock1], clock2, atom.rhs))
+        ptr[i + 1] = len(rows)
+    atoms = np.array(rows, dtype=np.int64).reshape(len(rows), 4)
+    unsat = np.array([not cc.satisfiable for cc in constraints], dtype=bool)
+    return ptr, atoms, unsat
+
+
+def _unpack(
+    ptr: np.ndarray, atoms: np.ndarray, unsat: np.ndarray, clocks: Sequence[Clock]
+) -> List[CompiledConstraint]:
+    ops = [_OPS[code] for code in atoms[:, 0].tolist()]
+    clock1 = [clocks[i] for i in atoms[:, 1].tolist()]
+    clock2 = [None if i < 0 else clocks[i] for i in atoms[:, 2].tolist()]
+    rows = [Atom(*row) for row in zip(ops, clock1, clock2, atoms[:, 3].tolist())]
+    ptr = ptr.tolist()
+    # Models tend to reuse the same few constraints, which are only built once
+    unique: Dict[Tuple[bool, Tuple[Atom, ...]], CompiledConstraint] = dict()
+    constraints = []
+    for i in range(len(ptr) - 1):
+        key = (not unsat[i], tuple(rows[ptr[i] : ptr[i + 1]]))
+        cc = unique.get(key)
+        if cc is None:
+            cc = unique[key] = CompiledConstraint(key[1], key[0])
+        constraints.append(cc)
+    return constraints
+
+
+def save(pta: Union[PTA, CompiledPTA], file: File):
+    """Write a PTA (compiled, if it isn't already) to a file
+
+    Parameters
+    ----------
+    pta:
+        A PTA with finitely many reachable locations, whose location, clock
+        and action labels are JSON values (or tuples of them).
+    file:
+        The path or binary file to write to.
+    """
+    compiled = pta if isinstance(pta, CompiledPTA) else pta.compile()
+    slots = {clock: i for i, clock in enumerate(compiled.clock_order)}
+    meta = {
+        "version": VERSION,
+        "locations": [_to_json(loc) for loc in compiled.locations],
+        "clocks": [_to_json(c.name) for c in compiled.clock_order],
+        "actions": [_to_json(a) for a in compiled.action_labels],
+        "n_controllable": compiled.n_controllable,
+        "initial": compiled.initial,
+    }
+    guard_ptr, guard_atoms, guard_false = _pack(compiled.edge_guard, slots)
+    inv_ptr, inv_atoms, inv_false = _pack(compiled.invariant, slots)
+    np.savez(
+        file,
+        meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+        edge_ptr=compiled.edge_ptr,
+        edge_action=compiled.edge_action,
+        target_ptr=compiled.target_ptr,
+        target_location=compiled.target_location,
+        target_prob=compiled.target_prob,
+        target_reset=compiled.target_reset,
+        guard_ptr=guard_ptr,
+        guard_atoms=guard_atoms,
+        guard_false=guard_false,
+        invariant_ptr=inv_ptr,
+        invariant_atoms=inv_atoms,
+        invariant_false=inv_false,
+    )
+
+
+def load(file: File) -> CompiledPTA:
+    """Read a PTA written by `save`, as a `CompiledPTA`
+
+    The location space of the PTA is the `FiniteSpace` of its locations.
+    """
+    with np.load(file, allow_pickle=False) as data:
+        meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+        if meta["version"] != VERSION:
+            raise ValueError(
+                "Unsupported PTA file version {} (expected {})".format(
+                    meta["version"], VERSION
+                )
+            )
+        arrays = {name: data[name] for name in data.files if name != "meta"}
+
+    locations = [_from_json(loc) for loc in meta["locations"]]
+    clocks = tuple(Clock(_from_json(name)) for name in meta["clocks"])
+    return CompiledPTA(
+        location_space=FiniteSpace(locations),
+        clock_order=clocks,
+        locations=locations,
+        action_labels=[_from_json(a) for a in meta["actions"]],
+        n_controllable=meta["n_controllable"],
+        initial=meta["initial"],
+        edge_ptr=arrays["edge_ptr"].astype(np.intp),
+        edge_action=arrays["edge_action"].astype(np.intp),
+        edge_guard=_unpack(
+            arrays["guard_ptr"], arrays["guard_atoms"], arrays["guard_false"], clocks
+        ),
+        target_ptr=arrays["target_ptr"].astype(np.intp),
+        target_location=arrays["target_location"].astype(np.intp),
+        target_prob=arrays["target_prob"].astype(float),
+        target_reset=arrays["target_reset"].astype(bool),
+        invariant=_unpack(
+            arrays["invariant_ptr"],
+            arrays["invariant_atoms"],
+            arrays["invariant_false"],
+            clocks,
+        ),
+    )
+
+
+def load_pta(file: File) -> PTA:
+    """Read a PTA written by `save`, as a `PTA` backed by its compiled tables"""
+    compiled = load(file)
+    return PTA(
+        location_space=compiled.location_space,
+        clocks=compiled.clocks,
+        actions=compiled.actions,
+        init_location=compiled.initial_location,
+        transitions=compiled.transitions,
+        invariants=compiled.invariants,
+    )
+
+
+__all__ = ["VERSION", "load", "load_pta", "save"]
@@ -2,4 +2,15 @@ from .digital_mdp import DigitalMDP
 from .digital_mdp import State as DigitalState
 from .mdp import MDP
 from .mdp import State as DenseState
+from .simulator import EnvMove, Simulator
 from .region_mdp import RegionMDP
+from .vector_mdp import VectorDigitalMDP, VectorMDP, VectorState
+from .region_graph import RegionState, build_region_graph
+from .sparse import SparseMDP, Tau, explore
+from .digital_graph import DigitalState as DigitalGraphState
+from .digital_graph import build_digital_graph
+from .solvers import expected_reward, expected_time, reachability
+from .store import PassedStore, SearchOrder, StoreStats
+from .zone_graph import ZoneState, build_zone_graph, explore_zones
+from .masks import ActionMask
+from .encoding import ObservationEncoder
@@ -0,0 +1,308 @@
+"""Explicit digital-clocks MDP of a PTA
+
+Under the digital clocks semantics, time only elapses in integer steps, so the
+states of the MDP are pairs ``(q, v)`` of a location and an integer clock
+valuation. The value of each clock is capped at one more than the largest
+constant it is compared against, which makes the MDP finite. In each state, the
+scheduler can either
+
+- delay by one time unit (`Tau.DELAY`), if the invariant of ``q`` still holds
+  after the delay; or
+- take an edge whose guard holds in ``v``, moving to each of its targets (with
+  the reset clocks set to 0) with the probability of the target.
+
+As in `DigitalMDP`, all clock constraints are meant to be closed.
+
+The MDP is explored breadth-first over the tables of a `CompiledPTA`, one
+whole layer of states at a time: each state is encoded as a single integer
+(mixed-radix over its location id and clock values), so the successors of a
+layer are computed and deduplicated with array operations.
+"""
+
+from typing import (
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import attr
+import numpy as np
+from scipy import sparse
+
+from pta.compiled import CompiledPTA
+from pta.mdp.sparse import SparseMDP, Tau, _expand
+from pta.pta import PTA
+
+Location = Hashable
+
+
+class DigitalState(NamedTuple):
+    """A state of the digital-clocks MDP
+
+    The clock values are given in the clock order of the compiled PTA.
+    """
+
+    location: Location
+    clocks: Tuple[int, ...]
+
+
+@attr.s(frozen=True, eq=False, repr=False)
+class _Encoding:
+    """Mixed-radix encoding of (location id, clock values) as a single integer"""
+
+    n_locations: int = attr.ib()
+    cap: np.ndarray = attr.ib()
+
+    strides: np.ndarray = attr.ib(init=False)
+    size: int = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        radix = [int(c) + 1 for c in self.cap]
+        strides = []
+        size = 1
+        for r in reversed(radix):
+            strides.append(size)
+            size *= r
+        if size * self.n_locations >= 2**63:
+            raise ValueError(
+                "The digital clocks MDP is too large to encode its states: "
+                "{} locations with clock ranges {}".format(self.n_locations, radix)
+            )
+        object.__setattr__(self, "strides", np.array(strides[::-1], dtype=np.int64))
+        object.__setattr__(self, "size", size)
+
+    def encode(self, loc: np.ndarray, values: np.ndarray) -> np.ndarray:
+        return loc.astype(np.int64) * self.size + values.astype(np.int64) @ self.strides
+
+    def decode(self, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        loc, rest = np.divmod(codes, self.size)
+        values = (rest[:, np.newaxis] // self.strides) % (self.cap + 1)
+        return loc.astype(np.intp), values
+
+
+class _CodeSet:
+    """The set of the codes found so far, as sorted runs of decreasing lengths
+
+    Adding a layer of codes only merges the last runs that are not much longer
+    than it, so that each code is merged a logarithmic number of times, rather
+    than once per later layer. The runs are disjoint, so merging two of them
+    is a stable sort of their concatenation, which takes linear time.
+    """
+
+    def __init__(self, codes: np.ndarray):
+        self._runs = [codes]
+
+    def missing(self, codes: np.ndarray) -> np.ndarray:
+        """Get the (sorted, unique) ``codes`` that are not in the set"""
+        for run in self._runs:
+            pos = np.minimum(np.searchsorted(run, codes), len(run) - 1)
+            codes = codes[run[pos] != codes]
+        return codes
+
+    def add(self, codes: np.ndarray):
+        """Add (sorted) codes that are not in the set"""
+        if len(codes) == 0:
+            return
+        runs = self._runs
+        runs.append(codes)
+        while len(runs) > 1 and len(runs[-2]) <= 2 * len(runs[-1]):
+            merged = np.concatenate(runs[-2:])
+            merged.sort(kind="stable")
+            runs[-2:] = [merged]
+
+
+class DigitalStates(Sequence[DigitalState]):
+    """The states of a digital-clocks MDP, decoded on demand
+
+    Attributes
+    ----------
+    location_ids:
+        The location id (in the compiled PTA) of each state.
+    clock_values:
+        The ``(n_states, n_clocks)`` array of the clock values of each state.
+    """
+
+    def __init__(self, compiled: CompiledPTA, encoding: _Encoding, codes: np.ndarray):
+        self._compiled = compiled
+        self._encoding = encoding
+        self._codes = codes
+        self._order = np.argsort(codes, kind="stable")
+        self._sorted = codes[self._order]
+        self.location_ids, self.clock_values = encoding.decode(codes)
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        return DigitalState(
+            self._compiled.locations[self.location_ids[i]],
+            tuple(self.clock_values[i].tolist()),
+        )
+
+    def _lookup(self, codes: np.ndarray) -> np.ndarray:
+        """Get the ids of the states with the given codes (which must exist)"""
+        return self._order[np.searchsorted(self._sorted, codes)]
+
+    def index_of(self, state: DigitalState) -> int:
+        """Get the id of a state
+
+        Raises
+        ------
+        KeyError
+            If the state is not in the MDP.
+        """
+        try:
+            loc = self._compiled.location_id(state.location)
+        except KeyError:
+            raise KeyError(state)
+        values = np.asarray(state.clocks)
+        if np.any(values < 0) or np.any(values > self._encoding.cap):
+            raise KeyError(state)
+        code = self._encoding.encode(np.array([loc]), values[np.newaxis])[0]
+        pos = np.searchsorted(self._sorted, code)
+        if pos == len(self._sorted) or self._sorted[pos] != code:
+            raise KeyError(state)
+        return int(self._order[pos])
+
+    def location_mask(self, locations: Iterable[Location]) -> np.ndarray:
+        """Get the boolean mask of the states in any of the given locations"""
+        mask = np.zeros(self._compiled.n_locations, dtype=bool)
+        for loc in locations:
+            mask[self._compiled.location_id(loc)] = True
+        return mask[self.location_ids]
+
+
+class _StateIndex(Mapping[DigitalState, int]):
+    def __init__(self, states: DigitalStates):
+        self._states = states
+
+    def __getitem__(self, state: DigitalState) -> int:
+        return self._states.index_of(state)
+
+    def __iter__(self) -> Iterator[DigitalState]:
+        return iter(self._states)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+
+def build_digital_graph(pta: Union[PTA, CompiledPTA]) -> SparseMDP:
+    """Explore the digital-clocks MDP reachable from the initial state
+
+    Parameters
+    ----------
+    pta:
+        The PTA (compiled, if it isn't already).
+
+    Returns
+    -------
+    :
+        The MDP as a `SparseMDP`, whose ``states`` are `DigitalStates`. The
+        choices of each state are the delay (if available) followed by the
+        enabled edges, labelled with their actions.
+    """
+    compiled = pta if isinstance(pta, CompiledPTA) else pta.compile()
+    max_constants = compiled.max_constants()
+    cap = np.array([max_constants[c] + 1 for c in compiled.clock_order], dtype=np.int64)
+    enc = _Encoding(compiled.n_locations, cap)
+
+    edge_total = np.bincount(
+        np.repeat(np.arange(compiled.n_edges), np.diff(compiled.target_ptr)),
+        weights=compiled.target_prob,
+        minlength=compiled.n_edges,
+    )
+    # Choices are labelled with an action id, or one of these
+    delay_id, deadlock_id = -1, -2
+
+    initial = enc.encode(
+        np.array([compiled.initial]), np.zeros((1, compiled.n_clocks), dtype=np.int64)
+    )
+    layers = [initial]
+    seen = _CodeSet(initial)
+    # Choices (by the code of their state) and transitions (by choice)
+    choice_src, choice_action = [], []
+    trans_choice, trans_dst, trans_prob = [], [], []
+    n_choices = 0
+
+    frontier = initial
+    while len(frontier) > 0:
+        loc, values = enc.decode(frontier)
+
+        delayed = np.minimum(values + 1, cap)
+        ok = compiled.invariant_bounds.satisfied(loc, delayed.astype(float))
+        n_delays = int(ok.sum())
+        choice_src.append(frontier[ok])
+        choice_action.append(np.full(n_delays, delay_id, dtype=np.intp))
+        trans_choice.append(n_choices + np.arange(n_delays))
+        trans_dst.append(enc.encode(loc[ok], delayed[ok]))
+        trans_prob.append(np.ones(n_delays))
+        n_choices += n_delays
+
+        owner, edges = _expand(compiled.edge_ptr, loc)
+        enabled = compiled.guard_bounds.satisfied(edges, values[owner].astype(float))
+        owner, edges = owner[enabled], edges[enabled]
+        choice_src.append(frontier[owner])
+        choice_action.append(compiled.edge_action[edges])
+        edge_owner, targets = _expand(compiled.target_ptr, edges)
+        src = owner[edge_owner]
+        dst_values = np.where(compiled.target_reset[targets], 0, values[src])
+        trans_choice.append(n_choices + edge_owner)
+        trans_dst.append(enc.encode(compiled.target_location[targets], dst_values))
+        trans_prob.append(compiled.target_prob[targets] / edge_total[edges[edge_owner]])
+        n_choices += len(edges)
+
+        frontier = seen.missing(np.unique(np.concatenate(trans_dst[-2:])))
+        seen.add(frontier)
+        layers.append(frontier)
+
+    states = DigitalStates(compiled, enc, np.concatenate(layers))
+    n_states = len(states)
+    choice_state = states._lookup(np.concatenate(choice_src))
+    choice_action = np.concatenate(choice_action)
+
+    # States without any choice get a self-loop
+    deadlocks = np.setdiff1d(np.arange(n_states), choice_state, assume_unique=True)
+    choice_state = np.concatenate([choice_state, deadlocks])
+    choice_action = np.concatenate(
+        [choice_action, np.full(len(deadlocks), deadlock_id, dtype=np.intp)]
+    )
+    trans_choice.append(n_choices + np.arange(len(deadlocks)))
+    trans_dst.append(states._codes[deadlocks])
+    trans_prob.append(np.ones(len(deadlocks)))
+    n_choices += len(deadlocks)
+
+    # Group the choices by state, keeping the delay first within each state.
+    order = np.argsort(choice_state, kind="stable")
+    row = np.empty(n_choices, dtype=np.intp)
+    row[order] = np.arange(n_choices)
+    dst = states._lookup(np.concatenate(trans_dst))
+    transitions = sparse.csr_matrix(
+        (np.concatenate(trans_prob), (row[np.concatenate(trans_choice)], dst)),
+        shape=(n_choices, n_states),
+    )
+    transitions.sum_duplicates()
+
+    labels = np.empty(compiled.n_actions + 2, dtype=object)
+    labels[: compiled.n_actions] = compiled.action_labels
+    labels[delay_id] = Tau.DELAY
+    labels[deadlock_id] = Tau.DEADLOCK
+    choice_ptr = np.zeros(n_states + 1, dtype=np.intp)
+    np.cumsum(np.bincount(choice_state, minlength=n_states), out=choice_ptr[1:])
+
+    return SparseMDP(
+        states=states,
+        state_index=_StateIndex(states),
+        choice_ptr=choice_ptr,
+        choice_label=labels[choice_action[order]],
+        transitions=transitions,
+    )
+
+
+__all__ = ["DigitalState", "DigitalStates", "build_digital_graph"]
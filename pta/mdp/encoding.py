@@ -0,0 +1,138 @@
+"""Flat numeric encoding of the observations of the simulators
+
+An `ObservationEncoder` writes a state of a PTA into a flat array: first the
+location, as its id in the `CompiledPTA` (or as a one-hot vector over the
+location ids), then the clock values in the clock order of the compiled PTA.
+The arrays are provided by the caller (see :py:meth:`ObservationEncoder.empty`)
+and reused across steps, so encoding allocates nothing and the buffers can be
+handed as they are to NumPy-based learners.
+
+A plain `PTA` is not compiled, as that enumerates all its reachable
+locations, which never ends on unbounded location spaces. Its locations are
+instead given ids in the order they are first encoded, starting with the
+initial location.
+"""
+
+from typing import Dict, Optional, Tuple, Union
+
+import attr
+import numpy as np
+from attr.validators import instance_of
+
+from pta.clock import Clock, ClockValuation
+from pta.compiled import CompiledPTA, clock_order
+from pta.network import _as_pta
+from pta.pta import PTA, Location
+
+
+def _compile(model: Union[PTA, CompiledPTA]) -> CompiledPTA:
+    model = _as_pta(model)
+    if isinstance(model, CompiledPTA):
+        return model
+    return model.compile()
+
+
+@attr.s(frozen=True, eq=False, repr=False)
+class ObservationEncoder:
+    """Encode the states of a PTA into flat arrays
+
+    Parameters
+    ----------
+    pta:
+        The PTA whose location ids and clock order are used. The locations of
+        a `PTA` that isn't compiled get their ids as they are first encoded
+        (see `location_id`).
+    one_hot:
+        If ``True``, encode the location as a one-hot vector over the location
+        ids instead of the id itself. This needs a `CompiledPTA`, as the
+        number of locations must be known.
+    dtype:
+        The type of the arrays made by `empty`. The default ``float64``
+        represents all the location ids below ``2**53`` exactly (``float32``
+        only does below ``2**24``).
+    """
+
+    pta: Union[PTA, CompiledPTA] = attr.ib(
+        converter=_as_pta, validator=instance_of((PTA, CompiledPTA))
+    )
+    one_hot: bool = attr.ib(default=False, kw_only=True)
+    dtype: np.dtype = attr.ib(default=np.float64, converter=np.dtype, kw_only=True)
+
+    #: The offset of the clock values in the encoding
+    offset: int = attr.ib(init=False)
+    #: The clocks, in the order of their values in the encoding
+    clock_order: Tuple[Clock, ...] = attr.ib(init=False)
+    _location_ids: Dict[Location, int] = attr.ib(init=False, factory=dict)
+
+    def __attrs_post_init__(self):
+        if isinstance(self.pta, CompiledPTA):
+            object.__setattr__(self, "clock_order", self.pta.clock_order)
+        elif self.one_hot:
+            raise ValueError(
+                "A one-hot encoding needs all the locations, compile the PTA first"
+            )
+        else:
+            object.__setattr__(self, "clock_order", clock_order(self.pta.clocks))
+            self._location_ids[self.pta.initial_location] = 0
+        object.__setattr__(self, "offset", self.pta.n_locations if self.one_hot else 1)
+
+    @property
+    def size(self) -> int:
+        """The length of the encoding of a state"""
+        return self.offset + len(self.clock_order)
+
+    def location_id(self, location: Location) -> int:
+        """Get the id of a location, giving the next id to a new location of a `PTA`"""
+        if isinstance(self.pta, CompiledPTA):
+            return self.pta.location_id(location)
+        return self._location_ids.setdefault(location, len(self._location_ids))
+
+    def empty(self, n: Optional[int] = None) -> np.ndarray:
+        """Allocate a buffer for one state, or a batch of ``n`` states"""
+        shape: Tuple[int, ...] = (self.size,) if n is None else (n, self.size)
+        return np.zeros(shape, dtype=self.dtype)
+
+    def encode(
+        self, location: Location, valuation: ClockValuation, out: np.ndarray
+    ) -> np.ndarray:
+        """Write a state into ``out`` (of shape ``(size,)``) and return it"""
+        loc_id = self.location_id(location)
+        if self.one_hot:
+            out[: self.offset] = 0
+            out[loc_id] = 1
+        else:
+            out[0] = loc_id
+        offset = self.offset
+        for i, clock in enumerate(self.clock_order):
+            out[offset + i] = valuation[clock]
+        return out
+
+    def encode_batch(
+        self, location: np.ndarray, clocks: np.ndarray, out: np.ndarray
+    ) -> np.ndarray:
+        """Write a batch of states into ``out`` (of shape ``(n, size)``) and return it
+
+        Parameters
+        ----------
+        location:
+            The ``(n,)`` array of location ids.
+        clocks:
+            The ``(n, n_clocks)`` matrix of clock values, in the clock order.
+        out:
+            The buffer.
+        """
+        if self.one_hot:
+            out[:, : self.offset] = 0
+            out[np.arange(len(location)), location] = 1
+        else:
+            out[:, 0] = location
+        out[:, self.offset :] = clocks
+        return out
+
+    def __repr__(self) -> str:
+        return "ObservationEncoder({}, one_hot={}, size={})".format(
+            self.pta, self.one_hot, self.size
+        )
+
+
+__all__ = ["ObservationEncoder"]
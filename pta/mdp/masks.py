@@ -0,0 +1,96 @@
+"""Action masks for the MDP simulators
+
+Instead of the set of enabled edges and a `DelayInterval`, the simulators can
+describe the actions available in their current state as an `ActionMask`: a
+boolean array over the ids of the (controllable) actions, in the order of
+:py:attr:`CompiledPTA.action_labels`, and numeric `DelayBounds` on the delays
+allowed by the invariant. This is the form expected by the policies of
+reinforcement learning agents, which pick actions by their integer id.
+"""
+
+from typing import NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from pta.clock import ClockValuation, DelayBounds
+from pta.compiled import CompiledPTA
+from pta.pta import PTA, Action, Location
+
+
+class ActionMask(NamedTuple):
+    """The actions available in the state(s) of a simulator
+
+    Attributes
+    ----------
+    enabled:
+        Boolean array over the action ids (one row per environment for the
+        vectorized simulators), ``True`` for the actions whose guard holds.
+    delays:
+        The bounds on the delays allowed by the invariant (arrays over the
+        environments for the vectorized simulators, scalars otherwise).
+    """
+
+    enabled: np.ndarray
+    delays: DelayBounds
+
+
+def action_labels(pta: Union[PTA, CompiledPTA]) -> Tuple[Action, ...]:
+    """Get the controllable actions of a PTA, in the order of their ids"""
+    if isinstance(pta, CompiledPTA):
+        return pta.action_labels[: pta.n_controllable]
+    return tuple(sorted(pta.actions, key=repr))
+
+
+def action_mask(
+    pta: Union[PTA, CompiledPTA],
+    location: Location,
+    valuation: ClockValuation,
+    out: np.ndarray,
+    ids: Optional[dict] = None,
+) -> ActionMask:
+    """Fill ``out`` with the mask of the actions enabled in a single state
+
+    Parameters
+    ----------
+    pta:
+        The PTA. With a `CompiledPTA`, the guards and the invariant are
+        evaluated on its bound tables.
+    location, valuation:
+        The state.
+    out:
+        The boolean array over the action ids to fill.
+    ids:
+        The ids of the actions of a `PTA` (see `action_labels`).
+    """
+    out[:] = False
+    if isinstance(pta, CompiledPTA):
+        loc_id = pta.location_id(location)
+        values = np.array([[valuation[c] for c in pta.clock_order]])
+        edges = pta.edge_table[loc_id, : pta.n_controllable]
+        actions = np.flatnonzero(edges >= 0)
+        ok = pta.guard_bounds.satisfied(
+            edges[actions], np.repeat(values, len(actions), axis=0)
+        )
+        out[actions[ok]] = True
+        bounds = pta.invariant_bounds.delays(np.array([loc_id]), values)
+        return ActionMask(out, DelayBounds(*(b[0] for b in bounds)))
+
+    if ids is None:
+        ids = {a: i for i, a in enumerate(action_labels(pta))}
+    for label, transition in pta.transitions(location).items():
+        i = ids.get(label)
+        if i is not None and valuation in transition.guard:
+            out[i] = True
+    interval = pta.allowed_delays(location, valuation)
+    return ActionMask(
+        out,
+        DelayBounds(
+            np.float64(interval.lower),
+            np.float64(interval.upper),
+            np.bool_(interval.left_closed),
+            np.bool_(interval.right_closed),
+        ),
+    )
+
+
+__all__ = ["ActionMask", "action_labels", "action_mask"]
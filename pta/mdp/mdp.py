@@ -11,22 +11,20 @@ valuation pair) and outputs a delay or an edge
 
 import enum
 import random
-from typing import Callable, FrozenSet, Hashable, Mapping, NamedTuple, Set, Tuple
+from typing import (
+    Callable,
+    FrozenSet,
+    Mapping,
+    NamedTuple,
+    Tuple,
+)
 
 import attr
-from attr.validators import instance_of
 
-from pta import pta
-from pta.clock import Clock, ClockConstraint, ClockValuation, Interval, delays
+from pta.clock import ClockConstraint, ClockValuation, DelayInterval, delays
+from pta.mdp.simulator import Edge, EnvMove, Location, Simulator
 from pta.pta import Target
 from pta.pta import Transition as EdgeTransition
-from pta.spaces import Space
-
-# Location in the PTA
-Location = Hashable
-
-# An is a transition that can be taken in the PTA
-Edge = Hashable
 
 
 class State(NamedTuple):
@@ -46,12 +44,8 @@ class _Turn(enum.Enum):
 
 
 @attr.s(auto_attribs=True, slots=True)
-class MDP:
+class MDP(Simulator):
 
-    _pta: pta.PTA = attr.ib(validator=[instance_of(pta.PTA)])
-
-    _current_clock_valuation: ClockValuation = attr.ib(init=False)
-    _current_location: Location = attr.ib(init=False)
     _progress_steps: int = attr.ib(init=False, default=0)
     _turn: _Turn = attr.ib(init=False, default=_Turn.PLAYER)
 
@@ -60,22 +54,21 @@ class MDP:
         self._current_location = self.initial_location
         self._progress_steps = 0
         self._turn = _Turn.PLAYER
+        self._last_target = None
+        self._last_env_move = None
 
     @staticmethod
     def _default_delay_stochasticity(val: ClockValuation, cc: ClockConstraint) -> float:
         """Uniformly randomly pick a float withing the delay"""
-        import portion as P
+        import math
         import random
 
         # Get interval of allowable delays
-        interval: Interval = delays(val, cc)
-        assert (
-            interval.atomic
-        ), "Interval seems to be a disjunction of other intervals... Bug!"
-        assert interval.lower != -P.inf, "Interval lower bound is unbounded... Bug!"
-        left_offset = 0.1 if interval.left == P.OPEN else 0
-        right_offset = 0.1 if interval.right == P.OPEN else 0
-        if interval.upper == P.inf:
+        interval: DelayInterval = delays(val, cc)
+        assert not interval.empty, "Interval of allowed delays is empty... Bug!"
+        left_offset = 0.1 if not interval.left_closed else 0
+        right_offset = 0.1 if not interval.right_closed else 0
+        if interval.upper == math.inf:
             # If upper is unbounded, it doesn't matter what value we pick, so pick the lower bound + some offset if open bound
             return interval.lower + left_offset
         # Otherwise pick uniformly from the range
@@ -88,38 +81,17 @@ class MDP:
         default=_default_delay_stochasticity, kw_only=True
     )
 
-    @property
-    def location_space(self) -> Space:
-        return self._pta.location_space
-
-    @property
-    def clocks(self) -> FrozenSet[Clock]:
-        return self._pta.clocks
-
-    @property
-    def edges(self) -> FrozenSet[Edge]:
-        return self._pta.actions
-
-    @property
-    def initial_location(self) -> Location:
-        return self._pta.initial_location
-
-    @property
-    def valuation(self) -> ClockValuation:
-        return self._current_clock_valuation
-
-    @property
-    def location(self) -> Location:
-        return self._current_location
-
     def _get_obs(self) -> State:
         return State(self._current_clock_valuation, self._current_location)
 
     def transition(self, edge: Edge) -> EdgeTransition:
-        return self._pta._transitions(self._current_location)[edge]
+        return self._pta.transitions(self._current_location)[edge]
+
+    def enabled_actions(self) -> Tuple[DelayInterval, FrozenSet[Edge]]:
+        """Get the interval of delays satisfying the invariant and the set of actions enabled at the current time
 
-    def enabled_actions(self) -> Tuple[Interval, FrozenSet[Edge]]:
-        """Get the interval of delays satisfying the invariant and the set of actions enabled at the current time"""
+        The interval is a `DelayInterval` (see :py:func:`~pta.clock.delays`).
+        """
         return (
             self._pta.allowed_delays(
                 self._current_location, self._current_clock_valuation
@@ -170,6 +142,8 @@ class MDP:
         """
 
         delay, edge = Action._make(action)
+        self._last_target = None
+        self._last_env_move = None
 
         if not edge_first:
             # First let's take the delay.
@@ -184,8 +158,11 @@ class MDP:
             if edge in allowed_edges:
                 transition = self.transition(edge)
                 target: Target = Target._make(transition.target_dist.sample()[0])
+                self._last_target = target
                 self._current_location = target.location
-                self._current_clock_valuation.reset(target.reset)
+                self._current_clock_valuation = self._current_clock_valuation.reset(
+                    target.reset
+                )
 
         else:  # if edge taken first, then delay
             # First get the set of allowed edges
@@ -193,16 +170,25 @@ class MDP:
             # If edge is in allowed_edges, we can take the transition
             if edge in allowed_edges:
                 transition = self.transition(edge)
-                next_loc = transition.target_dist.sample()
-                self._current_location = next_loc
+                target = Target._make(transition.target_dist.sample()[0])
+                self._last_target = target
+                self._current_location = target.location
+                self._current_clock_valuation = self._current_clock_valuation.reset(
+                    target.reset
+                )
             # Now, we take the delay
             self._current_clock_valuation = self._current_clock_valuation + delay
 
         # Now the environment can take actions...
-        # Get the current allowed delays and actions
-        allowed_delay, allowed_edges = self.enabled_actions()
         # Check if there is any edges available that are not part of self.edges
-        env_actions = list(allowed_edges - self.edges)
+        # (`enabled_actions` only has the edges in self.edges)
+        env_actions = [
+            env_edge
+            for env_edge in self._pta.enabled_actions(
+                self._current_location, self._current_clock_valuation
+            )
+            if env_edge not in self.edges
+        ]
         if len(env_actions) > 0:
             # Take it?
             env_edge: Edge = random.choices(env_actions, k=1)[0]
@@ -210,12 +196,13 @@ class MDP:
             env_delay: float = self._random_delay(
                 self._current_clock_valuation, env_transition.guard
             )
-            env_reset, env_step = env_transition.target_dist.sample(k=1)[
-                0
-            ]  # type: Set[Clock], Location
+            env_target = Target._make(env_transition.target_dist.sample(k=1)[0])
+            self._last_env_move = EnvMove(env_edge, env_delay, env_target)
             self._current_clock_valuation = self._current_clock_valuation + env_delay
-            self._current_clock_valuation.reset(env_reset)
-            self._current_location = env_step
+            self._current_clock_valuation = self._current_clock_valuation.reset(
+                env_target.reset
+            )
+            self._current_location = env_target.location
         self._progress_steps += 1
 
         return self._get_obs()
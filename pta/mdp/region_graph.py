@@ -0,0 +1,77 @@
+"""Explicit integral region graph of a PTA
+
+The integral region MDP of a PTA [Hartmanns2017]_ has the states ``(q, R)``,
+where ``q`` is a location and ``R`` an integral `Region`. In each state, the
+scheduler can either
+
+- let time elapse (`Tau.DELAY`), moving to the successor region, if the
+  invariant of ``q`` still holds there; or
+- take an edge enabled in ``R``, moving to each of its targets (with the reset
+  clocks applied to ``R``) with the probability of the target.
+
+The integral values of the clocks are capped just above the largest constant
+they are compared against (see :py:meth:`Region.cap`), so the graph is finite.
+"""
+
+from typing import Hashable, NamedTuple, Union
+
+from pta.compiled import CompiledPTA
+from pta.mdp.region_mdp import Region
+from pta.mdp.sparse import SparseMDP, Tau, explore
+from pta.pta import PTA
+
+Location = Hashable
+
+
+class RegionState(NamedTuple):
+    """A state of the region graph"""
+
+    location: Location
+    region: Region
+
+
+def build_region_graph(pta: Union[PTA, CompiledPTA]) -> SparseMDP:
+    """Explore the integral region graph reachable from the initial state
+
+    Parameters
+    ----------
+    pta:
+        The PTA (compiled, if it isn't already).
+
+    Returns
+    -------
+    :
+        The region graph as a `SparseMDP` over `RegionState` (which are
+        hashable, and are their own keys). The choice labels are the action
+        labels of the edges and `Tau.DELAY`.
+    """
+    compiled = pta if isinstance(pta, CompiledPTA) else pta.compile()
+    max_constants = compiled.max_constants()
+
+    def successors(state: RegionState):
+        loc_id = compiled.location_id(state.location)
+        region = state.region
+
+        delayed = region.delay(1).cap(max_constants)
+        if compiled.invariant[loc_id](delayed.value()):
+            yield Tau.DELAY, [(RegionState(state.location, delayed), 1.0)]
+
+        for e in compiled.enabled_edges(loc_id, region.value()):
+            targets = compiled.targets(e)
+            total = compiled.target_prob[targets.start : targets.stop].sum()
+            dist = []
+            for t in targets:
+                succ = region
+                for clock in compiled.reset_clocks(t):
+                    succ = succ.reset(clock)
+                target = compiled.locations[compiled.target_location[t]]
+                dist.append(
+                    (RegionState(target, succ), float(compiled.target_prob[t] / total))
+                )
+            yield compiled.action_labels[compiled.edge_action[e]], dist
+
+    initial = RegionState(compiled.initial_location, Region.zero(compiled.clocks))
+    return explore(initial, successors)
+
+
+__all__ = ["RegionState", "build_region_graph"]
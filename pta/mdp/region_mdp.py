@@ -1,19 +1,23 @@
+import functools
+import weakref
 from typing import (
+    Dict,
     FrozenSet,
     Hashable,
     Iterable,
     Mapping,
     MutableMapping,
     Optional,
-    Set,
     Tuple,
     Union,
 )
 
 import attr
 
-from pta.clock import Clock, ClockValuation, Interval
+from pta.clock import Clock, ClockValuation, DelayInterval
+from pta.compiled import CompiledPTA, clock_order
 from pta.distributions import DiscreteDistribution
+from pta.network import _as_pta
 from pta.pta import PTA, Target, Transition
 
 # Action = Union[str, int]
@@ -24,26 +28,55 @@ Location = Hashable
 TransitionFn = Mapping[Location, Mapping[Action, Transition]]
 
 
-def _frozen_converter(x: Union[Set, FrozenSet, Iterable]) -> FrozenSet:
-    return frozenset(x)
+@functools.lru_cache(maxsize=None)
+def _slot_map(clocks: Tuple[Clock, ...]) -> Dict[Clock, int]:
+    return {clock: i for i, clock in enumerate(clocks)}
 
 
-@attr.s(auto_attribs=True)
+# Live regions, keyed by their clocks and packed encoding
+_INTERNED: MutableMapping[Tuple, "Region"] = weakref.WeakValueDictionary()
+
+
+@attr.s(frozen=True, slots=True, cache_hash=True, repr=False)
 class Region:
     """Efficient data structure to model an Integral Region of the PTA [Hartmanns2017]_
+
+    A region is immutable: it is packed into a single tuple of integers over
+    the clocks (sorted by their ``repr``) laid out as::
+
+        (is_int, num_frac, *integral_values, *fractional_order)
+
+    and `delay` and `reset` return new regions. The regions they return are
+    interned, so equal regions reached along different paths are generally
+    the same object, and regions can be used as dictionary keys.
     """
 
-    _clocks: FrozenSet[Clock] = attr.ib(converter=_frozen_converter)
-    _is_int: bool = attr.ib(init=False)
+    _clocks: Tuple[Clock, ...] = attr.ib(converter=clock_order)
+    _packed: Tuple[int, ...] = attr.ib(
+        default=attr.Factory(
+            lambda self: (1, 1) + (0,) * (2 * len(self._clocks)), takes_self=True
+        )
+    )
+
+    @classmethod
+    def zero(cls, clocks: Iterable[Clock]) -> "Region":
+        """Get the (interned) region where all the clocks are 0"""
+        return cls(clocks)._intern()
+
+    def _intern(self) -> "Region":
+        return _INTERNED.setdefault((self._clocks, self._packed), self)
 
-    _value_vector: MutableMapping[Clock, int] = attr.ib(init=False)
-    _fractional_ord: MutableMapping[Clock, int] = attr.ib(init=False)
-    _num_frac: int = attr.ib(init=False)
+    def _evolve(self, packed: Tuple[int, ...]) -> "Region":
+        ret = _INTERNED.get((self._clocks, packed))
+        if ret is None:
+            ret = Region(self._clocks, packed)
+            _INTERNED[(self._clocks, packed)] = ret
+        return ret
 
     @property
     def clocks(self) -> FrozenSet[Clock]:
         """The set of clocks in the region"""
-        return self._clocks
+        return frozenset(self._clocks)
 
     @property
     def n_clocks(self) -> int:
@@ -53,13 +86,28 @@ class Region:
     @property
     def is_int(self) -> bool:
         """``True`` if any of the clocks have integer valuation."""
-        return self._is_int
+        return bool(self._packed[0])
 
-    def __attrs_post_init__(self):
-        self._is_int = True
-        self._value_vector = {clock: 0 for clock in self.clocks}
-        self._fractional_ord = {clock: 0 for clock in self.clocks}
-        self._num_frac = 1
+    @property
+    def num_frac(self) -> int:
+        """The number of distinct fractional parts of the clocks"""
+        return self._packed[1]
+
+    @property
+    def _values(self) -> Tuple[int, ...]:
+        return self._packed[2 : 2 + len(self._clocks)]
+
+    @property
+    def _fracs(self) -> Tuple[int, ...]:
+        return self._packed[2 + len(self._clocks) :]
+
+    def key(self) -> Tuple[int, ...]:
+        """Canonical encoding of the region as a tuple of integers
+
+        Two regions over the same clocks have the same key iff they represent
+        the same region.
+        """
+        return self._packed
 
     def value(self) -> ClockValuation:
         """Get the representative values of the clocks in the current region
@@ -67,14 +115,30 @@ class Region:
         The representative value of the region depends on the integer value and
         the *fractional order* of the individual valuations.
         """
+        offset = int(not self.is_int)
+        denom = 2.0 * self.num_frac
+        return ClockValuation(
+            {
+                clock: val + (2 * frac + offset) / denom
+                for clock, val, frac in zip(self._clocks, self._values, self._fracs)
+            }
+        )
 
-        def val_comp(clock) -> float:
-            return self._value_vector[clock] + (
-                (2 * self._fractional_ord[clock] + int(not self.is_int))
-                / (2.0 * self._num_frac)
-            )
+    def cap(self, max_constants: Mapping[Clock, int]) -> "Region":
+        """Clamp the integral values of clocks above their maximal constants
 
-        return ClockValuation({clock: val_comp(clock) for clock in self._clocks})  # type: ignore
+        A clock whose value exceeds the largest constant it is compared against
+        satisfies the same (non-diagonal) constraints irrespective of its
+        exact value, so its integral value is clamped to ``max_constant + 1``.
+        This makes the set of reachable regions finite.
+        """
+        values = tuple(
+            min(val, max_constants[clock] + 1) if clock in max_constants else val
+            for clock, val in zip(self._clocks, self._values)
+        )
+        if values == self._values:
+            return self
+        return self._evolve(self._packed[:2] + values + self._fracs)
 
     def delay(self, steps: int = 1) -> "Region":
         """Delay each of the clocks and move by ``steps`` "representative" region.
@@ -87,67 +151,55 @@ class Region:
         Returns
         -------
         :
-            The updated region (a reference to self)
+            The successor region
         """
         assert steps >= 1, "At lease 1 step must be taken when PTA is delayed."
-        self._value_vector = {
-            clock: val
-            + (
-                (2 * self._fractional_ord[clock] + int(not self.is_int) + steps)
-                // (2 * self._num_frac)
-            )
-            for clock, val in self._value_vector.items()
-        }
-
-        self._fractional_ord = {
-            clock: ((frac + (steps + int(not self.is_int)) // 2) % self._num_frac)
-            for clock, frac in self._fractional_ord.items()
-        }
-
+        is_int, num_frac = self._packed[:2]
+        offset = 1 - is_int
+        values = tuple(
+            val + (2 * frac + offset + steps) // (2 * num_frac)
+            for val, frac in zip(self._values, self._fracs)
+        )
+        fracs = tuple((frac + (steps + offset) // 2) % num_frac for frac in self._fracs)
         if steps % 2 == 1:
-            self._is_int = not self._is_int
-        return self
+            is_int = 1 - is_int
+        return self._evolve((is_int, num_frac) + values + fracs)
 
     def delay_float(self, time: float) -> "Region":
-        """Delay the region by ``time``. Wrapper around `delay`.
-        """
-        steps = int(time * 2 * self._num_frac)
+        """Delay the region by ``time``. Wrapper around `delay`."""
+        steps = int(time * 2 * self.num_frac)
         return self.delay(steps)
 
     def reset(self, reset_clock: Clock) -> "Region":
-        """Reset the given clock to 0"""
-        assert 0 <= reset_clock < self.n_clocks, "Invalid clock id."
+        """Get the region where the given clock is reset to 0"""
+        slot = _slot_map(self._clocks).get(reset_clock)
+        assert slot is not None, "Invalid clock id."
+        is_int, num_frac = self._packed[:2]
+        values = list(self._values)
+        fracs = list(self._fracs)
+        values[slot] = 0
+
+        if is_int and fracs[slot] == 0:
+            return self._evolve((is_int, num_frac) + tuple(values) + tuple(fracs))
+
+        reset_frac = fracs[slot]
+        same = any(frac == reset_frac for i, frac in enumerate(fracs) if i != slot)
+
+        num_frac += int(not is_int) - int(not same)
+        for i, frac in enumerate(fracs):
+            if i == slot:
+                continue
+            if not same and frac > reset_frac:
+                frac = (frac - 1) % num_frac
+            if not is_int:
+                frac = (frac + 1) % num_frac
+            fracs[i] = frac
 
-        if self.is_int and self._fractional_ord[reset_clock] == 0:
-            self._value_vector[reset_clock] = 0
-            return self
+        fracs[slot] = 0
+        return self._evolve((1, num_frac) + tuple(values) + tuple(fracs))
 
-        same: bool = any(
-            frac == self._fractional_ord[reset_clock]
-            for clock, frac in self._fractional_ord.items()
-            if clock != reset_clock
-        )
-
-        self._num_frac -= int(not same)
-        self._num_frac += int(not self.is_int)
-        for clk in self.clocks:
-            if clk == reset_clock:
-                continue
-            if not same and (
-                self._fractional_ord[clk] > self._fractional_ord[reset_clock]
-            ):
-                self._fractional_ord[clk] = (
-                    self._fractional_ord[clk] - 1
-                ) % self._num_frac
-            if not self.is_int:
-                self._fractional_ord[clk] = (
-                    self._fractional_ord[clk] + 1
-                ) % self._num_frac
-
-        self._fractional_ord[reset_clock] = 0
-        self._value_vector[reset_clock] = 0
-        self._is_int = True
-        return self
+    def __repr__(self) -> str:
+        return "Region({})".format(dict(self.value()))
 
 
 @attr.s(auto_attribs=True, eq=False, order=False)
@@ -159,7 +211,7 @@ class RegionMDP:
     method.
     """
 
-    _pta: PTA = attr.ib()
+    _pta: Union[PTA, CompiledPTA] = attr.ib(converter=_as_pta)
     _current_region: Region = attr.ib(init=False)
     _current_location: Location = attr.ib(init=False)
 
@@ -167,12 +219,12 @@ class RegionMDP:
     # MDPAction = Union[float, Action] # Delay time or pick an edge
 
     def __attrs_post_init__(self):
-        self._current_region = Region(self._pta.clocks)
+        self._current_region = Region.zero(self._pta.clocks)
         self._current_location = self._pta.initial_location
 
     @property
     def _current_transitions(self) -> Mapping[Action, Transition]:
-        return self._pta._transitions(self.location)
+        return self._pta.transitions(self.location)
 
     @property
     def location(self) -> Location:
@@ -195,8 +247,11 @@ class RegionMDP:
         """
         return self._pta.enabled_actions(self.location, self.clock_valuation)
 
-    def invariant_interval(self) -> Interval:
-        """Return the allowed interval of delays before the invariant associated with the location turns false."""
+    def invariant_interval(self) -> DelayInterval:
+        """Return the allowed interval of delays before the invariant associated with the location turns false.
+
+        The interval is a `DelayInterval` (see :py:func:`~pta.clock.delays`).
+        """
         return self._pta.allowed_delays(self.location, self.clock_valuation)
 
     def reset(self) -> Tuple[Location, ClockValuation]:
@@ -237,5 +292,5 @@ class RegionMDP:
             return None
 
         # We know time is allowable, thus, we need to update the current region with time.
-        self._current_region.delay_float(time)
+        self._current_region = self._current_region.delay_float(time)
         return self.location, self.clock_valuation
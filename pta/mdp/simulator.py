@@ -0,0 +1,146 @@
+"""Base class of the simulators of a PTA
+
+`MDP` and `DigitalMDP` only differ in how they step through the states of a
+PTA (dense or integer delays), and share everything else: the PTA they
+simulate, the current state, the mask of the enabled actions and the
+encoding of the observations, which are defined here.
+"""
+
+from typing import FrozenSet, Hashable, Mapping, NamedTuple, Optional, Tuple, Union
+
+import attr
+import numpy as np
+from attr.validators import instance_of
+
+from pta import pta
+from pta.clock import Clock, ClockValuation
+from pta.compiled import CompiledPTA
+from pta.mdp.encoding import ObservationEncoder
+from pta.mdp.masks import ActionMask, action_labels, action_mask
+from pta.network import _as_pta
+from pta.pta import Target
+from pta.spaces import Space
+
+# Location in the PTA
+Location = Hashable
+
+# An is a transition that can be taken in the PTA
+Edge = Hashable
+
+
+class EnvMove(NamedTuple):
+    """A move of the environment, through an edge that is not controllable"""
+
+    edge: Edge
+    delay: float
+    target: Target
+
+
+@attr.s(auto_attribs=True, slots=True)
+class Simulator:
+    """A simulator of a PTA, in a location with a clock valuation
+
+    Subclasses set the current state in ``__attrs_post_init__`` and define
+    how to ``step``. A `~pta.network.Network` is simulated as its
+    ``to_pta()``.
+    """
+
+    _pta: Union[pta.PTA, CompiledPTA] = attr.ib(
+        converter=_as_pta, validator=[instance_of((pta.PTA, CompiledPTA))]
+    )
+
+    _current_clock_valuation: ClockValuation = attr.ib(init=False)
+    _current_location: Location = attr.ib(init=False)
+    _last_target: Optional[Target] = attr.ib(init=False, default=None)
+    _last_env_move: Optional[EnvMove] = attr.ib(init=False, default=None)
+    _action_ids: Optional[Mapping[Edge, int]] = attr.ib(init=False, default=None)
+    _mask: Optional[np.ndarray] = attr.ib(init=False, default=None)
+
+    # Encodes the observations written by `observe`
+    _encoder: Optional[ObservationEncoder] = attr.ib(default=None, kw_only=True)
+
+    @property
+    def location_space(self) -> Space:
+        return self._pta.location_space
+
+    @property
+    def clocks(self) -> FrozenSet[Clock]:
+        return self._pta.clocks
+
+    @property
+    def edges(self) -> FrozenSet[Edge]:
+        return self._pta.actions
+
+    @property
+    def initial_location(self) -> Location:
+        return self._pta.initial_location
+
+    @property
+    def valuation(self) -> ClockValuation:
+        return self._current_clock_valuation
+
+    @property
+    def location(self) -> Location:
+        return self._current_location
+
+    @property
+    def last_target(self) -> Optional[Target]:
+        """The target sampled for the edge of the last step (``None`` if it was not taken)"""
+        return self._last_target
+
+    @property
+    def last_env_move(self) -> Optional[EnvMove]:
+        """The move of the environment in the last step (``None`` if it did not move)"""
+        return self._last_env_move
+
+    @property
+    def action_labels(self) -> Tuple[Edge, ...]:
+        """The (controllable) edges, in the order of their ids in `action_mask`"""
+        return action_labels(self._pta)
+
+    def action_mask(self, out: Optional[np.ndarray] = None) -> ActionMask:
+        """Get the mask of the edges enabled at the current time
+
+        Unlike ``enabled_actions``, this does not build any set: the mask is a
+        boolean array over the ids of the edges (see `action_labels`), and
+        the delays allowed by the invariant are given as numbers.
+
+        Parameters
+        ----------
+        out:
+            The boolean array to write the mask to. By default, the mask is
+            written to an array owned by the simulator, which is overwritten
+            by the next call.
+        """
+        if self._mask is None:
+            labels = action_labels(self._pta)
+            self._action_ids = {a: i for i, a in enumerate(labels)}
+            self._mask = np.zeros(len(labels), dtype=bool)
+        return action_mask(
+            self._pta,
+            self._current_location,
+            self._current_clock_valuation,
+            self._mask if out is None else out,
+            self._action_ids,
+        )
+
+    def observe(self, out: np.ndarray) -> np.ndarray:
+        """Write the current state into a buffer, as a flat array
+
+        The state is encoded by the ``encoder`` of the simulator, by default
+        an `ObservationEncoder` of the location id and the clock values. Make
+        the buffer with its ``empty`` method, and reuse it across steps.
+        """
+        return self.encoder.encode(
+            self._current_location, self._current_clock_valuation, out
+        )
+
+    @property
+    def encoder(self) -> ObservationEncoder:
+        """The encoder of the observations written by `observe`"""
+        if self._encoder is None:
+            self._encoder = ObservationEncoder(self._pta)
+        return self._encoder
+
+
+__all__ = ["EnvMove", "Simulator"]
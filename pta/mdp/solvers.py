@@ -0,0 +1,511 @@
+"""Solvers for explicit MDPs
+
+The solvers work on the sparse matrices of a `SparseMDP`: a Bellman update is
+one sparse matrix-vector product over a set of choices, followed by a max (or
+min) reduction over the choices of each state. Every state of a `SparseMDP`
+has at least one choice, so the reductions are done with ``ufunc.reduceat``
+over ``choice_ptr``.
+
+Target sets are given as boolean masks over the states (see, e.g.,
+:py:meth:`pta.mdp.digital_graph.DigitalStates.location_mask`), and rewards as
+an array over the choices (see `delay_rewards` and `action_rewards`).
+"""
+
+from typing import List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from pta.mdp.sparse import Label, SparseMDP, Tau, _expand
+
+
+class Result(NamedTuple):
+    """Result of a solver
+
+    Attributes
+    ----------
+    values:
+        The value of each state.
+    scheduler:
+        An optimal memoryless scheduler, as the id of the chosen choice in each
+        state.
+    iterations:
+        The number of iterations of value iteration.
+    converged:
+        ``False`` if the solver stopped at the iteration limit.
+    """
+
+    values: np.ndarray
+    scheduler: np.ndarray
+    iterations: int
+    converged: bool
+
+
+def _reduce(mdp: SparseMDP, q: np.ndarray, maximize: bool) -> np.ndarray:
+    """Reduce the values of the choices to the values of their states"""
+    return (np.maximum if maximize else np.minimum).reduceat(q, mdp.choice_ptr[:-1])
+
+
+def _first(mdp: SparseMDP, mask: np.ndarray) -> np.ndarray:
+    """Get the first choice of each state in the mask (``n_choices`` if none)"""
+    ids = np.where(mask, np.arange(mdp.n_choices), mdp.n_choices)
+    return np.minimum.reduceat(ids, mdp.choice_ptr[:-1])
+
+
+def _backward(
+    mdp: SparseMDP,
+    start: np.ndarray,
+    every_choice: bool,
+    *,
+    allowed: Optional[np.ndarray] = None,
+    avoid: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Get the states that move to ``start`` with a positive probability
+
+    The search goes backwards from ``start``, one layer at a time, and adds a
+    state once any (or, if ``every_choice``, every one) of its ``allowed``
+    choices moves to the states found so far with a positive probability. The
+    states in ``avoid`` are never added.
+    """
+    if allowed is None:
+        allowed = np.ones(mdp.n_choices, dtype=bool)
+    reach = start.copy()
+    if avoid is not None:
+        reach |= avoid
+    # The number of allowed choices of each state still to be hit
+    if every_choice:
+        missing = np.add.reduceat(allowed.astype(np.intp), mdp.choice_ptr[:-1])
+    else:
+        missing = np.ones(mdp.n_states, dtype=np.intp)
+    hit = ~allowed
+    frontier = np.flatnonzero(start)
+    while len(frontier) > 0:
+        choices = mdp.predecessors(frontier)
+        choices = choices[~hit[choices]]
+        hit[choices] = True
+        states = mdp.choice_state[choices]
+        missing = missing - np.bincount(states, minlength=mdp.n_states)
+        frontier = np.unique(states[missing[states] <= 0])
+        frontier = frontier[~reach[frontier]]
+        reach[frontier] = True
+    if avoid is not None:
+        reach &= ~avoid | start
+    return reach
+
+
+def _stays(mdp: SparseMDP, states: np.ndarray) -> np.ndarray:
+    """Get the choices whose successors are all in ``states``"""
+    return mdp.transitions @ (~states).astype(float) == 0
+
+
+def prob0a(mdp: SparseMDP, target: np.ndarray) -> np.ndarray:
+    """Get the states that reach ``target`` with probability 0 under all schedulers
+
+    These are the states whose maximal reachability probability is 0, i.e.,
+    from which there is no path to ``target`` at all.
+    """
+    return ~_backward(mdp, np.asarray(target, dtype=bool), every_choice=False)
+
+
+def prob0e(mdp: SparseMDP, target: np.ndarray) -> np.ndarray:
+    """Get the states that reach ``target`` with probability 0 under some scheduler
+
+    These are the states whose minimal reachability probability is 0. A state
+    is not one of them iff all of its choices move, with a positive
+    probability, to ``target`` or to another such state.
+    """
+    return ~_backward(mdp, np.asarray(target, dtype=bool), every_choice=True)
+
+
+def prob1e(mdp: SparseMDP, target: np.ndarray) -> np.ndarray:
+    """Get the states that reach ``target`` with probability 1 under some scheduler
+
+    These are the states whose maximal reachability probability is 1. They
+    are computed as a greatest fixed point: starting from all the states, only
+    keep those that can move to ``target`` with a positive probability, using
+    choices that stay among the states kept so far.
+    """
+    target = np.asarray(target, dtype=bool)
+    kept = np.ones(mdp.n_states, dtype=bool)
+    while True:
+        new = _backward(
+            mdp, target, every_choice=False, allowed=_stays(mdp, kept), avoid=~kept
+        )
+        if np.array_equal(new, kept):
+            return kept
+        kept = new
+
+
+def prob1a(mdp: SparseMDP, target: np.ndarray) -> np.ndarray:
+    """Get the states that reach ``target`` with probability 1 under all schedulers
+
+    These are the states whose minimal reachability probability is 1, i.e.,
+    from which no scheduler can move, without going through ``target``, to a
+    state whose minimal reachability probability is 0.
+    """
+    target = np.asarray(target, dtype=bool)
+    zero = prob0e(mdp, target)
+    return ~_backward(mdp, zero, every_choice=False, avoid=target)
+
+
+def _blocks(mdp: SparseMDP) -> List[np.ndarray]:
+    """Group the states into blocks that can be solved one after the other
+
+    The blocks are unions of strongly connected components of the state graph,
+    in reverse topological order: the successors of the states of a block are
+    either in the block itself, or in the blocks before it.
+    """
+    lengths = np.diff(mdp.transitions.indptr)
+    src = np.repeat(mdp.choice_state, lengths)
+    dst = mdp.transitions.indices
+    graph = sparse.csr_matrix(
+        (np.ones(len(src), dtype=bool), (src, dst)), shape=(mdp.n_states,) * 2
+    )
+    n_comps, comp = csgraph.connected_components(graph, connection="strong")
+
+    # The edges of the condensation, from each component to its predecessors
+    cross = comp[src] != comp[dst]
+    pairs = np.unique(comp[dst[cross]].astype(np.int64) * n_comps + comp[src[cross]])
+    succ, pred = np.divmod(pairs, n_comps)
+    preds = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=bool), (succ, pred)), shape=(n_comps, n_comps)
+    )
+    # Peel off the components whose successors are all done, layer by layer.
+    out_degree = np.bincount(pred, minlength=n_comps)
+    level = np.zeros(n_comps, dtype=np.intp)
+    frontier = np.flatnonzero(out_degree == 0)
+    n_levels = 0
+    while len(frontier) > 0:
+        level[frontier] = n_levels
+        n_levels += 1
+        _, items = _expand(preds.indptr, frontier)
+        candidates = preds.indices[items]
+        out_degree -= np.bincount(candidates, minlength=n_comps)
+        frontier = np.unique(candidates[out_degree[candidates] == 0])
+
+    state_level = level[comp]
+    order = np.argsort(state_level, kind="stable")
+    bounds = np.searchsorted(state_level[order], np.arange(1, n_levels))
+    return np.split(order, bounds)
+
+
+def _iterate(
+    mdp: SparseMDP,
+    values: np.ndarray,
+    fixed: np.ndarray,
+    *,
+    maximize: bool,
+    epsilon: float,
+    max_iterations: int,
+    blocks: List[np.ndarray],
+    rewards: Optional[np.ndarray] = None,
+    allowed: Optional[np.ndarray] = None,
+) -> Tuple[int, bool]:
+    """Run value iteration in place over the states that are not ``fixed``
+
+    The blocks (see `_blocks`) are solved one after the other, each until its
+    values change by less than ``epsilon``. Only the ``allowed`` choices are
+    considered, and each choice collects its reward, if any.
+
+    Returns
+    -------
+    :
+        The largest number of iterations over the blocks, and whether all of
+        them converged.
+    """
+    reducer = np.maximum if maximize else np.minimum
+    masked = -np.inf if maximize else np.inf
+    converged = True
+    iterations = 0
+    in_block = np.zeros(mdp.n_states, dtype=bool)
+    for block in blocks:
+        block = np.sort(block[~fixed[block]])
+        if len(block) == 0:
+            continue
+        lengths = mdp.choice_ptr[block + 1] - mdp.choice_ptr[block]
+        _, choices = _expand(mdp.choice_ptr, block)
+        ptr = np.cumsum(lengths) - lengths
+        matrix = mdp.transitions[choices]
+        reward = rewards[choices] if rewards is not None else 0.0
+        disallowed = ~allowed[choices] if allowed is not None else None
+        in_block[block] = True
+        cyclic = in_block[matrix.indices].any()
+        in_block[block] = False
+
+        n = 0
+        while True:
+            n += 1
+            q = matrix @ values + reward
+            if disallowed is not None:
+                q[disallowed] = masked
+            new = reducer.reduceat(q, ptr)
+            delta = np.max(np.abs(new - values[block]))
+            values[block] = new
+            if not cyclic or delta < epsilon:
+                break
+            if n >= max_iterations:
+                converged = False
+                break
+        iterations = max(iterations, n)
+    return iterations, converged
+
+
+def _progress_scheduler(
+    mdp: SparseMDP, target: np.ndarray, optimal: np.ndarray
+) -> np.ndarray:
+    """Pick optimal choices that move towards ``target``
+
+    Working backwards from ``target``, each state picks an optimal choice
+    leading (with a positive probability) to the states picked before it, so
+    the scheduler does reach ``target`` instead of looping among states with
+    the same value. The states that cannot reach ``target`` this way get
+    ``n_choices``.
+    """
+    scheduler = np.full(mdp.n_states, mdp.n_choices, dtype=np.intp)
+    done = target.copy()
+    frontier = np.flatnonzero(target)
+    while len(frontier) > 0:
+        choices = mdp.predecessors(frontier)
+        choices = choices[optimal[choices] & ~done[mdp.choice_state[choices]]]
+        # Choices are sorted, so this keeps the first one of each state.
+        frontier, first = np.unique(mdp.choice_state[choices], return_index=True)
+        scheduler[frontier] = choices[first]
+        done[frontier] = True
+    return scheduler
+
+
+def _scheduler(
+    mdp: SparseMDP,
+    q: np.ndarray,
+    values: np.ndarray,
+    target: np.ndarray,
+    *,
+    maximize: bool,
+    epsilon: float,
+    progress: bool,
+) -> np.ndarray:
+    """Pick an optimal choice in each state, given the values of the choices"""
+    # Value iteration stops short of the exact values, so the choices are
+    # compared with some slack.
+    optimal = np.isclose(q, values[mdp.choice_state], rtol=1e-4, atol=10 * epsilon)
+    scheduler = np.full(mdp.n_states, mdp.n_choices, dtype=np.intp)
+    if progress:
+        scheduler = _progress_scheduler(mdp, target, optimal)
+    # The other states pick any optimal choice, or the best one if none is
+    # within epsilon (only if value iteration did not converge).
+    rest = scheduler == mdp.n_choices
+    scheduler[rest] = _first(mdp, optimal)[rest]
+    best = _first(mdp, q == _reduce(mdp, q, maximize)[mdp.choice_state])
+    return np.where(scheduler < mdp.n_choices, scheduler, best)
+
+
+def reachability(
+    mdp: SparseMDP,
+    target: np.ndarray,
+    *,
+    maximize: bool = True,
+    epsilon: float = 1e-6,
+    max_iterations: int = 100000,
+) -> Result:
+    """Compute the maximal (or minimal) probability of reaching a set of states
+
+    The states that reach ``target`` with probability 0 are found first (see
+    `prob0a` and `prob0e`). The other states are then solved by topological
+    value iteration: the strongly connected components of the MDP are solved
+    one block at a time, in reverse topological order, each by value
+    iteration from 0 until the values change by less than ``epsilon``. In the
+    (typically many) blocks without cycles, a single iteration is exact.
+
+    Parameters
+    ----------
+    mdp:
+        The MDP.
+    target:
+        The boolean mask of the target states.
+    maximize:
+        Compute the maximal (``True``) or minimal (``False``) probabilities.
+    epsilon:
+        The convergence threshold, on the largest change of a value in an
+        iteration.
+    max_iterations:
+        The maximum number of iterations per block.
+
+    Returns
+    -------
+    :
+        The probability of reaching ``target`` from each state, along with a
+        scheduler attaining it. For maximal probabilities, the scheduler only
+        picks choices that make progress towards ``target`` (a choice can
+        attain the maximal value of a state by looping back to it forever).
+        The number of iterations is the largest over all the blocks.
+    """
+    target = np.asarray(target, dtype=bool)
+    zero = prob0a(mdp, target) if maximize else prob0e(mdp, target)
+    values = target.astype(float)
+    iterations, converged = _iterate(
+        mdp,
+        values,
+        target | zero,
+        maximize=maximize,
+        epsilon=epsilon,
+        max_iterations=max_iterations,
+        blocks=_blocks(mdp),
+    )
+    scheduler = _scheduler(
+        mdp,
+        mdp.transitions @ values,
+        values,
+        target,
+        maximize=maximize,
+        epsilon=epsilon,
+        progress=maximize,
+    )
+    return Result(values, scheduler, iterations, converged)
+
+
+def delay_rewards(mdp: SparseMDP, rates: Optional[np.ndarray] = None) -> np.ndarray:
+    """Get the rewards collected by the delays of a digital clocks MDP
+
+    Each `Tau.DELAY` choice lasts one time unit, so it collects the reward rate
+    of its state (``1`` by default, i.e., the rewards measure time). Rates can
+    be given per location with, e.g.,
+    ``np.where(mdp.states.location_mask(locations), rate, 0.0)``.
+
+    Parameters
+    ----------
+    mdp:
+        The MDP.
+    rates:
+        The reward per time unit of each state.
+    """
+    rewards = np.array([label is Tau.DELAY for label in mdp.choice_label], dtype=float)
+    if rates is not None:
+        rewards *= np.asarray(rates, dtype=float)[mdp.choice_state]
+    return rewards
+
+
+def action_rewards(mdp: SparseMDP, rewards: Mapping[Label, float]) -> np.ndarray:
+    """Get the rewards collected by the choices with the given labels"""
+    return np.array(
+        [rewards.get(label, 0.0) for label in mdp.choice_label], dtype=float
+    )
+
+
+def expected_reward(
+    mdp: SparseMDP,
+    target: np.ndarray,
+    rewards: np.ndarray,
+    *,
+    maximize: bool = False,
+    epsilon: float = 1e-6,
+    max_iterations: int = 100000,
+) -> Result:
+    """Compute the minimal (or maximal) expected reward accumulated until reaching a set of states
+
+    The rewards must be non-negative. The expected reward is infinite from
+    the states that do not reach ``target`` with probability 1, under some
+    scheduler for the minimum (see `prob1e`) or under all of them for the
+    maximum (see `prob1a`); the other states are solved by topological value
+    iteration (see `reachability`).
+
+    For the minimum, only the choices that stay among the states with a finite
+    value count, and value iteration starts from the (finite) expected reward
+    of a scheduler that reaches ``target`` with probability 1. Starting from 0
+    instead would converge to the reward of schedulers that loop forever over
+    choices without rewards.
+
+    Parameters
+    ----------
+    mdp:
+        The MDP.
+    target:
+        The boolean mask of the target states.
+    rewards:
+        The reward of each choice.
+    maximize:
+        Compute the maximal (``True``) or minimal (``False``) expected reward.
+    epsilon:
+        The convergence threshold, on the largest change of a value in an
+        iteration.
+    max_iterations:
+        The maximum number of iterations per block.
+
+    Returns
+    -------
+    :
+        The expected reward from each state, along with a scheduler attaining
+        it.
+    """
+    target = np.asarray(target, dtype=bool)
+    rewards = np.asarray(rewards, dtype=float)
+    if np.any(rewards < 0):
+        raise ValueError("Expected non-negative rewards")
+    finite = prob1a(mdp, target) if maximize else prob1e(mdp, target)
+    fixed = target | ~finite
+    values = np.where(finite, 0.0, np.inf)
+    blocks = _blocks(mdp)
+    options = dict(epsilon=epsilon, max_iterations=max_iterations, blocks=blocks)
+
+    allowed = None
+    if not maximize:
+        allowed = _stays(mdp, finite)
+        # Evaluate a scheduler that moves towards the target, to start from.
+        initial = _progress_scheduler(mdp, target, allowed)
+        picked = np.zeros(mdp.n_choices, dtype=bool)
+        picked[initial[initial < mdp.n_choices]] = True
+        _iterate(
+            mdp,
+            values,
+            fixed,
+            maximize=False,
+            rewards=rewards,
+            allowed=picked,
+            **options,
+        )
+    iterations, converged = _iterate(
+        mdp,
+        values,
+        fixed,
+        maximize=maximize,
+        rewards=rewards,
+        allowed=allowed,
+        **options,
+    )
+
+    q = mdp.transitions @ np.where(fixed & ~target, 0.0, values) + rewards
+    q[mdp.transitions @ (~finite).astype(float) > 0] = np.inf
+    scheduler = _scheduler(
+        mdp,
+        q,
+        values,
+        target,
+        maximize=maximize,
+        epsilon=epsilon,
+        progress=not maximize,
+    )
+    return Result(values, scheduler, iterations, converged)
+
+
+def expected_time(mdp: SparseMDP, target: np.ndarray, **kwargs) -> Result:
+    """Compute the minimal (or maximal) expected time to reach a set of states
+
+    This is `expected_reward` with the rewards of `delay_rewards`, so ``mdp``
+    is meant to be a digital clocks MDP (see
+    :py:func:`pta.mdp.digital_graph.build_digital_graph`).
+    """
+    return expected_reward(mdp, target, delay_rewards(mdp), **kwargs)
+
+
+__all__ = [
+    "Result",
+    "action_rewards",
+    "delay_rewards",
+    "expected_reward",
+    "expected_time",
+    "prob0a",
+    "prob0e",
+    "prob1a",
+    "prob1e",
+    "reachability",
+]
@@ -0,0 +1,213 @@
+"""Explicit MDPs stored as sparse matrices
+
+A `SparseMDP` is the explicit (finite) MDP obtained by exploring the state
+space of a PTA abstraction, such as the integral region graph (see
+:py:mod:`pta.mdp.region_graph`). States and choices are assigned integer ids:
+
+- the choices available in the state ``s`` are the rows
+  ``range(choice_ptr[s], choice_ptr[s + 1])``;
+- ``transitions`` is a CSR matrix of shape ``(n_choices, n_states)``, where
+  row ``c`` is the distribution over successor states of the choice ``c``.
+
+This way, analyses over the MDP are matrix-vector products and reductions over
+the row groups, instead of walks over an object graph.
+"""
+
+import enum
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+import attr
+import numpy as np
+from scipy import sparse
+
+S = TypeVar("S")
+Label = Hashable
+
+# The choices available in a state: a label and a distribution, as a sequence
+# of (successor, probability) pairs, for each choice.
+SuccessorFn = Callable[[S], Iterable[Tuple[Label, Iterable[Tuple[S, float]]]]]
+
+
+class Tau(enum.Enum):
+    """Labels of the choices that do not correspond to an action of the PTA"""
+
+    #: Let time elapse
+    DELAY = "delay"
+    #: Self-loop added to states without any choice
+    DEADLOCK = "deadlock"
+
+    def __repr__(self) -> str:
+        return "Tau.{}".format(self.name)
+
+
+def _expand(ptr: np.ndarray, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Expand each id into the range ``ptr[id], ..., ptr[id + 1] - 1``
+
+    Returns
+    -------
+    :
+        For each item of the ranges, the position of its id in ``ids`` and the
+        item itself.
+    """
+    starts = ptr[ids]
+    counts = ptr[ids + 1] - starts
+    owner = np.repeat(np.arange(len(ids)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return owner, np.repeat(starts, counts) + offsets
+
+
+@attr.s(frozen=True, eq=False, repr=False)
+class SparseMDP:
+    """An explicit MDP with integer-indexed states and choices
+
+    Do not construct this directly, instead use `explore` (or a builder such
+    as :py:func:`pta.mdp.region_graph.build_region_graph`).
+    """
+
+    states: Sequence[Hashable] = attr.ib()
+    state_index: Mapping[Hashable, int] = attr.ib()
+    choice_ptr: np.ndarray = attr.ib()
+    choice_label: Tuple[Label, ...] = attr.ib(converter=tuple)
+    transitions: sparse.csr_matrix = attr.ib()
+    initial: int = attr.ib(default=0)
+
+    choice_state: np.ndarray = attr.ib(init=False)
+    _predecessors: Optional[sparse.csr_matrix] = attr.ib(init=False, default=None)
+
+    def __attrs_post_init__(self):
+        if self.transitions.shape != (self.n_choices, self.n_states):
+            raise ValueError(
+                "Expected a {}x{} transition matrix, got {}".format(
+                    self.n_choices, self.n_states, self.transitions.shape
+                )
+            )
+        object.__setattr__(
+            self,
+            "choice_state",
+            np.repeat(np.arange(self.n_states), np.diff(self.choice_ptr)),
+        )
+
+    @property
+    def n_states(self) -> int:
+        return len(self.states)
+
+    @property
+    def n_choices(self) -> int:
+        return len(self.choice_label)
+
+    def state_id(self, key: Hashable) -> int:
+        """Get the id of a state from its (canonical) key"""
+        return self.state_index[key]
+
+    def choices(self, state_id: int) -> range:
+        """Get the ids of the choices available in a state"""
+        return range(self.choice_ptr[state_id], self.choice_ptr[state_id + 1])
+
+    def successors(self, choice_id: int) -> Dict[int, float]:
+        """Get the distribution over the successor states of a choice"""
+        start, end = self.transitions.indptr[choice_id : choice_id + 2]
+        return dict(
+            zip(
+                self.transitions.indices[start:end].tolist(),
+                self.transitions.data[start:end].tolist(),
+            )
+        )
+
+    def predecessors(self, state_ids: np.ndarray) -> np.ndarray:
+        """Get the choices with a positive probability of moving into any of the states"""
+        if self._predecessors is None:
+            transposed = self.transitions.transpose().tocsr()
+            transposed.eliminate_zeros()
+            object.__setattr__(self, "_predecessors", transposed)
+        _, items = _expand(self._predecessors.indptr, state_ids)
+        return np.unique(self._predecessors.indices[items])
+
+    def __repr__(self) -> str:
+        return "SparseMDP(n_states={}, n_choices={}, n_transitions={})".format(
+            self.n_states, self.n_choices, self.transitions.nnz
+        )
+
+
+def explore(
+    initial: S, successors: SuccessorFn, key: Optional[Callable[[S], Hashable]] = None
+) -> SparseMDP:
+    """Build the explicit MDP reachable from a state by breadth-first search
+
+    Parameters
+    ----------
+    initial:
+        The initial state.
+    successors:
+        Get the choices of a state, as pairs of a label and a distribution
+        over successor states (given as ``(state, probability)`` pairs).
+    key:
+        Canonical (hashable) encoding of the states, used to deduplicate them.
+        Defaults to the states themselves.
+
+    Returns
+    -------
+    :
+        The explicit MDP, where the initial state has the id ``0``, the states
+        are numbered in the order they were discovered, and the
+        ``state_index`` maps the keys of the states to their ids. States
+        without any choice get a `Tau.DEADLOCK` self-loop.
+    """
+    if key is None:
+        key = lambda state: state  # noqa: E731
+
+    states = [initial]
+    state_index = {key(initial): 0}
+    choice_ptr = [0]
+    choice_label = []
+    rows = []
+    cols = []
+    probs = []
+
+    # The states are expanded in the order of their ids, so the choice rows
+    # are grouped by state.
+    state_id = 0
+    while state_id < len(states):
+        state = states[state_id]
+        choices = list(successors(state))
+        if len(choices) == 0:
+            choices = [(Tau.DEADLOCK, [(state, 1.0)])]
+        for label, dist in choices:
+            row = len(choice_label)
+            choice_label.append(label)
+            for succ, prob in dist:
+                k = key(succ)
+                succ_id = state_index.get(k)
+                if succ_id is None:
+                    succ_id = state_index[k] = len(states)
+                    states.append(succ)
+                rows.append(row)
+                cols.append(succ_id)
+                probs.append(prob)
+        choice_ptr.append(len(choice_label))
+        state_id += 1
+
+    # Duplicate entries (targets leading to the same state) are summed.
+    transitions = sparse.csr_matrix(
+        (probs, (rows, cols)), shape=(len(choice_label), len(states)), dtype=float
+    )
+    transitions.sum_duplicates()
+    return SparseMDP(
+        states=tuple(states),
+        state_index=state_index,
+        choice_ptr=np.array(choice_ptr, dtype=np.intp),
+        choice_label=choice_label,
+        transitions=transitions,
+    )
+
+
+__all__ = ["SparseMDP", "Tau", "explore"]
@@ -0,0 +1,322 @@
+"""Passed and waiting lists for the symbolic exploration of zone graphs
+
+When exploring a zone graph, a new symbolic state ``(q, Z)`` need not be
+explored if the passed list already holds a state ``(q, Z')`` with
+``Z' ⊇ Z``: everything reachable from the former is reachable from the latter.
+The `PassedStore` keeps, for each location, only the maximal zones found so
+far. The zones of a location are stacked row-wise in a single bounds array, so
+checking a new zone against all of them is a single vectorized comparison.
+Exact duplicates are caught before that by a hash lookup, and the rows are
+pre-filtered by monotone summaries (their minimum, maximum and sum), so that
+only the zones that may include (or be included in) the new one are compared
+in full. The rows of discarded zones are compacted away once they make up
+half of a bucket.
+
+The `Waiting` list holds the states yet to be explored, in a `SearchOrder`.
+States that get covered by a larger zone while waiting are skipped.
+"""
+
+import enum
+import random
+from collections import deque
+from typing import Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+import attr
+import numpy as np
+
+from pta.clock import Clock
+from pta.zones import DBM
+
+Location = Hashable
+
+
+class SearchOrder(enum.Enum):
+    """The order in which the waiting states are explored"""
+
+    #: Breadth-first: oldest state first
+    BFS = "bfs"
+    #: Depth-first: newest state first
+    DFS = "dfs"
+    #: Depth-first, pushing the successors of each state in a random order
+    RANDOM_DFS = "random-dfs"
+
+
+@attr.s(eq=False)
+class StoreStats:
+    """Counters of a `PassedStore` and its `Waiting` list
+
+    Attributes
+    ----------
+    added:
+        The number of zones offered to the store.
+    duplicates:
+        The number of zones rejected because the same zone was stored.
+    subsumed:
+        The number of zones rejected because a larger zone was stored.
+    covered:
+        The number of stored zones discarded because a larger zone was added.
+    comparisons:
+        The number of full zone inclusion checks made (after the pre-filter).
+    skipped:
+        The number of waiting states skipped because their zone was covered.
+    max_waiting:
+        The largest size of the waiting list.
+    nbytes:
+        The memory used by the bounds and summary arrays of the store (in
+        bytes).
+    """
+
+    added: int = attr.ib(default=0)
+    duplicates: int = attr.ib(default=0)
+    subsumed: int = attr.ib(default=0)
+    covered: int = attr.ib(default=0)
+    comparisons: int = attr.ib(default=0)
+    skipped: int = attr.ib(default=0)
+    max_waiting: int = attr.ib(default=0)
+    nbytes: int = attr.ib(default=0)
+
+    @property
+    def stored(self) -> int:
+        """The number of zones currently stored"""
+        return self.added - self.duplicates - self.subsumed - self.covered
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of the zones rejected by the store"""
+        if self.added == 0:
+            return 0.0
+        return (self.duplicates + self.subsumed) / self.added
+
+
+# Clipping of `INF` in the sums of the summaries, so that they cannot overflow
+_CLIP = 2**40
+
+
+def _summaries(rows: np.ndarray) -> np.ndarray:
+    """Get the (min, max, clipped sum) of each row of bounds
+
+    These are monotone: if a row is below another one, so are its summaries.
+    """
+    return np.stack(
+        [rows.min(axis=1), rows.max(axis=1), np.minimum(rows, _CLIP).sum(axis=1)],
+        axis=1,
+    )
+
+
+class _Bucket:
+    """The maximal zones of a single location
+
+    The zones are rows of ``bounds``, and each zone has a key that does not
+    change when the rows of the discarded zones are compacted away.
+    """
+
+    def __init__(self, width: int):
+        self.bounds = np.empty((4, width), dtype=np.int64)
+        self.summaries = np.empty((4, 3), dtype=np.int64)
+        self.alive = np.zeros(4, dtype=bool)
+        self.zones: List[Optional[DBM]] = []
+        # The key of each stored zone, and the row of each key
+        self.index: Dict[DBM, int] = {}
+        self.rows: Dict[int, int] = {}
+        self.next_key = 0
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bounds.nbytes + self.summaries.nbytes
+
+    def _resize(self, size: int):
+        n = len(self.zones)
+        bounds = np.empty((size, self.bounds.shape[1]), dtype=np.int64)
+        bounds[:n] = self.bounds[:n]
+        summaries = np.empty((size, 3), dtype=np.int64)
+        summaries[:n] = self.summaries[:n]
+        alive = np.zeros(size, dtype=bool)
+        alive[:n] = self.alive[:n]
+        self.bounds, self.summaries, self.alive = bounds, summaries, alive
+
+    def _compact(self):
+        """Drop the rows of the discarded zones"""
+        live = np.flatnonzero(self.alive[: len(self.zones)])
+        n = len(live)
+        self.bounds[:n] = self.bounds[live]
+        self.summaries[:n] = self.summaries[live]
+        self.alive[:n] = True
+        self.alive[n:] = False
+        self.zones = [self.zones[i] for i in live]
+        self.rows = {self.index[zone]: i for i, zone in enumerate(self.zones)}
+        if len(self.alive) > max(4, 4 * n):
+            self._resize(max(4, 2 * n))
+
+    def _candidates(self, summary: np.ndarray, larger: bool) -> np.ndarray:
+        """Get the live rows whose summaries are all above (or below) ``summary``"""
+        n = len(self.zones)
+        stored = self.summaries[:n]
+        ok = np.all(summary <= stored if larger else stored <= summary, axis=1)
+        return np.flatnonzero(ok & self.alive[:n])
+
+    def add(self, zone: DBM, stats: StoreStats) -> Optional[int]:
+        if zone in self.index:
+            stats.duplicates += 1
+            return None
+        row = zone.bounds.ravel()
+        summary = _summaries(row[np.newaxis])[0]
+        # Only the zones that pass the summary pre-filter are compared in full
+        larger = self._candidates(summary, True)
+        stats.comparisons += len(larger)
+        if np.any(np.all(row <= self.bounds[larger], axis=1)):
+            stats.subsumed += 1
+            return None
+        smaller = self._candidates(summary, False)
+        stats.comparisons += len(smaller)
+        for i in smaller[np.all(self.bounds[smaller] <= row, axis=1)]:
+            self.alive[i] = False
+            del self.rows[self.index.pop(self.zones[i])]
+            self.zones[i] = None
+            stats.covered += 1
+
+        nbytes = self.nbytes
+        if 2 * len(self.index) < len(self.zones):
+            self._compact()
+        n = len(self.zones)
+        if n == len(self.alive):
+            self._resize(2 * n)
+        stats.nbytes += self.nbytes - nbytes
+        self.bounds[n] = row
+        self.summaries[n] = summary
+        self.alive[n] = True
+        self.zones.append(zone)
+        key = self.next_key
+        self.next_key += 1
+        self.index[zone] = key
+        self.rows[key] = n
+        return key
+
+    def covers(self, zone: DBM, stats: StoreStats) -> bool:
+        if zone in self.index:
+            return True
+        row = zone.bounds.ravel()
+        larger = self._candidates(_summaries(row[np.newaxis])[0], True)
+        stats.comparisons += len(larger)
+        return bool(np.any(np.all(row <= self.bounds[larger], axis=1)))
+
+
+class PassedStore:
+    """The maximal zones found so far, in buckets by location
+
+    Parameters
+    ----------
+    clocks:
+        The clocks of the zones.
+    """
+
+    def __init__(self, clocks: Sequence[Clock]):
+        self._width = (len(clocks) + 1) ** 2
+        self._buckets: Dict[Location, _Bucket] = {}
+        self.stats = StoreStats()
+
+    def add(self, location: Location, zone: DBM) -> Optional[int]:
+        """Add a zone, unless it is included in a stored zone of the location
+
+        Stored zones of the location included in the new zone are discarded.
+
+        Returns
+        -------
+        :
+            The key of the zone in its bucket if it was stored (see `alive`),
+            or ``None``.
+        """
+        self.stats.added += 1
+        bucket = self._buckets.get(location)
+        if bucket is None:
+            bucket = self._buckets[location] = _Bucket(self._width)
+            self.stats.nbytes += bucket.nbytes
+        return bucket.add(zone, self.stats)
+
+    def alive(self, location: Location, key: int) -> bool:
+        """Check if the zone stored with a key has not been discarded since"""
+        return key in self._buckets[location].rows
+
+    def covers(self, location: Location, zone: DBM) -> bool:
+        """Check if a stored zone of the location includes the zone"""
+        bucket = self._buckets.get(location)
+        return bucket is not None and bucket.covers(zone, self.stats)
+
+    def zones(self, location: Location) -> List[DBM]:
+        """Get the maximal zones of a location"""
+        bucket = self._buckets.get(location)
+        if bucket is None:
+            return []
+        return [z for z in bucket.zones if z is not None]
+
+    def __iter__(self) -> Iterator[Tuple[Location, DBM]]:
+        for location, bucket in self._buckets.items():
+            for zone in bucket.zones:
+                if zone is not None:
+                    yield location, zone
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._buckets.values())
+
+    def __repr__(self) -> str:
+        return "PassedStore(locations={}, zones={})".format(
+            len(self._buckets), len(self)
+        )
+
+
+class Waiting:
+    """The states yet to be explored, referring to their key in a `PassedStore`
+
+    Parameters
+    ----------
+    store:
+        The passed store of the states.
+    order:
+        The search order.
+    rng:
+        The random number generator used by `SearchOrder.RANDOM_DFS`. By
+        default, the `random` module is used.
+    """
+
+    def __init__(
+        self,
+        store: PassedStore,
+        order: SearchOrder = SearchOrder.BFS,
+        rng: Optional[random.Random] = None,
+    ):
+        self._store = store
+        self._order = SearchOrder(order)
+        self._rng = random if rng is None else rng
+        self._queue: deque = deque()
+
+    def push(self, states: Sequence[Tuple[Location, DBM]]):
+        """Add the states to the store, and wait for those that were stored"""
+        states = list(states)
+        if self._order is SearchOrder.RANDOM_DFS:
+            self._rng.shuffle(states)
+        for location, zone in states:
+            key = self._store.add(location, zone)
+            if key is not None:
+                self._queue.append((location, zone, key))
+        stats = self._store.stats
+        stats.max_waiting = max(stats.max_waiting, len(self._queue))
+
+    def pop(self) -> Optional[Tuple[Location, DBM]]:
+        """Get the next state to explore, or ``None`` if there is none left"""
+        while len(self._queue) > 0:
+            if self._order is SearchOrder.BFS:
+                location, zone, key = self._queue.popleft()
+            else:
+                location, zone, key = self._queue.pop()
+            if self._store.alive(location, key):
+                return location, zone
+            self._store.stats.skipped += 1
+        return None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+
+__all__ = ["PassedStore", "SearchOrder", "StoreStats", "Waiting"]
@@ -0,0 +1,272 @@
+"""Vectorized MDP simulators for PTAs.
+
+`VectorMDP` (and `VectorDigitalMDP`) hold ``n_envs`` independent copies of the
+state of a PTA as arrays, an array of integer location ids and a matrix of
+clock valuations, and step all of them in one call. The semantics of a step
+are the same as :py:meth:`pta.mdp.MDP.step`: each environment is delayed,
+takes the requested edge if its guard holds, and then the environment may
+take one of its own enabled edges.
+
+The simulators run on the tables of a `CompiledPTA`, and environments that
+reach a terminal location (or the step limit) are automatically reset.
+"""
+
+from typing import Hashable, Iterable, NamedTuple, Optional
+
+import attr
+import numpy as np
+
+from pta.clock import DelayBounds
+from pta.compiled import CompiledPTA
+from pta.mdp.encoding import ObservationEncoder, _compile
+from pta.mdp.masks import ActionMask
+
+Location = Hashable
+
+
+class VectorState(NamedTuple):
+    """Batched observation of a `VectorMDP`
+
+    For environments that were done (and hence reset) in the last step,
+    ``location`` and ``clocks`` hold the state after the reset.
+    """
+
+    location: np.ndarray
+    clocks: np.ndarray
+    done: np.ndarray
+
+
+@attr.s(eq=False, repr=False)
+class VectorMDP:
+    """Step ``n_envs`` independent copies of the MDP simulator of a PTA at once
+
+    Parameters
+    ----------
+    pta:
+        The PTA to simulate (compiled if it isn't already).
+    n_envs:
+        The number of independent environments.
+    terminal:
+        Locations that end an episode.
+    max_steps:
+        Maximum number of steps in an episode, if any.
+    seed:
+        Seed for the random number generator of the simulator.
+    encoder:
+        The encoder of the observations written by `observe` (an
+        `ObservationEncoder` of the location ids and clock values by default).
+    """
+
+    _pta: CompiledPTA = attr.ib(converter=_compile)
+    n_envs: int = attr.ib()
+    _terminal: Iterable[Location] = attr.ib(default=(), kw_only=True)
+    max_steps: Optional[int] = attr.ib(default=None, kw_only=True)
+    seed: Optional[int] = attr.ib(default=None, kw_only=True)
+    encoder: Optional[ObservationEncoder] = attr.ib(default=None, kw_only=True)
+
+    _terminal_mask: np.ndarray = attr.ib(init=False)
+    _rng: np.random.Generator = attr.ib(init=False)
+    _location: np.ndarray = attr.ib(init=False)
+    _clocks: np.ndarray = attr.ib(init=False)
+    _steps: np.ndarray = attr.ib(init=False)
+    _mask: np.ndarray = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        self._terminal_mask = np.zeros(self._pta.n_locations, dtype=bool)
+        for loc in self._terminal:
+            self._terminal_mask[self._pta.location_id(loc)] = True
+        self._rng = np.random.default_rng(self.seed)
+        self._location = np.full(self.n_envs, self._pta.initial, dtype=np.intp)
+        self._clocks = np.zeros((self.n_envs, self._pta.n_clocks))
+        self._steps = np.zeros(self.n_envs, dtype=np.intp)
+        self._mask = np.zeros((self.n_envs, self._pta.n_controllable), dtype=bool)
+        if self.encoder is None:
+            self.encoder = ObservationEncoder(self._pta)
+
+    @property
+    def pta(self) -> CompiledPTA:
+        return self._pta
+
+    @property
+    def location(self) -> np.ndarray:
+        """The location ids of the environments"""
+        return self._location
+
+    @property
+    def clocks(self) -> np.ndarray:
+        """The clock valuations of the environments, in the PTA's clock order"""
+        return self._clocks
+
+    def observe(self, out: np.ndarray) -> np.ndarray:
+        """Write the current states into a buffer, one row per environment
+
+        The states are encoded by the ``encoder`` of the simulator, by default
+        an `ObservationEncoder` of the location ids and the clock values. Make
+        the buffer with ``encoder.empty(n_envs)``, and reuse it across steps.
+        """
+        return self.encoder.encode_batch(self._location, self._clocks, out)
+
+    def action_mask(self, out: Optional[np.ndarray] = None) -> ActionMask:
+        """Get the mask of the actions enabled in every environment
+
+        Parameters
+        ----------
+        out:
+            The ``(n_envs, n_controllable)`` boolean array to write the mask
+            to. By default, the mask is written to an array owned by the
+            simulator, which is overwritten by the next call.
+
+        Returns
+        -------
+        :
+            The mask, with one row per environment over the (controllable)
+            action ids, and the delays allowed by the invariant of each
+            environment.
+        """
+        pta = self._pta
+        out = self._mask if out is None else out
+        out[:] = False
+        edges = pta.edge_table[self._location, : pta.n_controllable]
+        envs, actions = np.nonzero(edges >= 0)
+        ok = pta.guard_bounds.satisfied(edges[envs, actions], self._clocks[envs])
+        out[envs[ok], actions[ok]] = True
+        return ActionMask(
+            out, pta.invariant_bounds.delays(self._location, self._clocks)
+        )
+
+    def _get_obs(self, done: np.ndarray) -> VectorState:
+        return VectorState(self._location.copy(), self._clocks.copy(), done)
+
+    def reset(self, mask: Optional[np.ndarray] = None) -> VectorState:
+        """Reset all the environments (or those selected by a boolean mask)"""
+        if mask is None:
+            mask = np.ones(self.n_envs, dtype=bool)
+        self._location[mask] = self._pta.initial
+        self._clocks[mask] = 0.0
+        self._steps[mask] = 0
+        return self._get_obs(np.zeros(self.n_envs, dtype=bool))
+
+    def _take_edges(self, envs: np.ndarray, edges: np.ndarray):
+        """Move the environments ``envs`` through the (enabled) ``edges``"""
+        targets = self._pta.sample_targets(edges, self._rng)
+        self._location[envs] = self._pta.target_location[targets]
+        self._clocks[envs] = np.where(
+            self._pta.target_reset[targets], 0.0, self._clocks[envs]
+        )
+
+    def _env_delays(self, bounds: DelayBounds) -> np.ndarray:
+        """Pick delays within the given bounds (see `MDP._default_delay_stochasticity`)"""
+        lower = bounds.lower + np.where(bounds.left_closed, 0.0, 0.1)
+        upper = bounds.upper - np.where(bounds.right_closed, 0.0, 0.1)
+        bounded = np.isfinite(bounds.upper)
+        delay = lower.copy()
+        delay[bounded] = self._rng.uniform(lower[bounded], upper[bounded])
+        return delay
+
+    def _env_moves(self):
+        """Let every environment take one of its enabled uncontrollable edges, if any"""
+        pta = self._pta
+        n_ctrl = pta.n_controllable
+        if n_ctrl == pta.n_actions:
+            return
+        # (n_envs, n_env_actions) matrix of candidate edges
+        edges = pta.edge_table[self._location, n_ctrl:]
+        envs, cols = np.nonzero(edges >= 0)
+        candidates = edges[envs, cols]
+        enabled = pta.guard_bounds.satisfied(candidates, self._clocks[envs])
+        envs, candidates = envs[enabled], candidates[enabled]
+        if len(envs) == 0:
+            return
+        # Pick one enabled edge per environment uniformly at random: shuffle
+        # the candidates and keep the first one of each environment.
+        order = self._rng.permutation(len(envs))
+        envs, candidates = envs[order], candidates[order]
+        envs, first = np.unique(envs, return_index=True)
+        edges = candidates[first]
+
+        self._clocks[envs] += self._env_delays(
+            pta.guard_bounds.delays(edges, self._clocks[envs])
+        )[:, np.newaxis]
+        self._take_edges(envs, edges)
+
+    def step(self, delays: np.ndarray, actions: np.ndarray) -> VectorState:
+        """Take a timed action in every environment
+
+        Parameters
+        ----------
+        delays:
+            An ``(n_envs,)`` array of delays.
+        actions:
+            An ``(n_envs,)`` array of action ids (see
+            :py:meth:`CompiledPTA.action_id`), where ``-1`` means that the
+            environment only delays.
+
+        Returns
+        -------
+        :
+            The new state of the environments.
+        """
+        pta = self._pta
+        actions = np.asarray(actions, dtype=np.intp)
+        self._clocks += np.asarray(delays, dtype=float)[:, np.newaxis]
+
+        # Look up the requested edges; -1 where there is no such edge
+        edges = np.where(
+            actions >= 0, pta.edge_table[self._location, np.maximum(actions, 0)], -1
+        )
+        envs = np.flatnonzero(edges >= 0)
+        enabled = pta.guard_bounds.satisfied(edges[envs], self._clocks[envs])
+        envs = envs[enabled]
+        self._take_edges(envs, edges[envs])
+
+        self._env_moves()
+
+        self._steps += 1
+        done = self._terminal_mask[self._location]
+        if self.max_steps is not None:
+            done |= self._steps >= self.max_steps
+        if done.any():
+            self.reset(done)
+        return self._get_obs(done)
+
+    def __repr__(self) -> str:
+        return "{}({}, n_envs={})".format(type(self).__name__, self._pta, self.n_envs)
+
+
+@attr.s(eq=False, repr=False)
+class VectorDigitalMDP(VectorMDP):
+    """Vectorized counterpart of `pta.mdp.DigitalMDP`
+
+    Delays are restricted to integers, and all clock constraints are
+    implicitly assumed to be closed.
+    """
+
+    def _env_delays(self, bounds: DelayBounds) -> np.ndarray:
+        """Pick integer delays within the given bounds (see `DigitalMDP._default_delay_stochasticity`)
+
+        Open ends exclude their bound, even an integer one. The edges of
+        `_env_moves` are enabled without delay, so bounds without any integer
+        (e.g., ``(1.2, 1.8)``, from rounding errors) give no delay.
+        """
+        lower = np.where(
+            bounds.left_closed, np.ceil(bounds.lower), np.floor(bounds.lower) + 1
+        )
+        upper = np.where(
+            bounds.right_closed, np.floor(bounds.upper), np.ceil(bounds.upper) - 1
+        )
+        empty = lower > upper
+        bounded = np.isfinite(upper) & ~empty
+        delay = lower.copy()
+        delay[empty] = 0.0
+        delay[bounded] = self._rng.integers(
+            lower[bounded].astype(np.int64),
+            upper[bounded].astype(np.int64),
+            endpoint=True,
+        )
+        return delay
+
+    def step(self, delays: np.ndarray, actions: np.ndarray) -> VectorState:
+        delays = np.asarray(delays)
+        if not np.all(np.mod(delays, 1) == 0):
+            raise ValueError("Delays in a digital clocks MDP must be integers")
+        return super().step(delays, actions)
@@ -0,0 +1,143 @@
+"""Forward zone graph of a PTA
+
+The states of the zone graph are pairs ``(q, Z)`` of a location and a `DBM`
+zone, closed under time elapse within the invariant of ``q``. The initial
+state is the zone of valuations reachable from all clocks being 0 by letting
+time elapse in the initial location. For each edge whose guard intersects
+``Z``, and each of its targets ``q'`` (with reset clocks ``X``), the successor
+zone is
+
+.. math::
+
+    \\mathit{Extra}_M(((Z \\cap g)[X := 0] \\cap I(q'))^{\\uparrow} \\cap I(q'))
+
+where the extrapolation (see :py:meth:`pta.zones.DBM.extrapolate`) uses the
+maximal constants of the PTA, so the zone graph is finite. A single zone
+stands for the many regions (see :py:mod:`pta.mdp.region_graph`) it contains,
+so the zone graph is typically much smaller than the region graph.
+"""
+
+import random
+from typing import Callable, Hashable, NamedTuple, Optional, Union
+
+from pta.compiled import CompiledPTA
+from pta.mdp.sparse import SparseMDP, explore
+from pta.mdp.store import PassedStore, SearchOrder, Waiting
+from pta.pta import PTA
+from pta.zones import DBM
+
+Location = Hashable
+
+
+class ZoneState(NamedTuple):
+    """A symbolic state of the zone graph"""
+
+    location: Location
+    zone: DBM
+
+
+def _symbolic(compiled: CompiledPTA):
+    """Get the initial zone state and the successor function of a PTA"""
+    max_constants = compiled.max_constants()
+
+    def elapse(loc_id: int, zone: DBM) -> DBM:
+        invariant = compiled.invariant[loc_id]
+        zone = zone.constrain(invariant).up().constrain(invariant)
+        return zone.extrapolate(max_constants)
+
+    def successors(state: ZoneState):
+        loc_id = compiled.location_id(state.location)
+        for e in compiled.edges(loc_id):
+            zone = state.zone.constrain(compiled.edge_guard[e])
+            if zone.empty:
+                continue
+            targets = compiled.targets(e)
+            total = compiled.target_prob[targets.start : targets.stop].sum()
+            dist = []
+            for t in targets:
+                target = int(compiled.target_location[t])
+                succ = elapse(target, zone.reset(compiled.reset_clocks(t)))
+                if not succ.empty:
+                    dist.append(
+                        (
+                            ZoneState(compiled.locations[target], succ),
+                            float(compiled.target_prob[t] / total),
+                        )
+                    )
+            if len(dist) > 0:
+                yield compiled.action_labels[compiled.edge_action[e]], dist
+
+    zone = elapse(compiled.initial, DBM.zero(compiled.clock_order))
+    if zone.empty:
+        raise ValueError("The invariant of the initial location does not hold")
+    return ZoneState(compiled.initial_location, zone), successors
+
+
+def build_zone_graph(pta: Union[PTA, CompiledPTA]) -> SparseMDP:
+    """Explore the zone graph reachable from the initial state
+
+    Parameters
+    ----------
+    pta:
+        The PTA (compiled, if it isn't already).
+
+    Returns
+    -------
+    :
+        The zone graph as a `SparseMDP` over `ZoneState`, whose choices are the
+        edges of the PTA. Targets whose successor zone is empty (because of the
+        invariant of the target location) are left out, so the probabilities
+        of a choice may sum up to less than 1.
+    """
+    compiled = pta if isinstance(pta, CompiledPTA) else pta.compile()
+    initial, successors = _symbolic(compiled)
+    return explore(initial, successors)
+
+
+def explore_zones(
+    pta: Union[PTA, CompiledPTA],
+    order: SearchOrder = SearchOrder.BFS,
+    *,
+    rng: Optional[random.Random] = None,
+    stop: Optional[Callable[[ZoneState], bool]] = None,
+) -> PassedStore:
+    """Explore the reachable zones, keeping only the maximal zones of each location
+
+    Unlike `build_zone_graph`, this does not record the transitions, and does
+    not explore the zones included in a zone found before: this answers
+    qualitative reachability questions on much larger PTAs.
+
+    Parameters
+    ----------
+    pta:
+        The PTA (compiled, if it isn't already).
+    order:
+        The search order.
+    rng:
+        The random number generator used by `SearchOrder.RANDOM_DFS`.
+    stop:
+        Stop the search as soon as a state satisfying this is explored.
+
+    Returns
+    -------
+    :
+        The passed store, whose ``stats`` describe the search.
+    """
+    compiled = pta if isinstance(pta, CompiledPTA) else pta.compile()
+    initial, successors = _symbolic(compiled)
+    store = PassedStore(compiled.clock_order)
+    waiting = Waiting(store, order, rng)
+    waiting.push([initial])
+    state = waiting.pop()
+    while state is not None:
+        state = ZoneState(*state)
+        if stop is not None and stop(state):
+            break
+        waiting.push(
+            [succ for _, dist in successors(state) for succ, prob in dist if prob > 0]
+        )
+        state = waiting.pop()
+    return store
+
+
+__all__ = ["ZoneState", "build_zone_graph", "explore_zones"]
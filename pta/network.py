@@ -0,0 +1,194 @@
+"""Networks of PTAs, composed on the fly
+
+A `Network` is the parallel composition of component PTAs. Its locations are
+the tuples of the locations of the components, and its edges are either
+
+- the edges of a single component, for the actions that are not synchronized,
+  labelled ``(i, action)`` where ``i`` is the index of the component; or
+- the joint edges of several components, for each synchronization rule: the
+  rule ``label -> {i: a_i, j: a_j, ...}`` yields an edge labelled ``label``
+  whenever component ``i`` has an edge ``a_i``, component ``j`` an edge
+  ``a_j``, and so on. The guard is the conjunction of the guards, the target
+  distribution is the product of the target distributions, and the resets are
+  the union of the resets.
+
+The invariant of a product location is the conjunction of the invariants of
+the components. Nothing is precomputed: the transitions and invariants of a
+product location are derived from those of the components whenever they are
+requested, so only the visited product locations are ever built. The
+simulators (`MDP`, `DigitalMDP`, `RegionMDP`, ...) take a network as they
+take a PTA, through `Network.to_pta`. Pass them ``network.to_pta().cached()``
+instead to memoize the product locations visited so far (see
+:py:meth:`PTA.cached`).
+"""
+
+import functools
+import itertools
+from typing import (
+    Dict,
+    FrozenSet,
+    Hashable,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import attr
+
+from pta.clock import Boolean, Clock, ClockConstraint
+from pta.distributions import DiscreteDistribution
+from pta.pta import PTA, Target, Transition
+from pta.spaces import ProductSpace
+
+Action = Hashable
+Location = Tuple[Hashable, ...]
+SyncRules = Mapping[Action, Mapping[int, Action]]
+Rule = Tuple[Action, Tuple[Tuple[int, Action], ...]]
+Model = TypeVar("Model")
+
+
+def _rules(syncs: Union[SyncRules, Sequence[Rule]]) -> Tuple[Rule, ...]:
+    items = syncs.items() if isinstance(syncs, Mapping) else syncs
+    return tuple((label, tuple(sorted(dict(parts).items()))) for label, parts in items)
+
+
+@attr.s(frozen=True, repr=False)
+class Network:
+    """The parallel composition of PTAs, with synchronization rules
+
+    Parameters
+    ----------
+    components:
+        The component PTAs.
+    syncs:
+        The synchronization rules: each label of the network maps to the
+        actions (by component index) that must be taken together. A component
+        action that appears in a rule is never taken on its own.
+        They are stored as a tuple of ``(label, ((i, a_i), ...))`` pairs, so
+        that networks can be hashed.
+    """
+
+    components: Tuple[PTA, ...] = attr.ib(converter=tuple)
+    syncs: Tuple[Rule, ...] = attr.ib(factory=tuple, converter=_rules)
+
+    _synced: Tuple[FrozenSet[Action], ...] = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        synced: List[set] = [set() for _ in self.components]
+        for label, parts in self.syncs:
+            if len(parts) == 0:
+                raise ValueError("The rule {!r} synchronizes nothing".format(label))
+            for i, action in parts:
+                if not 0 <= i < len(self.components):
+                    raise ValueError(
+                        "The rule {!r} refers to the component {}, out of {}".format(
+                            label, i, len(self.components)
+                        )
+                    )
+                synced[i].add(action)
+        object.__setattr__(self, "_synced", tuple(frozenset(s) for s in synced))
+
+    @property
+    def location_space(self) -> ProductSpace:
+        return ProductSpace(*(c.location_space for c in self.components))
+
+    @property
+    def clocks(self) -> FrozenSet[Clock]:
+        """Get the clocks of all the components"""
+        return frozenset().union(*(c.clocks for c in self.components))
+
+    @property
+    def actions(self) -> FrozenSet[Action]:
+        """Get the controllable labels of the network
+
+        The edges of a component that are not synchronized are controllable
+        if they are in the component, and synchronized edges are controllable
+        if all the actions they synchronize are.
+        """
+        local = {
+            (i, action)
+            for i, c in enumerate(self.components)
+            for action in c.actions - self._synced[i]
+        }
+        joint = {
+            label
+            for label, parts in self.syncs
+            if all(action in self.components[i].actions for i, action in parts)
+        }
+        return frozenset(local | joint)
+
+    @property
+    def initial_location(self) -> Location:
+        return tuple(c.initial_location for c in self.components)
+
+    def invariants(self, loc: Location) -> ClockConstraint:
+        return functools.reduce(
+            lambda a, b: a & b,
+            (c.invariants(q) for c, q in zip(self.components, loc)),
+            Boolean(True),
+        )
+
+    def transitions(self, loc: Location) -> Mapping[Action, Transition]:
+        local = [c.transitions(q) for c, q in zip(self.components, loc)]
+        ret: Dict[Action, Transition] = dict()
+        for i, transitions in enumerate(local):
+            for action, (guard, dist) in transitions.items():
+                if action not in self._synced[i]:
+                    ret[(i, action)] = Transition(guard, self._move(loc, [(i, dist)]))
+        for label, parts in self.syncs:
+            if not all(action in local[i] for i, action in parts):
+                continue
+            guard = functools.reduce(
+                lambda a, b: a & b, (local[i][action].guard for i, action in parts)
+            )
+            dists = [(i, local[i][action].target_dist) for i, action in parts]
+            ret[label] = Transition(guard, self._move(loc, dists))
+        return ret
+
+    @staticmethod
+    def _move(
+        loc: Location, dists: Sequence[Tuple[int, DiscreteDistribution]]
+    ) -> DiscreteDistribution[Target]:
+        """Get the product of the target distributions of some components"""
+        supports = [
+            [(i, target, dist(target)) for target in dist.support] for i, dist in dists
+        ]
+        ret: Dict[Target, float] = dict()
+        for combination in itertools.product(*supports):
+            target = list(loc)
+            reset: FrozenSet[Clock] = frozenset()
+            prob = 1.0
+            for i, (r, location), p in combination:
+                target[i] = location
+                reset = reset | frozenset(r)
+                prob *= p
+            key = Target(reset, tuple(target))
+            ret[key] = ret.get(key, 0.0) + prob
+        return DiscreteDistribution(ret)
+
+    def to_pta(self) -> PTA:
+        """Get the network as a `PTA`, whose transitions are computed on demand"""
+        return PTA(
+            location_space=self.location_space,
+            clocks=self.clocks,
+            actions=self.actions,
+            init_location=self.initial_location,
+            transitions=self.transitions,
+            invariants=self.invariants,
+        )
+
+    def __repr__(self) -> str:
+        return "Network(n_components={}, n_syncs={})".format(
+            len(self.components), len(self.syncs)
+        )
+
+
+def _as_pta(model: Union["Network", Model]) -> Union[PTA, Model]:
+    """Get a network as a `PTA`, and anything else as it is"""
+    return model.to_pta() if isinstance(model, Network) else model
+
+
+__all__ = ["Network"]
@@ -1,13 +1,29 @@
 """Probabilistic Timed Automaton"""
 
-from typing import Callable, FrozenSet, Hashable, Mapping, NamedTuple, Set, Text
+import functools
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Text,
+)
 
 import attr
 
-from pta.clock import Clock, ClockConstraint, ClockValuation, Interval, delays
+from pta.clock import Clock, ClockConstraint, ClockValuation, DelayInterval, delays
 from pta.distributions import DiscreteDistribution
 from pta.spaces import Space
 
+if TYPE_CHECKING:
+    from pta.compiled import CompiledPTA
+
 Action = Hashable
 Label = Text
 Location = Hashable
@@ -26,6 +42,41 @@ class Transition(NamedTuple):
 TransitionFn = Callable[[Location], Mapping[Action, Transition]]
 
 
+def _read_only(fn: TransitionFn) -> TransitionFn:
+    """Wrap a transition function so that the returned mappings can be shared"""
+
+    @functools.wraps(fn)
+    def wrapper(loc: Location) -> Mapping[Action, Transition]:
+        return MappingProxyType(fn(loc))
+
+    return wrapper
+
+
+class _Cache:
+    """A `functools.lru_cache` of a function of the locations, made by `PTA.cached`
+
+    Only the function and the options are pickled: the cache is rebuilt
+    (empty) when it is unpickled.
+    """
+
+    __slots__ = ("fn", "maxsize", "read_only", "_cached")
+
+    def __init__(self, fn: Callable, maxsize: Optional[int], read_only: bool = False):
+        self.fn = fn
+        self.maxsize = maxsize
+        self.read_only = read_only
+        self._cached = functools.lru_cache(maxsize)(_read_only(fn) if read_only else fn)
+
+    def __call__(self, loc: Location):
+        return self._cached(loc)
+
+    def cache_info(self) -> NamedTuple:
+        return self._cached.cache_info()
+
+    def __reduce__(self):
+        return _Cache, (self.fn, self.maxsize, self.read_only)
+
+
 @attr.s(frozen=True, auto_attribs=True, kw_only=True)
 class PTA:
 
@@ -57,6 +108,69 @@ class PTA:
         """Get the initial location of the PTA"""
         return self._init_location
 
+    def compile(self) -> "CompiledPTA":
+        """Materialize the PTA into integer-indexed tables
+
+        This requires the set of locations reachable from the initial location
+        to be finite.
+
+        .. seealso::
+            :py:class:`~pta.compiled.CompiledPTA`
+        """
+        from pta.compiled import CompiledPTA
+
+        return CompiledPTA.from_pta(self)
+
+    def cached(self, maxsize: Optional[int] = 1024) -> "PTA":
+        """Get a copy of the PTA that memoizes its transitions and invariants
+
+        The transition and invariant functions are wrapped in a
+        :py:func:`functools.lru_cache` of (at most) ``maxsize`` locations each,
+        so recurring locations do not re-invoke the user callables. This is
+        useful when the location space is too large (or too implicit) to
+        :py:meth:`compile`.
+
+        The caches are thread-safe, and the cached transition mappings are
+        read-only, so a cached PTA can be shared by any number of simulators.
+        Locations must be hashable. Calling this on a cached PTA replaces its
+        caches (rather than caching the caches).
+
+        A cached PTA can be pickled (e.g., to send it to the workers of a
+        process pool) if its transition and invariant functions can: the
+        caches are not pickled, and start empty in the unpickled copy.
+
+        Parameters
+        ----------
+        maxsize:
+            The maximum number of locations in each cache, or ``None`` for an
+            unbounded cache.
+        """
+        transitions, invariants = self._transitions, self._invariants
+        if isinstance(transitions, _Cache):
+            transitions = transitions.fn
+        if isinstance(invariants, _Cache):
+            invariants = invariants.fn
+        return attr.evolve(
+            self,
+            transitions=_Cache(transitions, maxsize, read_only=True),
+            invariants=_Cache(invariants, maxsize),
+        )
+
+    def cache_info(self) -> Dict[str, Optional[NamedTuple]]:
+        """Get the hit/miss statistics of the caches created by :py:meth:`cached`
+
+        Returns
+        -------
+        :
+            The :py:func:`functools.lru_cache` statistics for the
+            ``"transitions"`` and ``"invariants"`` caches, or ``None`` for a
+            function that is not cached.
+        """
+        return {
+            "transitions": getattr(self._transitions, "cache_info", lambda: None)(),
+            "invariants": getattr(self._invariants, "cache_info", lambda: None)(),
+        }
+
     def transitions(self, loc) -> Mapping[Action, Transition]:
         return self._transitions(loc)
 
@@ -93,10 +207,12 @@ class PTA:
             if values in guard
         }
 
-    def allowed_delays(self, loc: Location, values: ClockValuation) -> Interval:
+    def allowed_delays(self, loc: Location, values: ClockValuation) -> DelayInterval:
         """Return the interval of delays that satisfy the invariant at the
         given location and clock valuation.
 
+        The interval is a `DelayInterval` (see :py:func:`~pta.clock.delays`).
+
         .. seealso::
             :py:func:`~pta.clocks.delays`
         """
@@ -0,0 +1,228 @@
+"""Replay buffer of simulator transitions in a memory-mapped file
+
+A `ReplayBuffer` holds ``(state, action, next_state, done)`` transitions of a
+PTA simulator in terms of the ids of a `CompiledPTA`, as in
+:py:class:`pta.mdp.VectorMDP`: a state is a location id and a vector of clock
+values, and an action is an action id (``-1`` for a pure delay) and a delay.
+
+The buffer lives in a single file, which any number of processes can map: the
+transitions themselves are never pickled. To allow appends without locks, the
+buffer is split into one shard per writer, each a ring of fixed capacity with
+its own write counter. A writer fills the slots of its shard and only then
+publishes them by advancing the counter, and readers only sample published
+slots. Since a writer reuses the oldest slots of its ring, a reader can still
+see a transition while it is being overwritten.
+"""
+
+import os
+import tempfile
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+_MAGIC = 0x5054415245504C59  # "PTAREPLY"
+_VERSION = 1
+# Header words: magic, version, n_clocks, shard capacity, number of shards
+_HEADER = 5
+_ALIGN = 64
+
+
+def transition_dtype(n_clocks: int) -> np.dtype:
+    """Get the record type of the transitions of a PTA with ``n_clocks`` clocks"""
+    return np.dtype(
+        [
+            ("location", np.int32),
+            ("clocks", np.float64, (n_clocks,)),
+            ("action", np.int32),
+            ("delay", np.float64),
+            ("next_location", np.int32),
+            ("next_clocks", np.float64, (n_clocks,)),
+            ("done", np.bool_),
+        ]
+    )
+
+
+class Batch(NamedTuple):
+    """A minibatch of transitions, as arrays over the transitions"""
+
+    location: np.ndarray
+    clocks: np.ndarray
+    action: np.ndarray
+    delay: np.ndarray
+    next_location: np.ndarray
+    next_clocks: np.ndarray
+    done: np.ndarray
+
+
+class ReplayBuffer:
+    """A fixed-capacity ring buffer of transitions, sharded by writer
+
+    Do not construct this directly, instead use `create` and `open`. Buffers
+    can be sent to other processes (only their path is pickled), where they
+    are mapped again.
+    """
+
+    def __init__(self, path: str, mode: str = "r+"):
+        header = np.memmap(path, dtype=np.int64, mode="r", shape=(_HEADER,))
+        if header[0] != _MAGIC or header[1] != _VERSION:
+            raise ValueError("{} is not a replay buffer".format(path))
+        self._path = path
+        self._mode = mode
+        n_clocks, capacity, n_shards = (int(v) for v in header[2:])
+        self._dtype = transition_dtype(n_clocks)
+        self._counters = np.memmap(
+            path, dtype=np.int64, mode=mode, offset=_HEADER * 8, shape=(n_shards,)
+        )
+        offset = -(-(_HEADER + n_shards) * 8 // _ALIGN) * _ALIGN
+        self._data = np.memmap(
+            path,
+            dtype=self._dtype,
+            mode=mode,
+            offset=offset,
+            shape=(n_shards, capacity),
+        )
+
+    @classmethod
+    def create(
+        cls,
+        n_clocks: int,
+        capacity: int,
+        *,
+        n_writers: int = 1,
+        path: Optional[str] = None,
+    ) -> "ReplayBuffer":
+        """Create an empty buffer file
+
+        Parameters
+        ----------
+        n_clocks:
+            The number of clocks of the PTA.
+        capacity:
+            The total number of transitions, split evenly between the writers.
+        n_writers:
+            The number of writers (one shard each).
+        path:
+            The file of the buffer (a new temporary file by default).
+        """
+        if capacity < n_writers:
+            raise ValueError("The capacity must be at least 1 per writer")
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="pta-replay-", suffix=".bin")
+            os.close(fd)
+        shard = capacity // n_writers
+        offset = -(-(_HEADER + n_writers) * 8 // _ALIGN) * _ALIGN
+        size = offset + n_writers * shard * transition_dtype(n_clocks).itemsize
+        with open(path, "wb") as f:
+            f.truncate(size)
+        header = np.memmap(path, dtype=np.int64, mode="r+", shape=(_HEADER,))
+        header[:] = [_MAGIC, _VERSION, n_clocks, shard, n_writers]
+        header.flush()
+        return cls(path)
+
+    @classmethod
+    def open(cls, path: str, mode: str = "r+") -> "ReplayBuffer":
+        """Map an existing buffer file (read-only with ``mode="r"``)"""
+        return cls(path, mode)
+
+    def __reduce__(self):
+        return type(self).open, (self._path, self._mode)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def n_writers(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def capacity(self) -> int:
+        """The total number of transitions the buffer can hold"""
+        return self._data.size
+
+    def sizes(self) -> np.ndarray:
+        """Get the number of transitions that can be sampled in each shard"""
+        return np.minimum(np.array(self._counters), self._data.shape[1])
+
+    def __len__(self) -> int:
+        return int(self.sizes().sum())
+
+    def add(
+        self,
+        writer: int,
+        location: np.ndarray,
+        clocks: np.ndarray,
+        action: Union[int, np.ndarray],
+        delay: Union[float, np.ndarray],
+        next_location: np.ndarray,
+        next_clocks: np.ndarray,
+        done: Union[bool, np.ndarray],
+    ):
+        """Append a batch of transitions to the shard of a writer
+
+        Only one process may write to a given shard. The arguments are arrays
+        over the transitions (as the observations of a `VectorMDP`), or
+        scalars for all of them.
+        """
+        location = np.atleast_1d(location)
+        n = len(location)
+        shard = self._data[writer]
+        capacity = len(shard)
+        if n > capacity:
+            raise ValueError(
+                "Cannot add {} transitions to a shard of {}".format(n, capacity)
+            )
+        slots = (int(self._counters[writer]) + np.arange(n)) % capacity
+        records = np.empty(n, dtype=self._dtype)
+        records["location"] = location
+        records["clocks"] = clocks
+        records["action"] = action
+        records["delay"] = delay
+        records["next_location"] = next_location
+        records["next_clocks"] = next_clocks
+        records["done"] = done
+        shard[slots] = records
+        # Publish the slots only once they are written
+        self._counters[writer] += n
+
+    def sample(
+        self, batch_size: int, rng: Optional[np.random.Generator] = None
+    ) -> Batch:
+        """Sample transitions uniformly (with replacement) from all the shards
+
+        Parameters
+        ----------
+        batch_size:
+            The number of transitions.
+        rng:
+            The random number generator (a fresh unseeded one by default).
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        counters = np.array(self._counters)
+        capacity = self._data.shape[1]
+        sizes = np.minimum(counters, capacity)
+        total = sizes.sum()
+        if total == 0:
+            raise ValueError("Cannot sample from an empty replay buffer")
+        # Pick a published transition uniformly, then find its shard and slot.
+        # The newest ``sizes`` transitions of a shard are published.
+        k = rng.integers(total, size=batch_size)
+        shard = np.searchsorted(np.cumsum(sizes), k, side="right")
+        age = k - (np.cumsum(sizes) - sizes)[shard]
+        slot = (counters[shard] - 1 - age) % capacity
+        records = self._data[shard, slot]
+        return Batch(*(records[name] for name in self._dtype.names))
+
+    def flush(self):
+        """Write the buffer back to its file"""
+        self._data.flush()
+        self._counters.flush()
+
+    def __repr__(self) -> str:
+        return "ReplayBuffer({!r}, n_writers={}, capacity={}, size={})".format(
+            self._path, self.n_writers, self.capacity, len(self)
+        )
+
+
+__all__ = ["Batch", "ReplayBuffer", "transition_dtype"]
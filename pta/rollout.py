@@ -0,0 +1,194 @@
+"""Parallel rollouts of the PTA simulators over a process pool
+
+A `PTA` holds arbitrary callables, which generally cannot be pickled. Instead,
+the model is compiled into a `CompiledPTA` (which only holds tables) and
+shipped once to each worker process, where a simulator is built for it and
+reused across episodes.
+
+Each episode is seeded from its own index and the master seed, so the results
+do not depend on the number of workers or on which worker runs which episode.
+"""
+
+import multiprocessing
+import random
+from typing import Any, Callable, Iterator, List, NamedTuple, Optional, Type, Union
+
+import numpy as np
+
+from pta.compiled import CompiledPTA
+from pta.mdp import MDP, RegionMDP
+from pta.pta import PTA
+
+# A policy maps the simulator and its current observation to an action: a
+# timed action for `MDP`/`DigitalMDP`, or a delay for `RegionMDP`.
+Policy = Callable[[Any, Any], Any]
+Terminal = Callable[[Any], bool]
+
+
+class EpisodeResult(NamedTuple):
+    """Result of a single episode
+
+    Attributes
+    ----------
+    index:
+        The index of the episode.
+    seed:
+        The seed the episode was run with.
+    steps:
+        The number of steps taken.
+    final:
+        The last observation of the episode (``None`` if the episode ended
+        because a `RegionMDP` delay violated the invariant).
+    trace:
+        The observations of the episode, if recorded.
+    """
+
+    index: int
+    seed: int
+    steps: int
+    final: Any
+    trace: Optional[List[Any]]
+
+
+def episode_seed(seed: int, index: int) -> int:
+    """Derive the seed of an episode from the master seed"""
+    return int(np.random.SeedSequence(seed, spawn_key=(index,)).generate_state(1)[0])
+
+
+def run_episode(
+    sim,
+    policy: Policy,
+    *,
+    max_steps: int,
+    terminal: Optional[Terminal] = None,
+    record: bool = False,
+):
+    """Run a single episode on a simulator from its initial state
+
+    Returns
+    -------
+    :
+        The number of steps, the final observation and the trace (or
+        ``None`` if ``record`` is ``False``).
+    """
+    step = sim.delay if isinstance(sim, RegionMDP) else sim.step
+    obs = sim.reset()
+    trace = [obs] if record else None
+    steps = 0
+    while steps < max_steps and not (terminal is not None and terminal(obs)):
+        obs = step(policy(sim, obs))
+        steps += 1
+        if trace is not None:
+            trace.append(obs)
+        if obs is None:
+            break
+    return steps, obs, trace
+
+
+def _worker(model, simulator, policy, max_steps, terminal, record) -> dict:
+    return dict(
+        sim=simulator(model),
+        policy=policy,
+        max_steps=max_steps,
+        terminal=terminal,
+        record=record,
+    )
+
+
+def _run_in(worker: dict, task) -> EpisodeResult:
+    index, seed = task
+    random.seed(seed)
+    steps, final, trace = run_episode(
+        worker["sim"],
+        worker["policy"],
+        max_steps=worker["max_steps"],
+        terminal=worker["terminal"],
+        record=worker["record"],
+    )
+    return EpisodeResult(index, seed, steps, final, trace)
+
+
+# State of a pool worker process, set by `_init_worker`
+_WORKER: dict = dict()
+
+
+def _init_worker(*config):
+    _WORKER.update(_worker(*config))
+
+
+def _run(task) -> EpisodeResult:
+    return _run_in(_WORKER, task)
+
+
+def rollout(
+    model: Union[PTA, CompiledPTA],
+    policy: Policy,
+    n_episodes: int,
+    *,
+    simulator: Type = MDP,
+    max_steps: int = 100,
+    terminal: Optional[Terminal] = None,
+    seed: int = 0,
+    processes: Optional[int] = None,
+    ordered: bool = False,
+    record: bool = False,
+    chunksize: int = 1,
+) -> Iterator[EpisodeResult]:
+    """Run episodes of a simulator over a pool of processes
+
+    The results are streamed back as the episodes finish.
+
+    Parameters
+    ----------
+    model:
+        The PTA to simulate. It is compiled (if it isn't already) and sent
+        once to each worker.
+    policy:
+        Picks the next action given the simulator and its observation. It is
+        sent to the workers, so it must be picklable (e.g., a module-level
+        function).
+    n_episodes:
+        The number of episodes.
+    simulator:
+        The simulator class: `MDP`, `DigitalMDP` or `RegionMDP`.
+    max_steps:
+        The maximum number of steps per episode.
+    terminal:
+        Optional (picklable) predicate on observations that ends an episode.
+    seed:
+        The master seed. Episode ``i`` is seeded with
+        ``episode_seed(seed, i)``, which seeds the `random` module (and thus
+        all the sampling in the simulators) before the episode.
+    processes:
+        The number of worker processes (defaults to the number of CPUs). If
+        ``0``, the episodes are run in the current process, and the state of
+        the `random` module is restored after each episode.
+    ordered:
+        If ``True``, yield the results in the order of the episodes.
+    record:
+        If ``True``, the results contain all the observations of the episode.
+    chunksize:
+        The number of episodes sent to a worker at a time.
+    """
+    if not isinstance(model, CompiledPTA):
+        model = model.compile()
+    config = (model, simulator, policy, max_steps, terminal, record)
+    tasks = ((i, episode_seed(seed, i)) for i in range(n_episodes))
+
+    if processes == 0:
+        worker = _worker(*config)
+        for task in tasks:
+            state = random.getstate()
+            try:
+                result = _run_in(worker, task)
+            finally:
+                random.setstate(state)
+            yield result
+        return
+
+    with multiprocessing.Pool(processes, _init_worker, config) as pool:
+        imap = pool.imap if ordered else pool.imap_unordered
+        yield from imap(_run, tasks, chunksize)
+
+
+__all__ = ["EpisodeResult", "episode_seed", "rollout", "run_episode"]
@@ -0,0 +1,403 @@
+"""Asynchronous environment server for remote simulator actors
+
+An `EnvServer` hosts many `MDP` (or `DigitalMDP`) simulators of the same PTA
+in a single process, behind a Unix socket or a TCP endpoint, and an
+`EnvClient` drives them from another process. The server works in ticks: it
+waits for a request, lets the other pending requests of all the clients come
+in, then serves all of them in one pass, encoding the observations into
+preallocated buffers and writing the replies of each client at once. Only the
+I/O is batched: the simulators of a tick are still stepped one at a time (see
+`~pta.mdp.VectorMDP` to step many environments at once, in-process).
+
+Every message is a frame: a little-endian ``uint32`` payload length, then the
+payload, whose first byte is the opcode. The requests are
+
+- ``H`` (hello): no arguments. The reply holds the number of environments,
+  the length of an observation, the number of actions (all ``uint32``) and the
+  NumPy type string of the observations (e.g. ``<f8``).
+- ``R`` (reset): the ``uint32`` environment id.
+- ``S`` (step): the ``uint32`` environment id, the ``int32`` action id (an
+  index into the controllable actions, ``-1`` to only delay) and the
+  ``float64`` delay.
+
+Resets and steps are answered with a status byte (``0``), the observation
+(see `ObservationEncoder`), the mask of the enabled actions (one byte per
+action) and the bounds of the delays allowed by the invariant: the
+``float64`` lower and upper bounds, then whether they are included (one byte
+each). Failed requests are answered with the status ``1`` and a UTF-8 error
+message, and the connection stays open. The replies of a client come in the
+order of its requests, so a client can send the requests for all its
+environments before reading any reply (see `EnvClient.step_batch`).
+"""
+
+import asyncio
+import struct
+from typing import Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from pta.clock import DelayBounds
+from pta.mdp import ObservationEncoder, Simulator
+
+_LENGTH = struct.Struct("<I")
+_HELLO = struct.Struct("<III")
+_RESET = struct.Struct("<I")
+_STEP = struct.Struct("<Iid")
+_BOUNDS = np.dtype(
+    [
+        ("lower", "<f8"),
+        ("upper", "<f8"),
+        ("left_closed", "?"),
+        ("right_closed", "?"),
+    ]
+)
+
+_OK = b"\x00"
+_ERROR = b"\x01"
+
+
+class Spec(NamedTuple):
+    """The description of the environments of a server
+
+    Attributes
+    ----------
+    n_envs:
+        The number of environments.
+    size:
+        The length of an observation.
+    n_actions:
+        The number of (controllable) actions.
+    dtype:
+        The type of the observations.
+    """
+
+    n_envs: int
+    size: int
+    n_actions: int
+    dtype: np.dtype
+
+
+class Observation(NamedTuple):
+    """The reply to a reset or a step
+
+    Attributes
+    ----------
+    obs:
+        The encoded state of the environment.
+    mask:
+        Boolean array over the action ids, ``True`` for the enabled actions.
+    delays:
+        The bounds on the delays allowed by the invariant.
+    """
+
+    obs: np.ndarray
+    mask: np.ndarray
+    delays: DelayBounds
+
+
+def _frame(payload: bytes) -> bytes:
+    return _LENGTH.pack(len(payload)) + payload
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (length,) = _LENGTH.unpack(await reader.readexactly(_LENGTH.size))
+    return await reader.readexactly(length)
+
+
+class EnvServer:
+    """Serve simulators of a PTA to remote clients
+
+    Parameters
+    ----------
+    simulators:
+        The simulators, addressed by their index. They must simulate the same
+        PTA, and they are all reset when the server is made.
+    encoder:
+        The encoder of the observations (by default, the ``encoder`` of the
+        first simulator).
+    tick:
+        The time (in seconds) to wait for more requests once one comes in.
+        With the default of ``0``, the server only lets the requests that
+        already arrived come in.
+    timeout:
+        The time (in seconds) a client has to read its replies, after which
+        it is disconnected. Each client is waited for separately, so a slow
+        client never holds up the others.
+    """
+
+    def __init__(
+        self,
+        simulators: Sequence[Simulator],
+        encoder: Optional[ObservationEncoder] = None,
+        *,
+        tick: float = 0.0,
+        timeout: float = 10.0,
+    ):
+        if len(simulators) == 0:
+            raise ValueError("The server needs at least one simulator")
+        self._sims = list(simulators)
+        self._encoder = simulators[0].encoder if encoder is None else encoder
+        self._labels = simulators[0].action_labels
+        self._tick = tick
+        self._timeout = timeout
+        n = len(self._sims)
+        self._obs = self._encoder.empty(n)
+        self._masks = np.zeros((n, len(self._labels)), dtype=bool)
+        self._bounds = np.zeros(n, dtype=_BOUNDS)
+        # The queue and the tasks are made in the loop that runs the server
+        self._queue: Optional["asyncio.Queue[Tuple[asyncio.StreamWriter, bytes]]"] = (
+            None
+        )
+        self._servers: List[asyncio.AbstractServer] = []
+        self._loop: Optional[asyncio.Future] = None
+        self._draining: Dict[asyncio.StreamWriter, asyncio.Future] = dict()
+        self._clients: Set[asyncio.StreamWriter] = set()
+        for i, sim in enumerate(self._sims):
+            sim.reset()
+            self._observe(i)
+
+    @property
+    def spec(self) -> Spec:
+        return Spec(
+            len(self._sims), self._encoder.size, len(self._labels), self._obs.dtype
+        )
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        """Listen on a Unix socket"""
+        self._start()
+        server = await asyncio.start_unix_server(self._handle, path)
+        self._servers.append(server)
+        return server
+
+    async def start_tcp(self, host: str, port: int) -> asyncio.AbstractServer:
+        """Listen on a TCP endpoint (use port ``0`` for any free port)"""
+        self._start()
+        server = await asyncio.start_server(self._handle, host, port)
+        self._servers.append(server)
+        return server
+
+    def _start(self):
+        if self._loop is None:
+            self._queue = asyncio.Queue()
+            self._loop = asyncio.ensure_future(self._serve())
+
+    async def close(self):
+        """Stop listening and serving"""
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers.clear()
+        if self._loop is not None:
+            self._loop.cancel()
+            try:
+                await self._loop
+            except asyncio.CancelledError:
+                pass
+            self._loop = None
+            self._queue = None
+        for task in list(self._draining.values()):
+            task.cancel()
+        self._draining.clear()
+        for writer in self._clients:
+            writer.close()
+        self._clients.clear()
+        # Let the transports finish closing (`StreamWriter.wait_closed` needs 3.7)
+        await asyncio.sleep(0)
+
+    async def __aenter__(self) -> "EnvServer":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._clients.add(writer)
+        try:
+            while True:
+                request = await _read_frame(reader)
+                if self._queue is None:
+                    # The server was closed while the request came in
+                    break
+                self._queue.put_nowait((writer, request))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._clients.discard(writer)
+            writer.close()
+
+    async def _serve(self):
+        while True:
+            batch = [await self._queue.get()]
+            await asyncio.sleep(self._tick)
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            replies: Dict[asyncio.StreamWriter, List[bytes]] = dict()
+            for writer, request in batch:
+                replies.setdefault(writer, []).append(_frame(self._reply(request)))
+            for writer, frames in replies.items():
+                if writer.transport.is_closing():
+                    continue
+                writer.write(b"".join(frames))
+                if writer not in self._draining:
+                    self._draining[writer] = asyncio.ensure_future(self._drain(writer))
+
+    async def _drain(self, writer: asyncio.StreamWriter):
+        """Wait for a client to read its replies, or disconnect it"""
+        try:
+            await asyncio.wait_for(writer.drain(), self._timeout)
+        except (asyncio.TimeoutError, ConnectionError):
+            writer.close()
+        finally:
+            self._draining.pop(writer, None)
+
+    def _reply(self, request: bytes) -> bytes:
+        op, args = request[:1], request[1:]
+        try:
+            if op == b"S":
+                env, action, delay = _STEP.unpack(args)
+                sim = self._sims[env]
+                if action >= len(self._labels):
+                    raise ValueError("Unknown action id {}".format(action))
+                edge = None if action < 0 else self._labels[action]
+                sim.step((delay, edge))
+            elif op == b"R":
+                (env,) = _RESET.unpack(args)
+                self._sims[env].reset()
+            elif op == b"H":
+                n_envs, size, n_actions, dtype = self.spec
+                return (
+                    _OK
+                    + _HELLO.pack(n_envs, size, n_actions)
+                    + dtype.str.encode("ascii")
+                )
+            else:
+                raise ValueError("Unknown request {!r}".format(op))
+            self._observe(env)
+        except Exception as e:
+            return _ERROR + "{}: {}".format(type(e).__name__, e).encode("utf-8")
+        return (
+            _OK
+            + self._obs[env].tobytes()
+            + self._masks[env].tobytes()
+            + self._bounds[env].tobytes()
+        )
+
+    def _observe(self, env: int):
+        sim = self._sims[env]
+        self._encoder.encode(sim.location, sim.valuation, self._obs[env])
+        self._bounds[env] = tuple(sim.action_mask(self._masks[env]).delays)
+
+    def __repr__(self) -> str:
+        return "EnvServer(n_envs={}, size={}, n_actions={})".format(*self.spec)
+
+
+class EnvClient:
+    """Drive the simulators of an `EnvServer`
+
+    Do not construct this directly, instead use `connect_unix` and
+    `connect_tcp`. The observations and masks returned by the client are new
+    arrays (views of the received bytes).
+    """
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, spec: Spec
+    ):
+        self._reader = reader
+        self._writer = writer
+        self._spec = spec
+
+    @classmethod
+    async def connect_unix(cls, path: str) -> "EnvClient":
+        """Connect to a server listening on a Unix socket"""
+        return await cls._connect(*await asyncio.open_unix_connection(path))
+
+    @classmethod
+    async def connect_tcp(cls, host: str, port: int) -> "EnvClient":
+        """Connect to a server listening on a TCP endpoint"""
+        return await cls._connect(*await asyncio.open_connection(host, port))
+
+    @classmethod
+    async def _connect(
+        cls, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> "EnvClient":
+        writer.write(_frame(b"H"))
+        payload = await cls._receive(reader)
+        n_envs, size, n_actions = _HELLO.unpack_from(payload)
+        dtype = np.dtype(payload[_HELLO.size :].decode("ascii"))
+        return cls(reader, writer, Spec(n_envs, size, n_actions, dtype))
+
+    @staticmethod
+    async def _receive(reader: asyncio.StreamReader) -> bytes:
+        payload = await _read_frame(reader)
+        if payload[:1] != _OK:
+            raise RuntimeError(payload[1:].decode("utf-8"))
+        return payload[1:]
+
+    @property
+    def spec(self) -> Spec:
+        return self._spec
+
+    def _decode(self, payload: bytes) -> Observation:
+        _, size, n_actions, dtype = self._spec
+        offset = size * dtype.itemsize
+        obs = np.frombuffer(payload, dtype=dtype, count=size)
+        mask = np.frombuffer(payload, dtype=bool, count=n_actions, offset=offset)
+        bounds = np.frombuffer(payload, dtype=_BOUNDS, offset=offset + n_actions)[0]
+        return Observation(obs, mask, DelayBounds(*bounds.tolist()))
+
+    async def reset(self, env: int) -> Observation:
+        """Reset an environment"""
+        self._writer.write(_frame(b"R" + _RESET.pack(env)))
+        return self._decode(await self._receive(self._reader))
+
+    async def step(self, env: int, action: int, delay: float) -> Observation:
+        """Wait for ``delay`` and take the action with id ``action`` (if not ``-1``)"""
+        self._writer.write(_frame(b"S" + _STEP.pack(env, action, delay)))
+        return self._decode(await self._receive(self._reader))
+
+    async def step_batch(
+        self, envs: Sequence[int], actions: Sequence[int], delays: Sequence[float]
+    ) -> Observation:
+        """Step several environments, in a single round trip
+
+        The requests are all sent before reading the replies, so that the
+        server handles them in the same tick. The observations and masks are
+        stacked, one row per environment, and the delay bounds are arrays
+        over the environments.
+        """
+        self._writer.write(
+            b"".join(
+                _frame(b"S" + _STEP.pack(int(env), int(action), float(delay)))
+                for env, action, delay in zip(envs, actions, delays)
+            )
+        )
+        # Read all the replies before raising, to stay in sync with the server
+        payloads = [await _read_frame(self._reader) for _ in range(len(envs))]
+        for payload in payloads:
+            if payload[:1] != _OK:
+                raise RuntimeError(payload[1:].decode("utf-8"))
+        replies = [self._decode(payload[1:]) for payload in payloads]
+        return Observation(
+            np.stack([r.obs for r in replies]),
+            np.stack([r.mask for r in replies]),
+            DelayBounds(
+                *(np.array(bounds) for bounds in zip(*(r.delays for r in replies)))
+            ),
+        )
+
+    async def close(self):
+        self._writer.close()
+        # Let the transport finish closing (`StreamWriter.wait_closed` needs 3.7)
+        await asyncio.sleep(0)
+
+    async def __aenter__(self) -> "EnvClient":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __repr__(self) -> str:
+        return "EnvClient(n_envs={}, size={}, n_actions={})".format(*self._spec)
+
+
+__all__ = ["EnvClient", "EnvServer", "Observation", "Spec"]
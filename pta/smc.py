@@ -0,0 +1,407 @@
+"""Statistical model checking of PTAs
+
+The probability of reaching a goal under a scheduler is estimated by
+simulating the PTA: each simulation is a Bernoulli trial that succeeds if the
+goal is reached within the step (and time) bound. Samples are drawn one at a
+time, and the engines stop as soon as the requested guarantee is met:
+
+- `estimate` gives an interval around the probability, either with the
+  Chernoff-Hoeffding bound (whose sample size only depends on the precision
+  and confidence) or with Clopper-Pearson intervals (which stop much earlier
+  for probabilities close to 0 or 1);
+- `sprt` decides whether the probability is above a threshold with Wald's
+  sequential probability ratio test.
+
+As in :py:mod:`pta.rollout`, simulation ``i`` is seeded with
+``episode_seed(seed, i)``, so the results are reproducible.
+"""
+
+import enum
+import math
+import random
+from typing import (
+    Callable,
+    Hashable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from scipy import stats
+
+from pta.clock import Clock, ClockValuation
+from pta.compiled import CompiledPTA
+from pta.mdp import MDP, RegionMDP
+from pta.pta import PTA
+from pta.rollout import Policy, episode_seed
+
+Location = Hashable
+Goal = Callable[[Location, ClockValuation], bool]
+
+
+class Method(enum.Enum):
+    """The interval used by `estimate`"""
+
+    #: Chernoff-Hoeffding bound: a fixed number of samples
+    CHERNOFF = "chernoff"
+    #: Clopper-Pearson interval, checked as the number of samples doubles
+    CLOPPER_PEARSON = "clopper-pearson"
+
+
+class Estimate(NamedTuple):
+    """Result of `estimate`
+
+    Attributes
+    ----------
+    probability:
+        The fraction of the simulations that reached the goal.
+    lower, upper:
+        The confidence interval of the probability.
+    confidence:
+        The confidence level of the interval.
+    samples:
+        The number of simulations.
+    successes:
+        The number of simulations that reached the goal.
+    """
+
+    probability: float
+    lower: float
+    upper: float
+    confidence: float
+    samples: int
+    successes: int
+
+
+class Decision(NamedTuple):
+    """Result of `sprt`
+
+    Attributes
+    ----------
+    accepted:
+        ``True`` if the probability is deemed above the threshold, ``False``
+        if below, and ``None`` if the test ran out of samples first.
+    samples:
+        The number of simulations.
+    successes:
+        The number of simulations that reached the goal.
+    log_ratio:
+        The final log-likelihood ratio of "below" over "above".
+    """
+
+    accepted: Optional[bool]
+    samples: int
+    successes: int
+    log_ratio: float
+
+
+def chernoff_samples(epsilon: float, delta: float) -> int:
+    """Get the number of samples to estimate a probability within ``epsilon``
+
+    By the Chernoff-Hoeffding bound, the estimate is within ``epsilon`` of the
+    probability with probability at least ``1 - delta``.
+    """
+    _check_probability("epsilon", epsilon)
+    _check_probability("delta", delta)
+    return math.ceil(math.log(2 / delta) / (2 * epsilon**2))
+
+
+def clopper_pearson(
+    successes: int, samples: int, confidence: float
+) -> Tuple[float, float]:
+    """Get the exact binomial confidence interval of a probability"""
+    alpha = 1 - confidence
+    lower, upper = 0.0, 1.0
+    if successes > 0:
+        lower = stats.beta.ppf(alpha / 2, successes, samples - successes + 1)
+    if successes < samples:
+        upper = stats.beta.ppf(1 - alpha / 2, successes + 1, samples - successes)
+    return float(lower), float(upper)
+
+
+def _checkpoints(
+    needed: int, epsilon: float, confidence: float
+) -> Tuple[List[int], float]:
+    """Get the sample counts at which to check the Clopper-Pearson interval
+
+    The counts double up to ``needed``. Stopping at the first narrow enough
+    interval is only sound if the error is split between the checks
+    (Bonferroni correction), so the counts at which even the narrowest
+    interval is too wide are left out, and the others share the error evenly.
+
+    Returns
+    -------
+    :
+        The counts, and the confidence level of the interval at each of them.
+    """
+    counts = sorted({-(-needed // 2**j) for j in range(needed.bit_length())})
+    while True:
+        level = 1 - (1 - confidence) / len(counts)
+        # The interval is the narrowest when all the samples fail
+        kept = [
+            n
+            for n in counts
+            if n == needed or clopper_pearson(0, n, level)[1] <= 2 * epsilon
+        ]
+        if len(kept) == len(counts):
+            return counts, level
+        counts = kept
+
+
+def _clopper_pearson_samples(epsilon: float, confidence: float) -> int:
+    """Get the number of samples after which the corrected interval is narrow
+
+    This is the smallest count (from the Chernoff count up, in small steps)
+    for which the Clopper-Pearson interval at the level of `_checkpoints` is
+    at most ``2 * epsilon`` wide, whatever the number of successes.
+    """
+    needed = chernoff_samples(epsilon, 1 - confidence)
+    while True:
+        _, level = _checkpoints(needed, epsilon, confidence)
+        # The interval is the widest when half the samples succeed
+        lower, upper = clopper_pearson(needed // 2, needed, level)
+        if upper - lower <= 2 * epsilon:
+            return needed
+        needed += needed // 64 + 1
+
+
+def _check_probability(name: str, value: float):
+    if not 0 < value < 1:
+        raise ValueError("{} must be in (0, 1), got {}".format(name, value))
+
+
+def _split(obs) -> Tuple[Location, ClockValuation]:
+    if hasattr(obs, "location"):
+        return obs.location, obs.value
+    return obs
+
+
+# The clock measuring the time elapsed in a run (never reset)
+_ELAPSED = Clock("__smc_elapsed__")
+
+
+def _timed(model: Union[PTA, CompiledPTA]) -> PTA:
+    """Add the `_ELAPSED` clock to a PTA"""
+    if _ELAPSED in model.clocks:
+        raise ValueError("The clock {} is reserved".format(_ELAPSED))
+    return PTA(
+        location_space=model.location_space,
+        clocks=model.clocks | {_ELAPSED},
+        actions=model.actions,
+        init_location=model.initial_location,
+        transitions=model.transitions,
+        invariants=model.invariants,
+    )
+
+
+def simulate(
+    model: Union[PTA, CompiledPTA],
+    scheduler: Policy,
+    goal: Goal,
+    *,
+    simulator: Type = MDP,
+    max_steps: int = 100,
+    time_bound: Optional[float] = None,
+    seed: int = 0,
+) -> Iterator[bool]:
+    """Simulate the PTA over and over, and tell if each run reached the goal
+
+    Parameters
+    ----------
+    model:
+        The PTA to simulate.
+    scheduler:
+        Picks the next action given the simulator and its observation, as the
+        policies of :py:func:`pta.rollout.rollout`.
+    goal:
+        Predicate on the location and clock valuation of a state.
+    simulator:
+        The simulator class: `MDP`, `DigitalMDP` or `RegionMDP`.
+    max_steps:
+        The maximum number of steps of a run.
+    time_bound:
+        The maximum total time of a run, if any, including the delays before
+        the edges taken by the environment. It is measured by an extra clock
+        (which is never reset) added to the PTA, so the observations of the
+        scheduler and the goal also hold that clock.
+    seed:
+        The master seed. The runs seed the `random` module, whose state is
+        restored after each run.
+
+    Returns
+    -------
+    :
+        An endless stream of outcomes, one per run.
+    """
+    sim = simulator(model if time_bound is None else _timed(model))
+    step = sim.delay if isinstance(sim, RegionMDP) else sim.step
+
+    def run() -> bool:
+        obs = sim.reset()
+        steps = 0
+        reached = goal(*_split(obs))
+        while not reached and steps < max_steps:
+            obs = step(scheduler(sim, obs))
+            steps += 1
+            if obs is None:
+                break
+            location, valuation = _split(obs)
+            if time_bound is not None and valuation[_ELAPSED] > time_bound:
+                break
+            reached = goal(location, valuation)
+        return reached
+
+    index = 0
+    while True:
+        # Each run is seeded, but the `random` state of the caller is kept
+        state = random.getstate()
+        random.seed(episode_seed(seed, index))
+        index += 1
+        try:
+            reached = run()
+        finally:
+            random.setstate(state)
+        yield reached
+
+
+def estimate(
+    model: Union[PTA, CompiledPTA],
+    scheduler: Policy,
+    goal: Goal,
+    *,
+    epsilon: float = 0.01,
+    confidence: float = 0.95,
+    method: Method = Method.CLOPPER_PEARSON,
+    max_samples: Optional[int] = None,
+    **kwargs,
+) -> Estimate:
+    """Estimate the probability of reaching the goal
+
+    Parameters
+    ----------
+    model, scheduler, goal:
+        See `simulate`.
+    epsilon:
+        The requested half-width of the confidence interval.
+    confidence:
+        The requested confidence level.
+    method:
+        With `Method.CHERNOFF`, ``chernoff_samples(epsilon, 1 - confidence)``
+        simulations are run. With `Method.CLOPPER_PEARSON`, the
+        Clopper-Pearson interval is checked each time the number of
+        simulations doubles, at a level corrected for the number of checks,
+        and the simulations stop as soon as it is narrow enough. The last
+        check is at a count (about the Chernoff count) where the interval is
+        always narrow enough. This only stops early for probabilities close
+        to 0 or 1.
+    max_samples:
+        Stop after this many simulations, even if the interval is wider.
+    kwargs:
+        Passed to `simulate`.
+    """
+    _check_probability("confidence", confidence)
+    method = Method(method)
+    if method is Method.CHERNOFF:
+        needed = chernoff_samples(epsilon, 1 - confidence)
+    else:
+        needed = _clopper_pearson_samples(epsilon, confidence)
+    if max_samples is not None:
+        needed = min(needed, max_samples)
+
+    checks, level = _checkpoints(needed, epsilon, confidence)
+    samples = successes = 0
+    lower, upper = 0.0, 1.0
+    for outcome in simulate(model, scheduler, goal, **kwargs):
+        samples += 1
+        successes += outcome
+        if method is Method.CLOPPER_PEARSON and samples in checks:
+            lower, upper = clopper_pearson(successes, samples, level)
+            if upper - lower <= 2 * epsilon:
+                break
+        if samples >= needed:
+            break
+
+    p = successes / samples
+    if method is Method.CHERNOFF:
+        half_width = math.sqrt(math.log(2 / (1 - confidence)) / (2 * samples))
+        lower, upper = max(0.0, p - half_width), min(1.0, p + half_width)
+    return Estimate(p, lower, upper, confidence, samples, successes)
+
+
+def sprt(
+    model: Union[PTA, CompiledPTA],
+    scheduler: Policy,
+    goal: Goal,
+    threshold: float,
+    *,
+    indifference: float = 0.01,
+    alpha: float = 0.05,
+    beta: float = 0.05,
+    max_samples: Optional[int] = None,
+    **kwargs,
+) -> Decision:
+    """Test if the probability of reaching the goal is above a threshold
+
+    Wald's sequential probability ratio test decides between
+    ``p >= threshold + indifference`` and ``p <= threshold - indifference``.
+
+    Parameters
+    ----------
+    model, scheduler, goal:
+        See `simulate`.
+    threshold:
+        The probability threshold.
+    indifference:
+        The half-width of the indifference region around the threshold.
+    alpha:
+        The probability of rejecting "above" when it holds.
+    beta:
+        The probability of accepting "above" when "below" holds.
+    max_samples:
+        Give up (without a decision) after this many simulations.
+    kwargs:
+        Passed to `simulate`.
+    """
+    _check_probability("alpha", alpha)
+    _check_probability("beta", beta)
+    p0, p1 = threshold + indifference, threshold - indifference
+    _check_probability("threshold + indifference", p0)
+    _check_probability("threshold - indifference", p1)
+    # Log-likelihood ratio of "below" (p1) over "above" (p0)
+    success_step = math.log(p1 / p0)
+    failure_step = math.log((1 - p1) / (1 - p0))
+    accept_below = math.log((1 - beta) / alpha)
+    accept_above = math.log(beta / (1 - alpha))
+
+    samples = successes = 0
+    log_ratio = 0.0
+    accepted = None
+    for outcome in simulate(model, scheduler, goal, **kwargs):
+        samples += 1
+        successes += outcome
+        log_ratio += success_step if outcome else failure_step
+        if log_ratio >= accept_below:
+            accepted = False
+            break
+        if log_ratio <= accept_above:
+            accepted = True
+            break
+        if max_samples is not None and samples >= max_samples:
+            break
+    return Decision(accepted, samples, successes, log_ratio)
+
+
+__all__ = [
+    "Estimate",
+    "Method",
+    "Decision",
+    "chernoff_samples",
+    "clopper_pearson",
+    "estimate",
+    "simulate",
+    "sprt",
+]
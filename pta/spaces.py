@@ -1,6 +1,7 @@
+import random
 from abc import abstractmethod
 from functools import reduce
-from typing import Sequence, Tuple
+from typing import Hashable, Iterable, Iterator, Sequence, Tuple
 
 from typing_extensions import Protocol, runtime_checkable
 
@@ -48,3 +49,29 @@ class ProductSpace(Space):
 
     def sample(self):
         return tuple(s.sample() for s in self.spaces)
+
+
+class FiniteSpace(Space):
+    """An explicitly enumerated, finite space
+
+    Unlike a general `Space`, a `FiniteSpace` can be iterated over, which
+    allows the locations of a PTA to be enumerated (see `PTA.compile`).
+    """
+
+    elements: Tuple[Hashable, ...]
+
+    def __init__(self, elements: Iterable[Hashable]):
+        self.elements = tuple(elements)
+        self._members = frozenset(self.elements)
+
+    def __len__(self) -> int:
+        return len(self.elements)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.elements)
+
+    def __contains__(self, x) -> bool:
+        return x in self._members
+
+    def sample(self):
+        return random.choice(self.elements)
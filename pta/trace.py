@@ -0,0 +1,344 @@
+"""Columnar recording of simulation traces
+
+The observations of the simulators are namedtuples around a fresh
+`ClockValuation` dict, which makes long traces expensive to keep. A
+`TraceRecorder` instead appends each step to preallocated columns, in terms of
+the ids of a `CompiledPTA`:
+
+========== ================== ==========================================
+Column     Shape and type     Content
+========== ================== ==========================================
+location   ``(n,)`` int32     The location id reached by the step
+clocks     ``(n, k)`` float64 The clock values reached by the step
+delay      ``(n,)`` float64   The delay requested by the step
+edge       ``(n,)`` int32     The edge id taken by the step (or ``-1``)
+target     ``(n,)`` int32     The target id sampled by the step (or ``-1``)
+env_edge   ``(n,)`` int32     The edge id the environment took (or ``-1``)
+env_delay  ``(n,)`` float64   The delay before the environment's edge
+env_target ``(n,)`` int32     The target id of the environment's edge
+========== ================== ==========================================
+
+The initial states of the episodes are recorded as steps with a zero delay and
+no edge. Once the recorded steps exceed the memory threshold, they are spilled
+to one raw file per column, in a directory that can be read back (without
+copying) as `numpy.memmap` arrays by a `TraceReader`.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import weakref
+from typing import Any, Dict, Mapping, Optional, Sequence, Union
+
+import numpy as np
+
+from pta.compiled import CompiledPTA
+from pta.pta import PTA, Target
+
+#: The columns of a trace, and their types
+COLUMNS = {
+    "location": np.int32,
+    "clocks": np.float64,
+    "delay": np.float64,
+    "edge": np.int32,
+    "target": np.int32,
+    "env_edge": np.int32,
+    "env_delay": np.float64,
+    "env_target": np.int32,
+}
+_META = "trace.json"
+
+
+class TraceReader(Mapping[str, np.ndarray]):
+    """Read-only columns of a recorded trace
+
+    The columns are accessed by name (see `COLUMNS`). They are memory maps on
+    the spilled files, so reading a spilled trace does not copy it, or copies
+    of the recorder's buffers, which are reused once they are spilled.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        for array in columns.values():
+            array.flags.writeable = False
+        self._columns = columns
+
+    @classmethod
+    def open(cls, directory: str) -> "TraceReader":
+        """Memory-map a trace spilled to a directory"""
+        with open(os.path.join(directory, _META)) as f:
+            meta = json.load(f)
+        n, n_clocks = meta["length"], meta["n_clocks"]
+        columns = {}
+        for name, dtype in COLUMNS.items():
+            shape = (n, n_clocks) if name == "clocks" else (n,)
+            if n * (n_clocks if name == "clocks" else 1) == 0:
+                columns[name] = np.empty(shape, dtype=dtype)
+            else:
+                path = os.path.join(directory, name + ".bin")
+                columns[name] = np.memmap(path, dtype=dtype, mode="r", shape=shape)
+        return cls(columns)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    @property
+    def n_steps(self) -> int:
+        return len(self._columns["location"])
+
+    def __repr__(self) -> str:
+        return "TraceReader(n_steps={})".format(self.n_steps)
+
+
+class TraceRecorder:
+    """Record simulation steps into columnar arrays
+
+    Parameters
+    ----------
+    pta:
+        The simulated PTA (compiled, if it isn't already), whose ids are
+        recorded.
+    capacity:
+        The number of steps the buffers are initially allocated for. They grow
+        by doubling, up to ``spill_bytes``.
+    spill_bytes:
+        Spill the buffers to ``directory`` once they would use more memory
+        than this.
+    directory:
+        The directory of the spilled columns (a new temporary directory by
+        default). It is created if needed, and a trace it already holds is
+        overwritten by the first spill.
+
+    A temporary directory is removed by `close` (or at the end of a ``with``
+    block), after which neither the recorder nor the readers of the spilled
+    trace can be used.
+    """
+
+    def __init__(
+        self,
+        pta: Union[PTA, CompiledPTA],
+        *,
+        capacity: int = 1024,
+        spill_bytes: int = 64 * 2**20,
+        directory: Optional[str] = None,
+    ):
+        self._pta = pta if isinstance(pta, CompiledPTA) else pta.compile()
+        self._row_bytes = sum(
+            np.dtype(dtype).itemsize * (self._pta.n_clocks if name == "clocks" else 1)
+            for name, dtype in COLUMNS.items()
+        )
+        self._max_rows = max(1, spill_bytes // self._row_bytes)
+        self._directory = directory
+        self._buffers = self._allocate(min(capacity, self._max_rows))
+        self._size = 0
+        self._spilled = 0
+        self._cleanup: Optional[weakref.finalize] = None
+
+    @property
+    def pta(self) -> CompiledPTA:
+        return self._pta
+
+    @property
+    def directory(self) -> Optional[str]:
+        """The directory of the spilled columns (``None`` until the first spill)"""
+        return self._directory
+
+    def __len__(self) -> int:
+        return self._spilled + self._size
+
+    def _allocate(self, rows: int) -> Dict[str, np.ndarray]:
+        return {
+            name: np.empty(
+                (rows, self._pta.n_clocks) if name == "clocks" else rows, dtype=dtype
+            )
+            for name, dtype in COLUMNS.items()
+        }
+
+    def _reserve(self, rows: int):
+        """Make room for ``rows`` more steps in the buffers"""
+        capacity = len(self._buffers["location"])
+        if self._size + rows <= capacity:
+            return
+        if self._size + rows > self._max_rows:
+            self.spill()
+        needed = self._size + rows
+        if needed <= capacity:
+            return
+        capacity = max(min(2 * capacity, self._max_rows), needed)
+        for name, array in self._allocate(capacity).items():
+            array[: self._size] = self._buffers[name][: self._size]
+            self._buffers[name] = array
+
+    def spill(self):
+        """Append the buffered steps to the files of the columns"""
+        if self._directory is None:
+            self._directory = tempfile.mkdtemp(prefix="pta-trace-")
+            # Remove it when closed, or else when the recorder is collected
+            self._cleanup = weakref.finalize(
+                self, shutil.rmtree, self._directory, ignore_errors=True
+            )
+        os.makedirs(self._directory, exist_ok=True)
+        # The first spill replaces the files of any previous trace
+        mode = "ab" if self._spilled > 0 else "wb"
+        for name, array in self._buffers.items():
+            with open(os.path.join(self._directory, name + ".bin"), mode) as f:
+                array[: self._size].tofile(f)
+        self._spilled += self._size
+        self._size = 0
+        with open(os.path.join(self._directory, _META), "w") as f:
+            json.dump({"length": self._spilled, "n_clocks": self._pta.n_clocks}, f)
+
+    def append(
+        self,
+        location: int,
+        clocks: Sequence[float],
+        delay: float = 0.0,
+        edge: int = -1,
+        target: int = -1,
+        env_edge: int = -1,
+        env_delay: float = 0.0,
+        env_target: int = -1,
+    ):
+        """Record a single step, in terms of the ids of the compiled PTA"""
+        self._reserve(1)
+        i = self._size
+        b = self._buffers
+        b["location"][i] = location
+        b["clocks"][i] = clocks
+        b["delay"][i] = delay
+        b["edge"][i] = edge
+        b["target"][i] = target
+        b["env_edge"][i] = env_edge
+        b["env_delay"][i] = env_delay
+        b["env_target"][i] = env_target
+        self._size += 1
+
+    def extend(
+        self,
+        location: np.ndarray,
+        clocks: np.ndarray,
+        delay: Union[float, np.ndarray] = 0.0,
+        edge: Union[int, np.ndarray] = -1,
+        target: Union[int, np.ndarray] = -1,
+        env_edge: Union[int, np.ndarray] = -1,
+        env_delay: Union[float, np.ndarray] = 0.0,
+        env_target: Union[int, np.ndarray] = -1,
+    ):
+        """Record a batch of steps, given as arrays (or scalars for all of them)"""
+        rows = len(location)
+        columns = (
+            location,
+            clocks,
+            delay,
+            edge,
+            target,
+            env_edge,
+            env_delay,
+            env_target,
+        )
+        if rows > self._max_rows:
+            # Too large for the buffers: record it in pieces
+            for start in range(0, rows, self._max_rows):
+                piece = slice(start, start + self._max_rows)
+                self.extend(
+                    *(
+                        np.broadcast_to(col, (rows,) + np.shape(col)[1:])[piece]
+                        for col in columns
+                    )
+                )
+            return
+        self._reserve(rows)
+        window = slice(self._size, self._size + rows)
+        for name, values in zip(COLUMNS, columns):
+            self._buffers[name][window] = values
+        self._size += rows
+
+    def _state(self, obs) -> Any:
+        pta = self._pta
+        return pta.location_id(obs.location), [obs.value[c] for c in pta.clock_order]
+
+    def _edge_id(self, loc_id: int, label) -> int:
+        return int(self._pta.edge_table[loc_id, self._pta.action_id(label)])
+
+    def _target_id(self, edge: int, target: Target) -> int:
+        pta = self._pta
+        location = pta.location_id(target.location)
+        reset = [c in target.reset for c in pta.clock_order]
+        for t in pta.targets(edge):
+            if pta.target_location[t] == location and np.array_equal(
+                pta.target_reset[t], reset
+            ):
+                return t
+        raise ValueError("{} is not a target of the edge {}".format(target, edge))
+
+    def reset(self, sim):
+        """Reset an `MDP` or `DigitalMDP` simulator and record its initial state"""
+        obs = sim.reset()
+        self.append(*self._state(obs))
+        return obs
+
+    def step(self, sim, action, **kwargs):
+        """Step an `MDP` or `DigitalMDP` simulator and record the step
+
+        The keyword arguments are passed to ``sim.step``. Both the edge taken
+        by the controller and the move of the environment are recorded.
+        """
+        delay, label = action
+        loc_id = self._pta.location_id(sim.location)
+        obs = sim.step(action, **kwargs)
+        edge = target = env_edge = env_target = -1
+        env_delay = 0.0
+        if sim.last_target is not None:
+            edge = self._edge_id(loc_id, label)
+            target = self._target_id(edge, sim.last_target)
+            # The environment moves from where the edge led
+            loc_id = self._pta.location_id(sim.last_target.location)
+        move = sim.last_env_move
+        if move is not None:
+            env_edge = self._edge_id(loc_id, move.edge)
+            env_delay = move.delay
+            env_target = self._target_id(env_edge, move.target)
+        self.append(
+            *self._state(obs), delay, edge, target, env_edge, env_delay, env_target
+        )
+        return obs
+
+    def reader(self) -> TraceReader:
+        """Get the columns of the steps recorded so far
+
+        If the recorder has spilled, the remaining steps are spilled too, and
+        the columns are memory-mapped from the files. Otherwise, they are
+        copies of the buffers, as the buffers are overwritten after a spill.
+        """
+        if self._spilled > 0:
+            self.spill()
+            return TraceReader.open(self._directory)
+        return TraceReader(
+            {name: array[: self._size].copy() for name, array in self._buffers.items()}
+        )
+
+    def close(self):
+        """Remove the temporary directory of the spilled columns, if any
+
+        A directory given to the recorder is kept.
+        """
+        if self._cleanup is not None:
+            self._cleanup()
+
+    def __enter__(self) -> "TraceRecorder":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self) -> str:
+        return "TraceRecorder(n_steps={}, spilled={})".format(len(self), self._spilled)
+
+
+__all__ = ["COLUMNS", "TraceReader", "TraceRecorder"]
@@ -0,0 +1,239 @@
+"""Difference-bound matrices (DBMs) for symbolic sets of clock valuations
+
+A zone is a convex set of clock valuations described by constraints of the
+form \\(x_i - x_j \\prec c\\), where \\(\\prec\\) is either ``<`` or ``<=``. A
+`DBM` over ``n`` clocks stores the tightest such bound for every pair of
+clocks in an ``(n + 1) x (n + 1)`` matrix, where the index 0 stands for the
+constant 0 (so ``bounds[i, 0]`` is the upper bound of clock ``i`` and
+``bounds[0, i]`` its negated lower bound).
+
+Each bound \\((c, \\prec)\\) is encoded as the integer ``2 * c + 1`` for ``<=``
+and ``2 * c`` for ``<``, so that the tighter of two bounds is the smaller
+integer, and ``INF`` stands for the absence of a bound. DBMs are always kept
+in canonical form (all the bounds are tight), which makes emptiness and
+inclusion checks simple comparisons.
+"""
+
+from typing import Iterable, Mapping, Tuple, Union
+
+import attr
+import numpy as np
+
+from pta.clock import Clock, ClockConstraint, CompiledConstraint, compile_constraint
+from pta.compiled import clock_order
+
+#: Encoding of the absence of a bound
+INF = 2**62
+#: Encoding of the bound ``<= 0``
+LE_ZERO = 1
+
+
+def bound(c: int, strict: bool = False) -> int:
+    """Encode the bound \\((c, <)\\) (if ``strict``) or \\((c, \\leq)\\)"""
+    return 2 * c + int(not strict)
+
+
+def _add(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Add encoded bounds: the constants add up and the result is strict if either is"""
+    total = ((a >> 1) + (b >> 1)) * 2 + (a & b & 1)
+    return np.where((a >= INF) | (b >= INF), INF, total)
+
+
+def _close(raw: np.ndarray) -> np.ndarray:
+    """Tighten all the bounds of a matrix, in place (Floyd-Warshall)"""
+    for k in range(len(raw)):
+        np.minimum(raw, _add(raw[:, k, np.newaxis], raw[np.newaxis, k, :]), out=raw)
+    return raw
+
+
+@attr.s(frozen=True, eq=False, repr=False)
+class DBM:
+    """A zone of clock valuations, as a canonical difference-bound matrix
+
+    DBMs are immutable: the operations return new DBMs, and DBMs can be
+    compared and hashed. Do not construct this directly, instead use `zero`
+    or `universe` and the operations on DBMs.
+    """
+
+    clocks: Tuple[Clock, ...] = attr.ib(converter=clock_order)
+    bounds: np.ndarray = attr.ib()
+
+    _slots: Mapping[Clock, int] = attr.ib(init=False)
+    _hash: int = attr.ib(init=False)
+
+    def __attrs_post_init__(self):
+        self.bounds.flags.writeable = False
+        object.__setattr__(
+            self, "_slots", {clock: i + 1 for i, clock in enumerate(self.clocks)}
+        )
+        object.__setattr__(self, "_hash", hash((self.clocks, self.bounds.tobytes())))
+
+    @classmethod
+    def zero(cls, clocks: Iterable[Clock]) -> "DBM":
+        """Get the zone where all the clocks are 0"""
+        clocks = clock_order(clocks)
+        n = len(clocks) + 1
+        return cls(clocks, np.full((n, n), LE_ZERO, dtype=np.int64))
+
+    @classmethod
+    def universe(cls, clocks: Iterable[Clock]) -> "DBM":
+        """Get the zone of all the (non-negative) clock valuations"""
+        clocks = clock_order(clocks)
+        n = len(clocks) + 1
+        raw = np.full((n, n), INF, dtype=np.int64)
+        raw[0, :] = LE_ZERO
+        np.fill_diagonal(raw, LE_ZERO)
+        return cls(clocks, raw)
+
+    def _evolve(self, raw: np.ndarray, close: bool = True) -> "DBM":
+        if close:
+            _close(raw)
+            if np.any(np.diagonal(raw) < LE_ZERO):
+                return self._empty()
+        return DBM(self.clocks, raw)
+
+    def _empty(self) -> "DBM":
+        raw = np.full_like(self.bounds, INF)
+        raw[0, 0] = bound(-1)
+        return DBM(self.clocks, raw)
+
+    @property
+    def empty(self) -> bool:
+        """``True`` if the zone has no clock valuation"""
+        return self.bounds[0, 0] < LE_ZERO
+
+    def constrain(
+        self, constraint: Union[ClockConstraint, CompiledConstraint]
+    ) -> "DBM":
+        """Intersect the zone with a clock constraint"""
+        if self.empty:
+            return self
+        if not isinstance(constraint, CompiledConstraint):
+            constraint = compile_constraint(constraint)
+        if not constraint.satisfiable:
+            return self._empty()
+        if len(constraint.atoms) == 0:
+            return self
+        raw = self.bounds.copy()
+        for atom in constraint.atoms:
+            i = self._slots[atom.clock1]
+            j = 0 if atom.clock2 is None else self._slots[atom.clock2]
+            if atom.op.is_lower:
+                # x_i - x_j >= c  <=>  x_j - x_i <= -c
+                i, j, b = j, i, bound(-atom.rhs, atom.op.is_strict)
+            else:
+                b = bound(atom.rhs, atom.op.is_strict)
+            raw[i, j] = min(raw[i, j], b)
+        if np.array_equal(raw, self.bounds):
+            return self
+        return self._evolve(raw)
+
+    def __and__(self, other: "DBM") -> "DBM":
+        """Intersect two zones over the same clocks"""
+        if self.clocks != other.clocks:
+            raise ValueError("Cannot intersect zones over different clocks")
+        if self.empty:
+            return self
+        if other.empty:
+            return other
+        return self._evolve(np.minimum(self.bounds, other.bounds))
+
+    def up(self) -> "DBM":
+        """Let time elapse: get all the valuations reachable by a delay"""
+        if self.empty:
+            return self
+        raw = self.bounds.copy()
+        raw[1:, 0] = INF
+        return self._evolve(raw, close=False)
+
+    def reset(self, clocks: Iterable[Clock]) -> "DBM":
+        """Reset the given clocks to 0"""
+        if self.empty:
+            return self
+        raw = self.bounds.copy()
+        for clock in clocks:
+            i = self._slots[clock]
+            raw[i, :] = raw[0, :]
+            raw[:, i] = raw[:, 0]
+            raw[i, i] = LE_ZERO
+        return self._evolve(raw, close=False)
+
+    def extrapolate(self, max_constants: Mapping[Clock, int]) -> "DBM":
+        """Abstract away the bounds beyond the largest constants of the clocks
+
+        This is the classic maximal-constant extrapolation: upper bounds above
+        the largest constant of a clock are dropped, and lower bounds above it
+        are loosened to it. This makes the number of zones finite, and is exact
+        for reachability as long as no diagonal constraint is involved.
+
+        Parameters
+        ----------
+        max_constants:
+            The largest constant each clock is compared against (0 for the
+            missing clocks).
+        """
+        if self.empty:
+            return self
+        m = np.array([0] + [max_constants.get(c, 0) for c in self.clocks])
+        raw = self.bounds.copy()
+        off_diagonal = ~np.eye(len(m), dtype=bool)
+        above = (raw > bound(m)[:, np.newaxis]) & off_diagonal
+        below = raw < bound(-m, strict=True)[np.newaxis, :]
+        raw[above] = INF
+        raw = np.where(below & off_diagonal, bound(-m, strict=True), raw)
+        if np.array_equal(raw, self.bounds):
+            return self
+        return self._evolve(raw)
+
+    def includes(self, other: "DBM") -> bool:
+        """Check if the zone includes another zone over the same clocks"""
+        if other.empty:
+            return True
+        if self.empty:
+            return False
+        return bool(np.all(other.bounds <= self.bounds))
+
+    def __le__(self, other: "DBM") -> bool:
+        return other.includes(self)
+
+    def __ge__(self, other: "DBM") -> bool:
+        return self.includes(other)
+
+    def __contains__(self, values: Mapping[Clock, float]) -> bool:
+        """Check if a clock valuation is in the zone"""
+        if self.empty:
+            return False
+        v = np.array([0.0] + [values[c] for c in self.clocks])
+        diff = v[:, np.newaxis] - v[np.newaxis, :]
+        finite = self.bounds < INF
+        c = (self.bounds >> 1).astype(float)
+        ok = np.where(self.bounds & 1, diff <= c, diff < c)
+        return bool(np.all(ok | ~finite))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, DBM):
+            return NotImplemented
+        return self.clocks == other.clocks and np.array_equal(self.bounds, other.bounds)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __repr__(self) -> str:
+        if self.empty:
+            return "DBM(empty)"
+        names = ["0"] + [str(c.name) for c in self.clocks]
+        terms = []
+        for i, j in zip(*np.nonzero(self.bounds < INF)):
+            if i == j or (i == 0 and self.bounds[i, j] == LE_ZERO):
+                continue
+            b = self.bounds[i, j]
+            if i == 0:
+                op = ">=" if b & 1 else ">"
+                terms.append("{} {} {}".format(names[j], op, -(b >> 1)))
+                continue
+            lhs = names[i] if j == 0 else "{} - {}".format(names[i], names[j])
+            terms.append("{} {} {}".format(lhs, "<=" if b & 1 else "<", b >> 1))
+        return "DBM({})".format(", ".join(terms))
+
+
+__all__ = ["DBM", "INF", "LE_ZERO", "bound"]
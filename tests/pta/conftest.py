@@ -0,0 +1,56 @@
+import pytest
+
+import pta
+from pta.clock import Boolean
+from pta.distributions import DiscreteDistribution, delta
+from pta.pta import PTA, Target, Transition
+from pta.spaces import FiniteSpace
+
+
+@pytest.fixture
+def simple_pta() -> PTA:
+    """A small PTA with a probabilistic edge, resets and invariants
+
+    In ``a``, the controller can ``go`` (once ``x >= 1``) to ``b`` with
+    probability 0.7 (resetting ``x``), otherwise it stays in ``a``. In ``b``,
+    it can either go ``back`` or be ``done`` and move to the sink ``c``.
+    """
+    x, y = pta.new_clocks(("x", "y"))
+
+    def transitions(loc):
+        if loc == "a":
+            return {
+                "go": Transition(
+                    x >= 1,
+                    DiscreteDistribution(
+                        {
+                            Target(frozenset([x]), "b"): 0.7,
+                            Target(frozenset(), "a"): 0.3,
+                        }
+                    ),
+                )
+            }
+        if loc == "b":
+            return {
+                "back": Transition(
+                    (y >= 2) & (x <= 3), delta(Target(frozenset([x, y]), "a"))
+                ),
+                "done": Transition(x >= 2, delta(Target(frozenset(), "c"))),
+            }
+        return {}
+
+    def invariants(loc):
+        if loc == "a":
+            return x <= 2
+        if loc == "b":
+            return x <= 4
+        return Boolean(True)
+
+    return PTA(
+        location_space=FiniteSpace("abc"),
+        clocks=[x, y],
+        actions=["go", "back", "done"],
+        init_location="a",
+        transitions=transitions,
+        invariants=invariants,
+    )
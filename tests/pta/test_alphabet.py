@@ -0,0 +1,34 @@
+import pytest
+
+from pta.alphabet import ExplicitAlphabet, ExponentialAlphabet, ProductAlphabet
+
+
+@pytest.mark.parametrize(
+    "alphabet",
+    [
+        ExplicitAlphabet("cab"),
+        ProductAlphabet("ab", range(3)),
+        ExponentialAlphabet(ProductAlphabet("xy", "uvw"), 3),
+    ],
+)
+def test_alphabet_ranking(alphabet):
+    """Letters are ranked in the iteration order of the alphabet"""
+    letters = list(alphabet)
+    assert len(letters) == len(alphabet)
+    for i, letter in enumerate(letters):
+        assert alphabet.index(letter) == i
+        assert alphabet.letter(i) == letter
+    with pytest.raises(IndexError):
+        alphabet.letter(len(alphabet))
+
+
+def test_large_alphabet():
+    """Ranking does not enumerate the alphabet"""
+    alphabet = ExponentialAlphabet(range(100), 8)
+    assert len(alphabet) == 100**8
+    assert alphabet.index((0, 0, 0, 0, 0, 0, 1, 2)) == 102
+    assert alphabet.letter(100**8 - 1) == (99,) * 8
+    with pytest.raises(ValueError):
+        alphabet.index((0, 100, 0, 0, 0, 0, 0, 0))
+    with pytest.raises(ValueError):
+        alphabet.index((0,))
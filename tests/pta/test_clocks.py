@@ -8,3 +8,94 @@ def test_singleton_constraints():
 
     with pytest.raises(TypeError):
         x < y
+
+
+def test_compiled_constraint():
+    """Check that the flat evaluator agrees with the recursive semantics"""
+    from pta.clock import ClockValuation, compile_constraint
+
+    x, y = pta.new_clocks(("x", "y"))
+    guard = (x >= 1) & (x >= 2) & ((y < 3) & (x - y <= 1)) & (x > 1)
+
+    compiled = guard.compile()
+    assert compiled is guard.compile()
+    assert len(compiled.atoms) == 3
+
+    for vx, vy in [(2, 1.5), (1.5, 1), (2, 3), (4, 2), (2, 1)]:
+        values = ClockValuation({x: vx, y: vy})
+        assert compiled(values) == guard.contains(values)
+        assert compiled.bind((x, y))((vx, vy)) == guard.contains(values)
+
+    assert not compile_constraint((x >= 1) & False).satisfiable
+    assert compile_constraint(True)(ClockValuation({x: 0}))
+
+
+def test_valuation_batch():
+    """Check batched delays, resets and guards against the scalar semantics"""
+    import numpy as np
+
+    from pta.clock import ClockValuation, ClockValuationBatch
+
+    x, y = pta.new_clocks(("x", "y"))
+    guard = (x <= 2) & (y > 1) & (y - x >= 1)
+    valuations = [ClockValuation({x: i / 2, y: i}) for i in range(6)]
+
+    batch = ClockValuationBatch.from_valuations(valuations, (x, y))
+    assert batch.to_valuations() == valuations
+    assert list(batch.satisfies(guard)) == [v in guard for v in valuations]
+
+    delays = np.arange(6) / 4
+    delayed = (batch + delays).reset([x])
+    expected = [(v + d).reset([x]) for v, d in zip(valuations, delays)]
+    assert delayed.to_valuations() == expected
+    assert list(delayed.satisfies(guard)) == [v in guard for v in expected]
+
+    mask = np.zeros((6, 2), dtype=bool)
+    mask[::2, 1] = True
+    assert list(batch.reset(mask).values[:, 1]) == [0, 1, 0, 3, 0, 5]
+
+
+def test_delays_batch():
+    """Check batched delay bounds against the interval semantics"""
+    import numpy as np
+
+    from pta.clock import ClockValuationBatch, delays, delays_batch
+
+    x, y = pta.new_clocks(("x", "y"))
+    invariant = (x <= 4) & (y < 3) & (x > 1) & (x - y <= 2)
+    batch = ClockValuationBatch((x, y), np.array([[0, 0], [2, 1], [2, 3], [5, 0]]))
+
+    bounds = delays_batch(batch, invariant)
+    for i, values in enumerate(batch.to_valuations()):
+        expected = delays(values, invariant)
+        assert bounds.empty[i] == expected.empty
+        if not expected.empty:
+            assert bounds.lower[i] == expected.lower
+            assert bounds.upper[i] == expected.upper
+            assert bounds.left_closed[i] == expected.left_closed
+            assert bounds.right_closed[i] == expected.right_closed
+
+
+def test_delay_interval():
+    """Check the native delay intervals against `portion`"""
+    import portion as P
+
+    from pta.clock import ClockValuation, DelayInterval, delays
+
+    x, y = pta.new_clocks(("x", "y"))
+    values = ClockValuation({x: 0.5, y: 2})
+
+    assert delays(values, (x > 1) & (y <= 4)).to_portion() == P.openclosed(0.5, 2)
+    assert delays(values, (x >= 0) & (y < 2)).empty
+    assert delays(values, x - y >= 1).empty
+    assert delays(values, True).to_portion() == P.closedopen(0, P.inf)
+
+    a, b = DelayInterval(0, 5, True, True), DelayInterval(1, float("inf"), False)
+    assert (a & b).to_portion() == P.openclosed(1, 5)
+    assert 5 in (a & b) and 1 not in (a & b)
+
+    # Intervals are immutable, so the shared empty interval cannot be changed
+    empty = delays(values, x - y >= 1)
+    with pytest.raises(AttributeError):
+        empty.upper = 5.0
+    assert delays(values, x - y >= 1).empty
@@ -0,0 +1,57 @@
+import pickle
+import random
+
+import attr
+import numpy as np
+import pytest
+
+from pta.clock import ClockValuation
+from pta.mdp import MDP
+
+
+def test_compiled_tables(simple_pta):
+    """Check the tables and the PTA interface of a compiled PTA"""
+    compiled = simple_pta.compile()
+    x, y = compiled.clock_order
+
+    assert compiled.locations == ("a", "b", "c")
+    assert compiled.action_labels == ("back", "done", "go")
+    assert list(compiled.edge_ptr) == [0, 1, 3, 3]
+    assert compiled.clocks == simple_pta.clocks
+    assert compiled.actions == simple_pta.actions
+
+    edge = compiled.edges(compiled.location_id("a"))[0]
+    assert [
+        compiled.locations[compiled.target_location[t]] for t in compiled.targets(edge)
+    ] == ["b", "a"]
+    assert compiled.reset_clocks(compiled.targets(edge)[0]) == {x}
+
+    for loc in compiled.locations:
+        for vx, vy in [(0, 0), (1.5, 2), (2.5, 3), (5, 1)]:
+            values = ClockValuation({x: vx, y: vy})
+            assert (
+                compiled.enabled_actions(loc, values).keys()
+                == simple_pta.enabled_actions(loc, values).keys()
+            )
+            assert compiled.allowed_delays(loc, values) == simple_pta.allowed_delays(
+                loc, values
+            )
+
+
+def test_compiled_simulation(simple_pta):
+    """Simulating a compiled (and pickled) PTA follows the same trajectory"""
+    compiled = pickle.loads(pickle.dumps(simple_pta.compile()))
+
+    trajectories = []
+    for model in (simple_pta, compiled):
+        random.seed(0)
+        mdp = MDP(model)
+        trajectories.append([mdp.step((1.0, "go")) for _ in range(5)])
+    assert trajectories[0] == trajectories[1]
+
+
+def test_compiled_empty_targets(simple_pta):
+    """Edges without any probable target are rejected"""
+    compiled = simple_pta.compile()
+    with pytest.raises(ValueError, match="no probability"):
+        attr.evolve(compiled, target_prob=np.zeros_like(compiled.target_prob))
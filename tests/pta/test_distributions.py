@@ -0,0 +1,41 @@
+import random
+from collections import Counter
+
+import numpy as np
+import pytest
+from pytest import approx
+
+from pta.distributions import DiscreteDistribution, delta
+
+
+def test_alias_sampling():
+    """Check that single and vectorized draws follow the distribution"""
+    weights = {("a", 1): 0.5, ("b", 2): 0.3, ("c", 3): 0.2, ("d", 4): 0.0}
+    dist = DiscreteDistribution(weights)
+    n = 20000
+
+    random.seed(0)
+    counts = Counter(dist.sample()[0] for _ in range(n))
+    assert counts[("d", 4)] == 0
+    for x, p in weights.items():
+        assert counts[x] / n == approx(p, abs=0.02)
+
+    samples = dist.sample(k=n, rng=np.random.default_rng(0))
+    assert len(samples) == n
+    counts = Counter(samples)
+    for x, p in weights.items():
+        assert counts[x] / n == approx(p, abs=0.02)
+
+    random.seed(1)
+    first = dist.sample(k=10)
+    random.seed(1)
+    assert dist.sample(k=10) == first
+
+    assert delta("x").sample(k=3) == ["x", "x", "x"]
+
+
+def test_zero_weights():
+    """Distributions without any positive weight are rejected when built"""
+    for weights in ({"a": 0.0, "b": 0.0}, {}):
+        with pytest.raises(ValueError, match="positive"):
+            DiscreteDistribution(weights)
@@ -0,0 +1,67 @@
+import random
+
+import pta
+from pta.clock import Boolean, ClockValuation, delays
+from pta.index import GuardIndex
+
+
+def test_guard_index():
+    """Compare the indexed queries with checking every guard"""
+    rng = random.Random(0)
+    clocks = pta.new_clocks(("x", "y", "z"))
+    x, y, _ = clocks
+
+    guards = []
+    for i in range(200):
+        cc = Boolean(True)
+        for clock in rng.sample(clocks, 2):
+            lo = rng.randint(0, 10)
+            cc = cc & (clock >= lo) & (clock < lo + rng.randint(1, 5))
+        if i % 10 == 0:
+            cc = cc & (x - y <= 2)
+        guards.append(cc)
+    index = GuardIndex(range(200), [g.compile() for g in guards], clocks)
+
+    for _ in range(50):
+        values = ClockValuation({c: rng.uniform(0, 12) for c in clocks})
+        assert index.enabled(values) == [i for i, g in enumerate(guards) if values in g]
+
+        within = index.enabled_within(values, 2.0)
+        for i, g in enumerate(guards):
+            interval = delays(values, g)
+            expected = not interval.empty and interval.lower <= 2.0
+            if interval.lower == 2.0:
+                expected = expected and interval.left_closed
+            assert (i in within) == expected
+
+
+class _Counting:
+    """A compiled guard that counts how many times it is evaluated"""
+
+    def __init__(self, guard):
+        self._guard = guard
+        self.calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self._guard, name)
+
+    def __call__(self, values):
+        self.calls += 1
+        return self._guard(values)
+
+
+def test_guard_index_one_sided():
+    """Guards bounding a single clock on one side are filed under that clock"""
+    clocks = pta.new_clocks(("x", "y"))
+    x, y = clocks
+    guards = [(x if i % 2 == 0 else y) >= i + 1 for i in range(100)]
+    counting = [_Counting(g.compile()) for g in guards]
+    index = GuardIndex(range(100), counting, clocks)
+
+    # Only the guards whose lower bound is reached are evaluated
+    values = ClockValuation({x: 30.5, y: 60.5})
+    enabled = [i for i, g in enumerate(guards) if values in g]
+    assert index.enabled(values) == enabled
+    assert sum(g.calls for g in counting) == len(enabled)
+    assert index.enabled(ClockValuation({x: 0.5, y: 0.5})) == []
+    assert sum(g.calls for g in counting) == len(enabled)
@@ -0,0 +1,71 @@
+import io
+
+import numpy as np
+import pytest
+
+import pta.io
+from pta.clock import Boolean
+from pta.distributions import delta
+from pta.mdp import build_digital_graph
+from pta.pta import PTA, Target, Transition
+from pta.spaces import FiniteSpace
+
+
+def test_save_load(simple_pta, tmp_path):
+    """A saved PTA loads back into the same tables, without its callables"""
+    compiled = simple_pta.compile()
+    path = str(tmp_path / "simple.npz")
+    pta.io.save(simple_pta, path)
+    loaded = pta.io.load(path)
+
+    assert loaded.locations == compiled.locations
+    assert loaded.clock_order == compiled.clock_order
+    assert loaded.action_labels == compiled.action_labels
+    for name in ("edge_ptr", "edge_action", "target_ptr", "target_prob"):
+        assert np.array_equal(getattr(loaded, name), getattr(compiled, name))
+    assert loaded.edge_guard == compiled.edge_guard
+    assert loaded.invariant == compiled.invariant
+    assert (
+        build_digital_graph(loaded).n_states == build_digital_graph(compiled).n_states
+    )
+
+    as_pta = pta.io.load_pta(path)
+    assert as_pta.clocks == simple_pta.clocks
+    for loc in "abc":
+        assert as_pta.transitions(loc).keys() == simple_pta.transitions(loc).keys()
+        assert as_pta.invariants(loc) == simple_pta.invariants(loc)
+
+
+def test_save_labels():
+    """Tuple labels are restored, and labels that are not JSON values are rejected"""
+    compiled = pta.io.load(_roundtrip(_tuple_pta()))
+    assert compiled.locations == (("q", 0), ("q", 1))
+
+    with pytest.raises(TypeError):
+        pta.io.save(_tuple_pta(location=object()), io.BytesIO())
+
+
+def _roundtrip(model) -> io.BytesIO:
+    buffer = io.BytesIO()
+    pta.io.save(model, buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def _tuple_pta(location=("q", 1)):
+    (x,) = pta.new_clocks("x")
+    start = ("q", 0)
+
+    def transitions(loc):
+        if loc == start:
+            return {"go": Transition(x >= 1, delta(Target(frozenset([x]), location)))}
+        return {}
+
+    return PTA(
+        location_space=FiniteSpace([start, location]),
+        clocks=[x],
+        actions=["go"],
+        init_location=start,
+        transitions=transitions,
+        invariants=lambda loc: Boolean(True),
+    )
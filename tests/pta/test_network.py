@@ -0,0 +1,94 @@
+import attr
+import pytest
+
+import pta
+from pta.clock import Boolean
+from pta.distributions import DiscreteDistribution, delta
+from pta.mdp import MDP, DigitalMDP, RegionMDP
+from pta.network import Network
+from pta.pta import PTA, Target, Transition
+from pta.spaces import FiniteSpace
+
+
+@pytest.fixture
+def network() -> Network:
+    """A sender that sends once ``x >= 1``, and a lossy receiver
+
+    The receiver gets the message with probability 0.5, and can ``tick`` on
+    its own (an environment edge) while idle.
+    """
+    x, y = pta.new_clocks(("x", "y"))
+    sender = PTA(
+        location_space=FiniteSpace(["ready", "sent"]),
+        clocks=[x],
+        actions=["send"],
+        init_location="ready",
+        transitions=lambda loc: (
+            {"send": Transition(x >= 1, delta(Target(frozenset([x]), "sent")))}
+            if loc == "ready"
+            else {}
+        ),
+        invariants=lambda loc: x <= 2 if loc == "ready" else Boolean(True),
+    )
+    receiver = PTA(
+        location_space=FiniteSpace(["idle", "got"]),
+        clocks=[y],
+        actions=["recv"],
+        init_location="idle",
+        transitions=lambda loc: (
+            {
+                "recv": Transition(
+                    y <= 3,
+                    DiscreteDistribution(
+                        {
+                            Target(frozenset([y]), "got"): 0.5,
+                            Target(frozenset(), "idle"): 0.5,
+                        }
+                    ),
+                ),
+                "tick": Transition(y >= 5, delta(Target(frozenset([y]), "idle"))),
+            }
+            if loc == "idle"
+            else {}
+        ),
+        invariants=lambda loc: Boolean(True),
+    )
+    return Network([sender, receiver], {"msg": {0: "send", 1: "recv"}})
+
+
+def test_network_transitions(network):
+    x, y = pta.new_clocks(("x", "y"))
+    assert network.initial_location == ("ready", "idle")
+    assert network.actions == {"msg"}
+    assert network.invariants(("ready", "idle")) == (x <= 2)
+
+    transitions = network.transitions(("ready", "idle"))
+    assert transitions.keys() == {"msg", (1, "tick")}
+    guard, dist = transitions["msg"]
+    assert guard == (x >= 1) & (y <= 3)
+    assert dist(Target(frozenset([x, y]), ("sent", "got"))) == 0.5
+    assert dist(Target(frozenset([x]), ("sent", "idle"))) == 0.5
+    # Only the receiver can move once the sender is done
+    assert network.transitions(("sent", "idle")).keys() == {(1, "tick")}
+
+
+def test_network_simulators(network):
+    """The simulators take a network, and only build the locations they visit"""
+    for sim in (MDP(network), DigitalMDP(network), MDP(network.to_pta().cached())):
+        sim.reset()
+        obs = sim.step((1, "msg"))
+        assert obs.location in {("sent", "got"), ("sent", "idle")}
+        out = sim.observe(sim.encoder.empty())
+        assert out[0] in (1, 2)
+
+    region = RegionMDP(network)
+    region.reset()
+    region.delay(1)
+    assert "msg" in region.enabled_actions()
+
+
+def test_network_hash(network):
+    """Networks can be hashed, e.g. to be used as cache keys"""
+    same = Network(network.components, {"msg": {1: "recv", 0: "send"}})
+    assert same == network and hash(same) == hash(network)
+    assert attr.evolve(network).syncs == network.syncs
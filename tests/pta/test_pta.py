@@ -0,0 +1,60 @@
+import pickle
+import random
+
+import pta
+from pta.clock import Boolean
+from pta.distributions import delta
+from pta.mdp import MDP, DigitalMDP
+from pta.pta import PTA, Target, Transition
+from pta.spaces import FiniteSpace
+
+X = pta.new_clocks(["x"])[0]
+
+
+def _loop(loc):
+    return {"tick": Transition(X >= 1, delta(Target(frozenset([X]), loc)))}
+
+
+def _true(loc):
+    return Boolean(True)
+
+
+def test_cached_pta(simple_pta):
+    """Check that simulators sharing a cached PTA hit the caches"""
+    cached = simple_pta.cached(maxsize=2)
+    assert simple_pta.cache_info() == {"transitions": None, "invariants": None}
+
+    random.seed(0)
+    mdp, digital = MDP(cached), DigitalMDP(cached)
+    for _ in range(10):
+        mdp.step((1.0, "go"))
+        digital.step((1, "go"))
+
+    info = cached.cache_info()
+    assert info["transitions"].hits > 0 and info["invariants"].hits > 0
+    assert info["transitions"].currsize <= 2
+
+
+def test_cached_pta_twice():
+    """Caching a cached PTA replaces its caches, which are rebuilt when unpickled"""
+    model = PTA(
+        location_space=FiniteSpace(["a"]),
+        clocks=[X],
+        actions=["tick"],
+        init_location="a",
+        transitions=_loop,
+        invariants=_true,
+    )
+    cached = model.cached(maxsize=4)
+    cached.transitions("a")
+    again = cached.cached(maxsize=8)
+    assert again.cache_info()["transitions"].maxsize == 8
+    again.transitions("a")
+    assert again.cache_info()["transitions"].misses == 1
+    # The new cache calls the function itself, not the old cache
+    assert cached.cache_info()["transitions"].hits == 0
+
+    copy = pickle.loads(pickle.dumps(cached))
+    assert copy.cache_info()["transitions"].currsize == 0
+    assert copy.transitions("a").keys() == {"tick"}
+    assert copy.cache_info()["transitions"].currsize == 1
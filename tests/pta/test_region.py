@@ -1,5 +1,7 @@
 from pytest import approx
+from pta.mdp.region_graph import build_region_graph
 from pta.mdp.region_mdp import Region
+from pta.mdp.sparse import Tau
 from pta import new_clocks
 
 
@@ -9,18 +11,26 @@ def test_region_value():
 
     reg = Region((x, y, z))
     assert dict(reg.value()) == {x: 0, y: 0, z: 0}
-    assert dict(reg.delay(1).value()) == {x: 0.5, y: 0.5, z: 0.5}
-    assert dict(reg.reset(x).value()) == {x: 0.0, y: 0.5, z: 0.5}
-    assert dict(reg.delay(1).value()) == {x: 0.25, y: 0.75, z: 0.75}
-    assert dict(reg.delay(4).value()) == {x: 1.25, y: 1.75, z: 1.75}
-    assert dict(reg.reset(y).value()) == {x: approx(4 / 3), y: 0.0, z: approx(5 / 3)}
-    assert dict(reg.delay(1).value()) == {
+    reg = reg.delay(1)
+    assert dict(reg.value()) == {x: 0.5, y: 0.5, z: 0.5}
+    reg = reg.reset(x)
+    assert dict(reg.value()) == {x: 0.0, y: 0.5, z: 0.5}
+    reg = reg.delay(1)
+    assert dict(reg.value()) == {x: 0.25, y: 0.75, z: 0.75}
+    reg = reg.delay(4)
+    assert dict(reg.value()) == {x: 1.25, y: 1.75, z: 1.75}
+    reg = reg.reset(y)
+    assert dict(reg.value()) == {x: approx(4 / 3), y: 0.0, z: approx(5 / 3)}
+    reg = reg.delay(1)
+    assert dict(reg.value()) == {
         x: approx(4 / 3 + 1 / 6),
         y: approx(1 / 6),
         z: approx(5 / 3 + 1 / 6),
     }
-    assert dict(reg.delay(1).value()) == {x: approx(5 / 3), y: approx(1 / 3), z: 2.0}
-    assert dict(reg.reset(z).value()) == {x: approx(5 / 3), y: approx(1 / 3), z: 0}
+    reg = reg.delay(1)
+    assert dict(reg.value()) == {x: approx(5 / 3), y: approx(1 / 3), z: 2.0}
+    reg = reg.reset(z)
+    assert dict(reg.value()) == {x: approx(5 / 3), y: approx(1 / 3), z: 0}
 
 
 def test_delay_float():
@@ -29,10 +39,56 @@ def test_delay_float():
     reg1 = Region((x, y, z))
     reg2 = Region((x, y, z))
 
-    assert reg1.delay(1).value() == reg2.delay_float(0.5).value()
-    assert reg1.reset(x).value() == reg2.reset(x).value()
-    assert reg1.delay(1).value() == reg2.delay_float(0.25).value()
-    assert reg1.delay(4).value() == reg2.delay_float(1.0).value()
-    assert reg1.reset(y).value() == reg2.reset(y).value()
-    assert reg1.delay(1).value() == reg2.delay_float(1 / 6).value()
-    assert reg1.delay(1).value() == reg2.delay_float(1 / 6).value()
+    for step, time, reset in [
+        (1, 0.5, x),
+        (1, 0.25, None),
+        (4, 1.0, y),
+        (1, 1 / 6, None),
+        (1, 1 / 6, None),
+    ]:
+        reg1, reg2 = reg1.delay(step), reg2.delay_float(time)
+        assert reg1 == reg2
+        if reset is not None:
+            reg1, reg2 = reg1.reset(reset), reg2.reset(reset)
+            assert reg1.value() == reg2.value()
+
+
+def test_region_interning():
+    """Regions are immutable, hashable and interned"""
+    x, y = new_clocks(("x", "y"))
+    zero = Region.zero((x, y))
+    reg1 = zero.delay(2).reset(x).delay(1)
+    reg2 = zero.delay(1).delay(1).reset(x).delay(1)
+
+    assert dict(zero.value()) == {x: 0, y: 0}
+    assert reg1 is reg2
+    assert Region((y, x)) == zero and hash(Region((y, x))) == hash(zero)
+    assert len({zero, reg1, reg2, Region((x, y))}) == 2
+    assert reg1.key() != zero.key()
+
+    assert dict(reg1.delay(6).value()) == {x: 3.5, y: 4.5}
+    assert dict(reg1.delay(6).cap({x: 3, y: 3}).value()) == {x: 3.5, y: 4.5}
+    assert dict(reg1.delay(6).cap({x: 3, y: 2}).value()) == {x: 3.5, y: 3.5}
+    assert dict(reg1.value()) == {x: 0.5, y: 1.5}
+
+
+def test_region_graph(simple_pta):
+    """Check the explicit region graph of a PTA"""
+    graph = build_region_graph(simple_pta)
+    compiled = simple_pta.compile()
+
+    assert graph.initial == 0
+    assert graph.states[0].location == "a"
+    assert graph.transitions.sum(axis=1) == approx(1.0)
+    assert {state.location for state in graph.states} == {"a", "b", "c"}
+
+    for s, state in enumerate(graph.states):
+        values = state.region.value()
+        labels = {graph.choice_label[c] for c in graph.choices(s)}
+        # The delay is only available while the invariant holds after it.
+        enabled = set(compiled.enabled_actions(state.location, values))
+        assert labels - {Tau.DELAY} == enabled or labels == {Tau.DEADLOCK}
+        assert graph.state_id(state) == s
+
+    go = next(c for c in graph.choices(2) if graph.choice_label[c] == "go")
+    assert sorted(graph.successors(go).values()) == approx([0.3, 0.7])
@@ -0,0 +1,38 @@
+import multiprocessing
+import pickle
+
+import numpy as np
+import pytest
+
+from pta.replay import ReplayBuffer
+
+
+def fill(buffer, writer, n):
+    for i in range(n):
+        buffer.add(writer, i, [i, i], 0, 1.0, i + 1, [i + 1, i + 1], False)
+
+
+def test_replay_buffer(tmp_path):
+    buffer = ReplayBuffer.create(2, 8, n_writers=2, path=str(tmp_path / "r.bin"))
+    with pytest.raises(ValueError):
+        buffer.sample(1)
+
+    # The second shard is filled by another process, through the file
+    process = multiprocessing.Process(target=fill, args=(buffer, 1, 3))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    # The first shard wraps around and keeps its newest transitions
+    fill(buffer, 0, 6)
+    buffer.add(0, [6, 7], [[6, 6], [7, 7]], -1, 0.5, [7, 8], 0, [False, True])
+    assert list(buffer.sizes()) == [4, 3] and len(buffer) == 7
+
+    batch = buffer.sample(1000, np.random.default_rng(0))
+    assert set(batch.location.tolist()) == {4, 5, 6, 7, 0, 1, 2}
+    assert (batch.next_location == batch.location + 1).all()
+    assert (batch.clocks[:, 0] == batch.location).all()
+    assert (batch.done == (batch.location == 7)).all()
+    assert (batch.action[batch.location >= 6] == -1).all()
+
+    reader = pickle.loads(pickle.dumps(ReplayBuffer.open(buffer.path, "r")))
+    assert list(reader.sizes()) == [4, 3]
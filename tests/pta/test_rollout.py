@@ -0,0 +1,47 @@
+import random
+
+from pta.mdp import DigitalMDP, RegionMDP
+from pta.rollout import rollout
+
+
+def go_policy(sim, obs):
+    return (random.randint(0, 2), "go")
+
+
+def delay_policy(sim, obs):
+    return 0.5
+
+
+def in_c(obs):
+    return obs.location == "c"
+
+
+def test_rollout_reproducible(simple_pta):
+    """Results do not depend on the number of workers"""
+    kwargs = dict(simulator=DigitalMDP, max_steps=20, terminal=in_c, seed=7)
+    inline = sorted(rollout(simple_pta, go_policy, 8, processes=0, **kwargs))
+    pooled = sorted(rollout(simple_pta, go_policy, 8, processes=2, **kwargs))
+    assert [r.index for r in pooled] == list(range(8))
+    assert inline == pooled
+
+
+def test_rollout_region(simple_pta):
+    results = list(
+        rollout(simple_pta, delay_policy, 2, simulator=RegionMDP, processes=0)
+    )
+    # Delaying in `a` eventually violates the invariant `x <= 2`
+    assert all(r.final is None and r.steps == 5 for r in results)
+
+
+def test_rollout_interleaved(simple_pta):
+    """In-process rollouts keep their own state, and the caller's `random` state"""
+    first = rollout(simple_pta, go_policy, 3, max_steps=2, processes=0)
+    other = rollout(simple_pta, go_policy, 3, max_steps=5, processes=0)
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    assert next(first).steps <= 2
+    next(other)
+    other.close()
+    assert all(r.steps <= 2 for r in first)
+    assert random.random() == expected
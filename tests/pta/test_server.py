@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from pta.mdp import MDP
+from pta.server import EnvClient, EnvServer
+
+
+def test_server(simple_pta, tmp_path):
+    """Steps over the socket match the hosted simulators"""
+    compiled = simple_pta.compile()
+    sims = [MDP(compiled) for _ in range(4)]
+    go = sims[0].action_labels.index("go")
+    path = str(tmp_path / "env.sock")
+
+    # The server can be made outside of the loop that runs it
+    server = EnvServer(sims)
+
+    async def main():
+        async with server:
+            await server.start_unix(path)
+            client = await EnvClient.connect_unix(path)
+            other = await EnvClient.connect_unix(path)
+            async with client, other:
+                spec = client.spec
+                assert (spec.n_envs, spec.size) == (4, 1 + compiled.n_clocks)
+                assert spec.n_actions == len(sims[0].action_labels)
+
+                obs, mask, delays = await client.reset(0)
+                assert (obs == 0).all() and not mask.any()
+                # In `a`, the invariant is x <= 2
+                assert (delays.lower, delays.upper) == (0.0, 2.0)
+                assert delays.left_closed and delays.right_closed
+
+                # Both clients pipeline their requests, served in the same ticks
+                batch, other_batch = await asyncio.gather(
+                    client.step_batch([0, 1], [-1, -1], [1.0, 0.5]),
+                    other.step_batch([2, 3], [-1, go], [2.0, 1.0]),
+                )
+                assert batch.obs[:, 1:].tolist() == [[1.0, 1.0], [0.5, 0.5]]
+                assert batch.mask[:, go].tolist() == [True, False]
+                assert batch.delays.upper.tolist() == [1.0, 1.5]
+                assert other_batch.obs[0, 1:].tolist() == [2.0, 2.0]
+                observed = list(batch.obs) + list(other_batch.obs)
+                for sim, row in zip(sims, observed):
+                    assert row[0] == compiled.location_id(sim.location)
+
+                # Errors are reported, and the connection stays usable
+                with pytest.raises(RuntimeError, match="IndexError"):
+                    await client.step(7, -1, 1.0)
+                obs, _, _ = await client.step(0, go, 0.0)
+                assert obs[0] == compiled.location_id(sims[0].location)
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(main())
+    finally:
+        loop.close()
@@ -0,0 +1,70 @@
+import math
+import random
+
+import pytest
+
+from pta import smc
+
+
+def go(sim, obs):
+    return (1, "go")
+
+
+def in_b(location, valuation):
+    return location == "b"
+
+
+def test_estimate(simple_pta):
+    """Going once from `a` reaches `b` with probability 0.7"""
+    result = smc.estimate(simple_pta, go, in_b, max_steps=1, epsilon=0.05)
+    assert result.lower <= 0.7 <= result.upper
+    assert result.upper - result.lower <= 0.1
+    assert result.samples <= smc.chernoff_samples(0.05, 0.05)
+    # The precision is met at the last check, even for a tighter epsilon
+    tight = smc.estimate(simple_pta, go, in_b, max_steps=1, epsilon=0.02)
+    assert tight.upper - tight.lower <= 0.04
+    assert result == smc.estimate(simple_pta, go, in_b, max_steps=1, epsilon=0.05)
+
+    chernoff = smc.estimate(
+        simple_pta, go, in_b, max_steps=1, epsilon=0.05, method="chernoff"
+    )
+    assert chernoff.samples == smc.chernoff_samples(0.05, 0.05)
+    assert chernoff.lower <= 0.7 <= chernoff.upper
+    assert math.isclose(chernoff.upper - chernoff.lower, 0.1, rel_tol=1e-2)
+
+    # The delay of the scheduler exceeds the time bound
+    late = smc.estimate(simple_pta, go, in_b, time_bound=0.5, epsilon=0.05)
+    assert late.successes == 0
+    # Far from 1/2, the Clopper-Pearson interval stops early
+    assert late.upper <= 0.1 and late.samples < smc.chernoff_samples(0.05, 0.05)
+
+
+@pytest.mark.parametrize("threshold, accepted", [(0.6, True), (0.8, False)])
+def test_sprt(simple_pta, threshold, accepted):
+    result = smc.sprt(simple_pta, go, in_b, threshold, indifference=0.05, max_steps=1)
+    assert result.accepted is accepted
+    assert smc.sprt(simple_pta, go, in_b, threshold, max_samples=5).accepted is None
+
+
+def test_simulate_keeps_random_state(simple_pta):
+    random.seed(1)
+    expected = random.random()
+    random.seed(1)
+    runs = smc.simulate(simple_pta, go, in_b, max_steps=1)
+    [next(runs) for _ in range(3)]
+    assert random.random() == expected
+
+
+def test_time_bound(simple_pta):
+    """The time of a run is measured by a clock, which goals can observe"""
+    seen = []
+
+    def goal(location, valuation):
+        seen.append(max(valuation.values()))
+        return location == "b"
+
+    runs = smc.simulate(simple_pta, go, goal, max_steps=1, time_bound=1)
+    assert sum(next(runs) for _ in range(100)) > 0
+    assert max(seen) == 1.0
+    runs = smc.simulate(simple_pta, go, in_b, max_steps=1, time_bound=0.5)
+    assert not any(next(runs) for _ in range(100))
@@ -0,0 +1,120 @@
+import numpy as np
+from pytest import approx
+
+from pta.mdp.digital_graph import DigitalState, build_digital_graph
+from pta.mdp.solvers import (
+    action_rewards,
+    delay_rewards,
+    expected_reward,
+    expected_time,
+    prob0a,
+    prob0e,
+    prob1a,
+    prob1e,
+    reachability,
+)
+from pta.mdp.sparse import explore
+
+
+def toy_mdp():
+    """In state 0, either ``risk`` it, or ``wait`` in 3 and ``try`` repeatedly
+
+    The target is 1 and 2 is a sink. In 3, ``idle`` loops forever, so it
+    attains the maximal value of 3 without ever reaching the target.
+    """
+    choices = {
+        0: [("risk", [(1, 0.5), (2, 0.5)]), ("wait", [(3, 1.0)])],
+        1: [],
+        2: [],
+        3: [("idle", [(3, 1.0)]), ("try", [(1, 0.2), (0, 0.8)])],
+    }
+    mdp = explore(0, lambda s: choices[s])
+    target = np.array([s == 1 for s in mdp.states])
+    return mdp, target
+
+
+def test_reachability():
+    """Check the maximal and minimal reachability probabilities of a toy MDP"""
+    mdp, target = toy_mdp()
+    ids = {s: mdp.state_id(s) for s in range(4)}
+    labels = {
+        s: mdp.choice_label[c]
+        for s, c in zip(mdp.states, reachability(mdp, target).scheduler)
+    }
+
+    assert list(prob0a(mdp, target)) == [s == 2 for s in mdp.states]
+    assert list(prob0e(mdp, target)) == [s != 1 for s in mdp.states]
+
+    result = reachability(mdp, target, epsilon=1e-9)
+    assert result.converged
+    assert result.values[ids[0]] == approx(1.0, abs=1e-6)
+    assert result.values[ids[2]] == 0
+    assert labels[0] == "wait" and labels[3] == "try"
+
+    result = reachability(mdp, target, maximize=False)
+    assert result.values[[ids[0], ids[3]]] == approx([0.0, 0.0])
+    assert [mdp.choice_label[result.scheduler[ids[s]]] for s in (0, 3)] == [
+        "wait",
+        "idle",
+    ]
+
+
+def test_digital_graph(simple_pta):
+    """Check the digital clocks MDP of a PTA and its reachability probabilities"""
+    mdp = build_digital_graph(simple_pta)
+
+    assert mdp.states[0] == DigitalState("a", (0, 0))
+    assert mdp.transitions.sum(axis=1) == approx(1.0)
+    for s, state in enumerate(mdp.states):
+        assert mdp.state_id(state) == s
+    # In `a`, the invariant x <= 2 forces the controller to `go` at x = 2
+    at_2 = mdp.state_id(DigitalState("a", (2, 2)))
+    assert [mdp.choice_label[c] for c in mdp.choices(at_2)] == ["go"]
+
+    to_b = mdp.states.location_mask(["b"])
+    to_c = mdp.states.location_mask(["c"])
+    assert reachability(mdp, to_b, maximize=False).values[0] == approx(1.0)
+    assert reachability(mdp, to_c).values[0] == approx(1.0)
+    # The controller can keep going `back` from `b` to `a` instead of `done`
+    assert reachability(mdp, to_c, maximize=False).values[0] == 0.0
+
+
+def test_expected_reward():
+    """Minimal expected rewards only count schedulers that reach the target"""
+    mdp, target = toy_mdp()
+    ids = {s: mdp.state_id(s) for s in range(4)}
+    rewards = action_rewards(mdp, {"wait": 1.0, "try": 1.0})
+
+    assert list(prob1e(mdp, target)) == [s != 2 for s in mdp.states]
+    assert list(prob1a(mdp, target)) == [s == 1 for s in mdp.states]
+
+    # Idling in 3 costs nothing, but never reaches the target.
+    result = expected_reward(mdp, target, rewards)
+    assert result.converged
+    assert result.values[[ids[0], ids[1], ids[3]]] == approx([10.0, 0.0, 9.0])
+    assert result.values[ids[2]] == np.inf
+    assert [mdp.choice_label[result.scheduler[ids[s]]] for s in (0, 3)] == [
+        "wait",
+        "try",
+    ]
+    assert expected_reward(mdp, target, rewards, maximize=True).values[ids[0]] == (
+        np.inf
+    )
+
+
+def test_expected_time(simple_pta):
+    """Check the expected times of the digital clocks MDP of a PTA"""
+    mdp = build_digital_graph(simple_pta)
+    to_b = mdp.states.location_mask(["b"])
+    to_c = mdp.states.location_mask(["c"])
+
+    # `go` as soon as possible, then wait in `b` until `done` is enabled
+    assert expected_time(mdp, to_c).values[0] == approx(3.0)
+    # The invariant of `a` forces `go` by x = 2
+    assert expected_time(mdp, to_b).values[0] == approx(1.0)
+    assert expected_time(mdp, to_b, maximize=True).values[0] == approx(2.0)
+    assert expected_time(mdp, to_c, maximize=True).values[0] == np.inf
+
+    in_b = np.where(mdp.states.location_mask(["b"]), 2.0, 0.0)
+    rewards = delay_rewards(mdp, in_b) + action_rewards(mdp, {"go": 1.0})
+    assert expected_reward(mdp, to_c, rewards).values[0] == approx(1 / 0.7 + 4.0)
@@ -0,0 +1,106 @@
+import os
+import random
+
+import attr
+import numpy as np
+
+from pta.mdp import MDP
+from pta.trace import TraceReader, TraceRecorder
+
+
+def run(recorder, sim, n_steps):
+    recorder.reset(sim)
+    for _ in range(n_steps):
+        recorder.step(sim, (1, "go"))
+
+
+def test_trace_recorder(simple_pta, tmp_path):
+    """Steps are recorded by id, and read back the same from memory or disk"""
+    compiled = simple_pta.compile()
+    random.seed(0)
+    in_memory = TraceRecorder(compiled)
+    run(in_memory, MDP(compiled), 50)
+    trace = in_memory.reader()
+    assert trace.n_steps == len(in_memory) == 51
+    assert in_memory.directory is None
+
+    # The initial state, and a step that took `go` from `a`
+    assert trace["location"][0] == compiled.initial and trace["edge"][0] == -1
+    assert (trace["clocks"][0] == 0).all()
+    went = trace["edge"] >= 0
+    assert (
+        went[1]
+        and (
+            compiled.edge_action[trace["edge"][went]] == compiled.action_id("go")
+        ).all()
+    )
+    targets = trace["target"][went]
+    assert (compiled.target_location[targets] == trace["location"][went]).all()
+    assert (trace["delay"][1:] == 1).all()
+
+    # A tiny memory threshold spills the steps to disk as they are recorded
+    random.seed(0)
+    spilled = TraceRecorder(
+        compiled, capacity=4, spill_bytes=200, directory=str(tmp_path)
+    )
+    run(spilled, MDP(compiled), 50)
+    assert (tmp_path / "clocks.bin").exists()
+    on_disk = spilled.reader()
+    assert isinstance(on_disk["clocks"], np.memmap)
+    for name in trace:
+        assert np.array_equal(trace[name], on_disk[name])
+    reopened = TraceReader.open(spilled.directory)
+    assert np.array_equal(reopened["clocks"], trace["clocks"])
+
+    spilled.extend(trace["location"], trace["clocks"])
+    assert spilled.reader().n_steps == 102
+
+
+def test_trace_directory_reuse(simple_pta, tmp_path):
+    """A new recorder replaces the trace spilled to its directory"""
+    compiled = simple_pta.compile()
+    clocks = np.zeros((3, compiled.n_clocks))
+    for delay in (7.0, 9.0):
+        recorder = TraceRecorder(compiled, directory=str(tmp_path))
+        recorder.extend(np.zeros(3, dtype=int), clocks, delay)
+        # Below the memory threshold, nothing is written to the directory
+        assert not isinstance(recorder.reader()["delay"], np.memmap)
+        recorder.spill()
+        assert recorder.reader()["delay"].tolist() == [delay] * 3
+    assert TraceReader.open(str(tmp_path)).n_steps == 3
+
+
+def test_trace_reader_snapshot(simple_pta):
+    """In-memory readers keep their steps, and temporary spills are removed"""
+    compiled = simple_pta.compile()
+    clocks = np.zeros((3, compiled.n_clocks))
+    with TraceRecorder(compiled, capacity=4, spill_bytes=400) as recorder:
+        recorder.extend(np.zeros(3, dtype=int), clocks, 1.0)
+        before = recorder.reader()
+        recorder.spill()
+        recorder.extend(np.ones(3, dtype=int), clocks, 2.0)
+        assert before["delay"].tolist() == [1.0] * 3
+        directory = recorder.directory
+        assert recorder.reader()["delay"].tolist() == [1.0] * 3 + [2.0] * 3
+    assert not os.path.exists(directory)
+
+
+def test_trace_env_moves(simple_pta):
+    """The edges the environment takes are recorded with the controller's"""
+    # Without `done` in the actions, the environment takes it once enabled
+    env_pta = attr.evolve(simple_pta, actions=["go", "back"])
+    compiled = env_pta.compile()
+    random.seed(0)
+    recorder = TraceRecorder(compiled)
+    sim = MDP(env_pta)
+    recorder.reset(sim)
+    while sim.location != "c":
+        recorder.step(sim, (1, "go" if sim.location == "a" else None))
+    trace = recorder.reader()
+    moved = np.flatnonzero(trace["env_edge"] >= 0)
+    assert len(moved) == 1 and moved[0] == trace.n_steps - 1
+    env_edge = trace["env_edge"][moved[0]]
+    assert compiled.action_labels[compiled.edge_action[env_edge]] == "done"
+    env_target = trace["env_target"][moved[0]]
+    assert compiled.target_location[env_target] == compiled.location_id("c")
+    assert (trace["edge"][trace["env_edge"] >= 0] == -1).all()
@@ -0,0 +1,162 @@
+import random
+import sys
+
+import attr
+import numpy as np
+import pytest
+from pytest import approx
+
+import pta
+from pta.clock import Boolean
+from pta.distributions import delta
+from pta.mdp import MDP, ObservationEncoder, VectorDigitalMDP, VectorMDP
+from pta.pta import PTA, Target, Transition
+from pta.spaces import FiniteSpace, Space
+
+
+def test_vector_mdp(simple_pta):
+    """Check the batched step semantics and auto-reset"""
+    n = 10000
+    env = VectorMDP(simple_pta, n, terminal=["c"], seed=0)
+    compiled = env.pta
+    go, done = compiled.action_id("go"), compiled.action_id("done")
+    a, b = compiled.location_id("a"), compiled.location_id("b")
+
+    obs = env.step(np.ones(n), np.full(n, go))
+    in_b = obs.location == b
+    assert in_b.mean() == approx(0.7, abs=0.02)
+    assert (obs.clocks[in_b] == [0.0, 1.0]).all()
+    assert (obs.clocks[~in_b] == [1.0, 1.0]).all()
+
+    # Taking `done` from `b` ends the episode; `done` is not enabled in `a`.
+    obs = env.step(np.full(n, 2.0), np.full(n, done))
+    assert (obs.done == in_b).all()
+    assert (obs.location[in_b] == a).all() and (obs.clocks[in_b] == 0).all()
+    assert (obs.clocks[~in_b] == 3.0).all()
+
+
+def test_vector_env_moves(simple_pta):
+    """Uncontrollable edges are taken by the environment"""
+    model = attr.evolve(simple_pta, actions=["go", "done"])
+    env = VectorDigitalMDP(model, 100, seed=0)
+    compiled = env.pta
+    go, back = compiled.action_id("go"), compiled.action_id("back")
+    assert back >= compiled.n_controllable
+
+    env.step(np.ones(100), np.full(100, go))
+    in_b = env.location == compiled.location_id("b")
+    # In `b`, once y >= 2 (and x <= 3), the environment goes `back` to `a`
+    obs = env.step(np.ones(100), np.full(100, -1))
+    assert (obs.location[in_b] == compiled.location_id("a")).all()
+    assert (obs.clocks[in_b] == 0).all()
+
+
+def test_vector_digital_env_delays():
+    """Integer environment delays stay out of the open ends of the guards"""
+    x = pta.new_clocks(["x"])[0]
+    model = PTA(
+        location_space=FiniteSpace("ab"),
+        clocks=[x],
+        actions=[],
+        init_location="a",
+        transitions=lambda loc: (
+            {"leave": Transition(x < 3, delta(Target(frozenset(), "b")))}
+            if loc == "a"
+            else {}
+        ),
+        invariants=lambda loc: Boolean(True),
+    )
+    env = VectorDigitalMDP(model, 1000, seed=0)
+    obs = env.step(np.zeros(1000), np.full(1000, -1))
+    assert (obs.location == env.pta.location_id("b")).all()
+    assert set(obs.clocks[:, 0].tolist()) == {0.0, 1.0, 2.0}
+
+
+def test_action_mask(simple_pta):
+    """The masks of the simulators agree with their enabled actions"""
+    env = VectorMDP(simple_pta, 4, seed=0)
+    compiled = env.pta
+    env.reset()
+    env.step(np.array([0.5, 1, 2, 2]), np.full(4, -1))
+    mask = env.action_mask()
+    assert mask.enabled.shape == (4, compiled.n_controllable)
+    go = compiled.action_id("go")
+    assert list(mask.enabled[:, go]) == [False, True, True, True]
+    assert mask.enabled.sum() == 3
+    assert list(mask.delays.upper) == [1.5, 1, 0, 0]
+    # The mask is written to the same preallocated array every time
+    assert env.action_mask().enabled is mask.enabled
+
+    for model in (simple_pta, compiled):
+        sim = MDP(model)
+        sim.reset()
+        sim.step((1.5, "wait"))
+        mask = sim.action_mask()
+        delays, edges = sim.enabled_actions()
+        labels = sim.action_labels
+        assert labels == compiled.action_labels[: compiled.n_controllable]
+        assert {labels[i] for i in np.flatnonzero(mask.enabled)} == edges
+        assert (mask.delays.lower, mask.delays.upper) == (delays.lower, delays.upper)
+        assert mask.delays.right_closed == delays.right_closed
+
+
+def test_observe(simple_pta):
+    """The scalar and batched encodings agree, and reuse the given buffers"""
+    env = VectorMDP(simple_pta, 3, seed=0)
+    compiled = env.pta
+    env.reset()
+    env.step(np.array([0.5, 1, 2]), np.full(3, -1))
+    batch = env.observe(env.encoder.empty(3))
+    assert batch.dtype == np.float64
+    assert (batch[:, 0] == compiled.location_id("a")).all()
+    assert (batch[:, 1:] == env.clocks).all()
+
+    encoder = ObservationEncoder(compiled, one_hot=True)
+    assert encoder.size == compiled.n_locations + compiled.n_clocks
+    one_hot = encoder.encode_batch(env.location, env.clocks, encoder.empty(3))
+    assert (one_hot[:, : compiled.n_locations].argmax(axis=1) == env.location).all()
+
+    sim = MDP(simple_pta, encoder=encoder)
+    sim.reset()
+    sim.step((2.0, "wait"))
+    out = encoder.empty()
+    assert sim.observe(out) is out
+    assert (out == one_hot[2]).all()
+    sim.step((0.0, "go"))
+    sim.observe(out)
+    assert out[: compiled.n_locations].sum() == 1
+
+
+class _Naturals(Space):
+    def __len__(self) -> int:
+        return sys.maxsize
+
+    def __contains__(self, x) -> bool:
+        return isinstance(x, int) and x >= 0
+
+    def sample(self):
+        return random.randrange(len(self))
+
+
+def test_observe_uncompiled():
+    """The locations of a PTA that can't be compiled get ids as they are visited"""
+    x = pta.new_clocks(["x"])[0]
+    counter = PTA(
+        location_space=_Naturals(),
+        clocks=[x],
+        actions=["inc"],
+        init_location=0,
+        transitions=lambda n: {
+            "inc": Transition(x >= 1, delta(Target(frozenset([x]), n + 1)))
+        },
+        invariants=lambda n: Boolean(True),
+    )
+    sim = MDP(counter)
+    sim.reset()
+    out = sim.encoder.empty()
+    for n in range(3):
+        assert sim.observe(out).tolist() == [float(n), 0.0]
+        sim.step((1.0, "inc"))
+    assert sim.encoder.location_id(0) == 0
+    with pytest.raises(ValueError, match="one-hot"):
+        ObservationEncoder(counter, one_hot=True)
@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+import pta
+from pta.mdp.region_graph import build_region_graph
+from pta.mdp.store import PassedStore, SearchOrder
+from pta.mdp.zone_graph import build_zone_graph, explore_zones
+from pta.zones import DBM
+
+
+def test_dbm_operations():
+    """Check the operations on zones against clock valuations"""
+    x, y = pta.new_clocks(("x", "y"))
+    zero = DBM.zero((x, y))
+    assert {x: 0, y: 0} in zero and {x: 0.5, y: 0.5} not in zero
+
+    zone = zero.up().constrain((x >= 1) & (x < 3))
+    assert {x: 1, y: 1} in zone and {x: 2.9, y: 2.9} in zone
+    assert {x: 3, y: 3} not in zone and {x: 1, y: 2} not in zone
+    assert zero.up().includes(zone) and not zone.includes(zero.up())
+
+    # After resetting x, y - x is between 1 and 3 forever after
+    zone = zone.reset([x]).up()
+    assert {x: 5, y: 6} in zone and {x: 5, y: 8.5} not in zone
+    assert zone.constrain(y - x >= 3).empty
+    assert not zone.constrain(y - x > 2).empty
+    assert zone.constrain(x <= 1) == zone.constrain(y < 4).constrain(x <= 1)
+    assert len({zone.constrain(y - x >= 3), zone.constrain((y - x) >= 3)}) == 1
+
+    # Extrapolation drops the bounds beyond the maximal constants
+    far = zone.constrain(x >= 5).extrapolate({x: 2, y: 2})
+    assert far.includes(zone.constrain(x >= 5))
+    assert {x: 3, y: 4} in far and {x: 2, y: 3} not in far
+
+
+def test_zone_graph(simple_pta):
+    """The zone graph reaches the same locations with far fewer states"""
+    zones = build_zone_graph(simple_pta)
+    regions = build_region_graph(simple_pta)
+
+    assert {s.location for s in zones.states} == {"a", "b", "c"}
+    assert zones.n_states < regions.n_states
+    # Every region (whose clocks are not capped) lies in a zone of its location
+    max_constants = simple_pta.compile().max_constants()
+    for state in regions.states:
+        values = state.region.value()
+        if any(values[c] > m for c, m in max_constants.items()):
+            continue
+        assert any(
+            values in z.zone for z in zones.states if z.location == state.location
+        )
+    assert zones.states[0].zone.includes(DBM.zero(simple_pta.clocks))
+
+
+def test_passed_store():
+    """The store only keeps the maximal zones of each location"""
+    x, y = pta.new_clocks(("x", "y"))
+    store = PassedStore((x, y))
+    small = DBM.zero((x, y)).up().constrain(x <= 1)
+    large = DBM.zero((x, y)).up().constrain(x <= 2)
+    assert store.add("a", small) is not None
+    assert store.add("a", small) is None
+    assert store.add("b", large) is not None
+    assert store.add("a", large) is not None
+    assert store.add("a", small) is None
+    assert store.zones("a") == [large] and len(store) == 2
+    assert store.covers("b", small) and not store.covers("c", small)
+
+    stats = store.stats
+    assert (stats.added, stats.duplicates, stats.subsumed, stats.covered) == (
+        5,
+        1,
+        1,
+        1,
+    )
+    assert stats.stored == len(store) and stats.hit_rate == 0.4
+
+
+@pytest.mark.parametrize("order", list(SearchOrder))
+def test_explore_zones(simple_pta, order):
+    """Every zone of the zone graph is covered by a maximal zone"""
+    graph = build_zone_graph(simple_pta)
+    store = explore_zones(simple_pta, order, rng=random.Random(0))
+    assert len(store) <= graph.n_states
+    for state in graph.states:
+        assert store.covers(state.location, state.zone)
+    assert store.stats.stored == len(store)
+
+
+def test_passed_store_compaction():
+    """Discarded zones are compacted away, and incomparable ones pre-filtered"""
+    x, y = pta.new_clocks(("x", "y"))
+    store = PassedStore((x, y))
+    growing = DBM.zero((x, y)).up()
+    keys = [store.add("a", growing.constrain(x <= k)) for k in range(1, 51)]
+    assert len(store) == 1 and store.stats.covered == 49
+    assert store.alive("a", keys[-1]) and not store.alive("a", keys[0])
+    assert store.stats.nbytes == store._buckets["a"].nbytes
+    assert len(store._buckets["a"].zones) <= 2
+
+    store = PassedStore((x, y))
+    universe = DBM.universe((x, y))
+    for k in range(50):
+        store.add("b", universe.constrain((x >= k) & (x <= k + 1) & (y <= k + 1)))
+    assert len(store) == 50 and store.stats.comparisons == 0
+    assert store.covers("b", universe.constrain((x >= 3) & (x <= 3) & (y <= 3)))
+    assert store.stats.comparisons > 0